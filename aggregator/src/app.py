@@ -0,0 +1,50 @@
+from aiohttp import web
+from config import Config
+from clients import UpstreamClient
+from board import BoardError, build_board
+
+routes = web.RouteTableDef()
+
+
+# Endpoint con el tablero de viajes: posts + trayectos + usuario en una sola respuesta
+@routes.get("/aggregator/board")
+async def get_board(request):
+    try:
+        board = await build_board(request.app["clients"], request.headers.get("Authorization"), request.query)
+    except BoardError as error:
+        return web.json_response(error.body, status=error.status)
+    return web.json_response(board)
+
+
+# Endpoint para verificar la salud del servicio
+@routes.get("/aggregator/ping")
+async def ping(request):
+    return web.Response(text="pong")
+
+
+async def start_clients(app):
+    """Un cliente con pool propio por servicio, compartido por todas las solicitudes."""
+    app["clients"] = {
+        "users": UpstreamClient("users", Config.USERS_SERVICE_URL, Config.USERS_TIMEOUT, Config.UPSTREAM_POOL_SIZE),
+        "posts": UpstreamClient("posts", Config.POSTS_SERVICE_URL, Config.POSTS_TIMEOUT, Config.UPSTREAM_POOL_SIZE),
+        "routes": UpstreamClient("routes", Config.ROUTES_SERVICE_URL, Config.ROUTES_TIMEOUT, Config.UPSTREAM_POOL_SIZE),
+    }
+    for client in app["clients"].values():
+        await client.start()
+
+
+async def close_clients(app):
+    for client in app["clients"].values():
+        await client.close()
+
+
+def create_app():
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(start_clients)
+    app.on_cleanup.append(close_clients)
+    return app
+
+
+if __name__ == '__main__':
+    web.run_app(create_app(), host="0.0.0.0", port=Config.PORT)
@@ -0,0 +1,80 @@
+import asyncio
+import os
+from clients import UpstreamError
+
+BOARD_PAGE_SIZE = int(os.getenv("BOARD_PAGE_SIZE", 20))
+# Máximo de ids por llamada a GET /routes?ids= y GET /users?ids= (ROUTES_MAX_IDS / USERS_MAX_IDS)
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", 100))
+POST_FILTERS = ("expire", "route", "owner", "cursor")
+
+
+class BoardError(Exception):
+    """El tablero no se puede armar: posts no respondió o rechazó la solicitud."""
+
+    def __init__(self, status, body):
+        super().__init__(status)
+        self.status = status
+        self.body = body
+
+
+async def fetch_batch(client, path, ids, headers):
+    """Resuelve ids con los endpoints en lote (una llamada por cada BATCH_MAX_IDS ids, en paralelo).
+
+    Retorna (id -> datos, motivo de la falla); los ids de un lote que falla quedan en None.
+    """
+    chunks = [ids[start:start + BATCH_MAX_IDS] for start in range(0, len(ids), BATCH_MAX_IDS)]
+    results = await asyncio.gather(
+        *(client.get_json(path, headers=headers, params={"ids": ",".join(chunk)}) for chunk in chunks),
+        return_exceptions=True
+    )
+    found = {}
+    reason = None
+    for result in results:
+        if isinstance(result, UpstreamError):
+            reason = result.reason
+        elif isinstance(result, BaseException):
+            raise result
+        elif result[0] == 200:
+            found.update(result[1])
+        else:
+            reason = f"estado {result[0]}"
+    return found, reason
+
+
+async def _empty():
+    return {}, None
+
+
+async def build_board(clients, authorization, args):
+    """Página de posts con su trayecto y su dueño, en una sola respuesta.
+
+    Primero se pide la página; después los trayectos y los dueños distintos se resuelven a
+    la vez con una llamada en lote a cada servicio, así que la latencia queda en posts más
+    la más lenta de las dos.
+    """
+    headers = {"Authorization": authorization} if authorization else {}
+    params = {key: args[key] for key in POST_FILTERS if args.get(key)}
+    params["limit"] = args.get("limit") or str(BOARD_PAGE_SIZE)
+
+    try:
+        status, page = await clients["posts"].get_json("/posts", headers=headers, params=params)
+    except UpstreamError as error:
+        raise BoardError(504 if error.reason == "timeout" else 502, {"msg": f"posts: {error.reason}"})
+    if status != 200:
+        raise BoardError(status, page)
+
+    posts = page["posts"]
+    route_ids = list(dict.fromkeys(post["routeId"] for post in posts))
+    user_ids = list(dict.fromkeys(post["userId"] for post in posts))
+    (routes, routes_error), (users, users_error) = await asyncio.gather(
+        fetch_batch(clients["routes"], "/routes", route_ids, headers) if route_ids else _empty(),
+        fetch_batch(clients["users"], "/users", user_ids, headers) if user_ids else _empty()
+    )
+
+    errors = {name: reason for name, reason in (("routes", routes_error), ("users", users_error)) if reason}
+    return {
+        "posts": [{**post, "route": routes.get(post["routeId"]), "owner": users.get(post["userId"])}
+                  for post in posts],
+        "next": page.get("next"),
+        "errors": errors
+    }
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import aiohttp
+
+
+class UpstreamError(Exception):
+    """Falla de un servicio: timeout, error de conexión o respuesta inválida."""
+
+    def __init__(self, service, reason, status=None):
+        super().__init__(f"{service}: {reason}")
+        self.service = service
+        self.reason = reason
+        self.status = status
+
+
+class UpstreamClient:
+    """Cliente HTTP asíncrono de un servicio, con pool de conexiones keep-alive propio
+    y un timeout total por llamada."""
+
+    def __init__(self, name, base_url, timeout, pool_size=50):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_size = pool_size
+        self.session = None
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+
+    async def get_json(self, path, headers=None, params=None):
+        """Retorna (estado, cuerpo JSON); lanza UpstreamError si no hay respuesta válida."""
+        try:
+            async with self.session.get(f"{self.base_url}{path}", headers=headers, params=params) as response:
+                body = await response.read()
+                return response.status, json.loads(body) if body else None
+        except asyncio.TimeoutError:
+            raise UpstreamError(self.name, "timeout")
+        except aiohttp.ClientError as error:
+            raise UpstreamError(self.name, f"error de conexión ({error.__class__.__name__})")
+        except ValueError:
+            raise UpstreamError(self.name, "respuesta inválida")
@@ -0,0 +1,19 @@
+import os
+
+
+class Config:
+    """Configuración del agregador: URLs de los servicios, timeouts y tamaño de los pools."""
+
+    PORT = int(os.getenv("CONFIG_PORT", 5004))
+
+    USERS_SERVICE_URL = os.getenv("USERS_SERVICE_URL", "http://users:5000")
+    POSTS_SERVICE_URL = os.getenv("POSTS_SERVICE_URL", "http://posts:5001")
+    ROUTES_SERVICE_URL = os.getenv("ROUTES_SERVICE_URL", "http://routes:5002")
+
+    # Timeout total (segundos) de cada llamada, por servicio
+    USERS_TIMEOUT = float(os.getenv("USERS_TIMEOUT", 1.0))
+    POSTS_TIMEOUT = float(os.getenv("POSTS_TIMEOUT", 2.0))
+    ROUTES_TIMEOUT = float(os.getenv("ROUTES_TIMEOUT", 1.0))
+
+    # Conexiones keep-alive simultáneas por servicio
+    UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", 50))
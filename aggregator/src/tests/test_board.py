@@ -0,0 +1,99 @@
+import asyncio
+import time
+import pytest
+import board
+from board import BoardError, build_board
+from clients import UpstreamError
+
+ROUTE_A = "aaaaaaaa-0000-4000-8000-00000000000a"
+ROUTE_B = "bbbbbbbb-0000-4000-8000-00000000000b"
+USER = "cccccccc-0000-4000-8000-00000000000c"
+POSTS = [{"id": "1", "routeId": ROUTE_A, "userId": USER}, {"id": "2", "routeId": ROUTE_B, "userId": USER},
+         {"id": "3", "routeId": ROUTE_A, "userId": USER}]
+
+
+class FakeClient:
+    """Servicio simulado: `handler(path, params)` da (estado, cuerpo) o lanza, tras `delay`."""
+
+    def __init__(self, handler, delay=0.0):
+        self.handler = handler
+        self.delay = delay
+        self.calls = []
+
+    async def get_json(self, path, headers=None, params=None):
+        self.calls.append((path, params))
+        await asyncio.sleep(self.delay)
+        return self.handler(path, params)
+
+
+def by_ids(params):
+    return 200, {value: {"id": value} for value in params["ids"].split(",")}
+
+
+def clients(delay=0.0, routes=by_ids):
+    return {
+        "posts": FakeClient(lambda path, params: (200, {"posts": POSTS, "next": "c2"}), delay),
+        "users": FakeClient(lambda path, params: by_ids(params), delay),
+        "routes": FakeClient(lambda path, params: routes(params), delay),
+    }
+
+
+### 🧪 TEST: Tablero compuesto con una sola llamada en lote por servicio ###
+def test_build_board():
+    upstreams = clients()
+    result = asyncio.run(build_board(upstreams, "Bearer t", {}))
+
+    assert [post["route"]["id"] for post in result["posts"]] == [ROUTE_A, ROUTE_B, ROUTE_A]
+    assert result["posts"][0]["owner"] == {"id": USER}
+    assert result["next"] == "c2"
+    assert result["errors"] == {}
+    assert upstreams["routes"].calls == [("/routes", {"ids": f"{ROUTE_A},{ROUTE_B}"})]
+    assert upstreams["users"].calls == [("/users", {"ids": USER})]
+
+
+### 🧪 TEST: Más ids que el máximo por llamada se reparten en lotes ###
+def test_build_board_chunks_ids(monkeypatch):
+    monkeypatch.setattr(board, "BATCH_MAX_IDS", 1)
+    upstreams = clients()
+    result = asyncio.run(build_board(upstreams, "Bearer t", {}))
+
+    assert len(upstreams["routes"].calls) == 2
+    assert result["posts"][1]["route"] == {"id": ROUTE_B}
+
+
+### 🧪 TEST: Trayectos y dueños se piden en paralelo, no en serie ###
+def test_build_board_is_concurrent():
+    started = time.perf_counter()
+    asyncio.run(build_board(clients(delay=0.1), "Bearer t", {}))
+
+    # posts y luego routes y users a la vez: ~0.2 s en lugar de 0.3 s
+    assert time.perf_counter() - started < 0.28
+
+
+### 🧪 TEST: Si routes no responde el tablero sale sin trayectos ###
+def test_build_board_routes_timeout():
+    def timeout(params):
+        raise UpstreamError("routes", "timeout")
+
+    result = asyncio.run(build_board(clients(routes=timeout), "Bearer t", {}))
+
+    assert [post["route"] for post in result["posts"]] == [None, None, None]
+    assert result["posts"][0]["owner"] == {"id": USER}
+    assert result["errors"] == {"routes": "timeout"}
+
+
+### 🧪 TEST: Si posts falla no hay tablero ###
+def test_build_board_posts_error():
+    upstreams = clients()
+    upstreams["posts"].handler = lambda path, params: (401, {"error": "Token inválido o no autorizado"})
+    with pytest.raises(BoardError) as error:
+        asyncio.run(build_board(upstreams, None, {}))
+    assert error.value.status == 401
+
+    def timeout(path, params):
+        raise UpstreamError("posts", "timeout")
+
+    upstreams["posts"].handler = timeout
+    with pytest.raises(BoardError) as error:
+        asyncio.run(build_board(upstreams, None, {}))
+    assert error.value.status == 504
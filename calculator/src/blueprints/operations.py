@@ -1,25 +1,88 @@
-from flask import Flask, jsonify, request, Blueprint
-from ..commands.sum import Sum
-from ..commands.divide import Divide
-from ..commands.multiply import Multiply
+from flask import Flask, Response, jsonify, request, Blueprint, stream_with_context
+from functools import lru_cache
+from ..commands.registry import registry
+from ..errors.errors import ApiError, InvalidRecord
+import json as json_lib
 import os
 
 operations_blueprint = Blueprint('operations', __name__)
 
+@lru_cache(maxsize=None)
+def current_version():
+    """La versión se lee del entorno una sola vez."""
+    return os.environ["VERSION"]
+
 @operations_blueprint.route('/sum', methods = ['POST'])
 def sum():
     json = request.get_json()
-    result = Sum(json['x'], json['y']).execute()
-    return jsonify({ 'sum': str(result), 'version': os.environ["VERSION"] })
+    result = registry.execute('sum', json['x'], json['y'])
+    return jsonify({ 'sum': str(result), 'version': current_version() })
 
 @operations_blueprint.route('/multiply', methods = ['POST'])
 def multiply():
     json = request.get_json()
-    result = Multiply(json['x'], json['y']).execute()
-    return jsonify({ 'multiplication': str(result), 'version': os.environ["VERSION"] })
+    result = registry.execute('multiply', json['x'], json['y'])
+    return jsonify({ 'multiplication': str(result), 'version': current_version() })
 
 @operations_blueprint.route('/divide', methods = ['POST'])
 def divide():
     json = request.get_json()
-    result = Divide(json['x'], json['y']).execute()
-    return jsonify({ 'division': str(result), 'version': os.environ["VERSION"] })
+    result = registry.execute('divide', json['x'], json['y'])
+    return jsonify({ 'division': str(result), 'version': current_version() })
+
+@operations_blueprint.route('/operations/<string:op>', methods = ['POST'])
+def dispatch(op):
+    json = request.get_json()
+    result = registry.execute(op, json['x'], json['y'])
+    return jsonify({ 'operation': op, 'result': str(result), 'version': current_version() })
+
+@operations_blueprint.route('/operations/memo', methods = ['GET'])
+def memo_stats():
+    stats = registry.memo.stats() if registry.memo else { 'enabled': False }
+    return jsonify({ **stats, 'version': current_version() })
+
+@operations_blueprint.route('/batch', methods = ['POST'])
+def batch():
+    # NumPy solo se importa cuando se usa el endpoint
+    from ..commands.batch import Batch
+    json = request.get_json()
+    results, errors = Batch(json.get('operation'), json.get('x'), json.get('y')).execute()
+    return jsonify({
+        'results': [None if result is None else str(result) for result in results],
+        'errors': errors,
+        'version': current_version()
+    })
+
+@operations_blueprint.route('/expression', methods = ['POST'])
+def expression():
+    from ..commands.expression import Expression
+    json = request.get_json()
+    variables = json.get('variables', [{}])
+    if isinstance(variables, dict):
+        variables = [variables]
+    results = Expression(json.get('expression'), variables).execute()
+    return jsonify({ 'results': [str(result) for result in results], 'version': current_version() })
+
+def run_record(line):
+    """Ejecuta un registro {op, x, y}; los errores se devuelven como una línea más."""
+    try:
+        record = json_lib.loads(line)
+        return { 'op': record['op'], 'result': str(registry.execute(record['op'], record['x'], record['y'])) }
+    except ApiError as err:
+        return { 'mssg': err.description, 'code': err.code }
+    except (ValueError, KeyError, TypeError):
+        return { 'mssg': InvalidRecord.description, 'code': InvalidRecord.code }
+
+@operations_blueprint.route('/stream', methods = ['POST'])
+def stream():
+    # Se lee y se responde línea por línea, sin almacenar el cuerpo completo
+    body = request.stream
+
+    def generate():
+        for number, line in enumerate(body, start=1):
+            if line.strip():
+                yield json_lib.dumps({ 'line': number, **run_record(line) }) + '\n'
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['X-Version'] = current_version()
+    return response
@@ -0,0 +1,63 @@
+import numpy as np
+from .base_command import BaseCommannd
+from ..errors.errors import CantDivideByZero, InvalidOperation, InvalidOperands
+
+class Batch(BaseCommannd):
+  OPERATIONS = ('sum', 'multiply', 'divide')
+  # Mayor magnitud de los operandos con la que int64 (y float64 al dividir) da el mismo
+  # resultado exacto que los enteros de Python; fuera de ese rango se opera con dtype=object
+  EXACT_BOUNDS = { 'sum': 2 ** 62, 'multiply': 2 ** 31, 'divide': 2 ** 53 }
+
+  def __init__(self, operation, x, y):
+    self.operation = operation
+    self.x = x
+    self.y = y
+
+  def execute(self):
+    if self.operation not in self.OPERATIONS:
+      raise InvalidOperation
+
+    try:
+      x = np.asarray(self.x)
+      y = np.asarray(self.y)
+      x, y = np.broadcast_arrays(x, y)
+    except ValueError:
+      raise InvalidOperands
+    if x.ndim != 1 or not self._numeric(x) or not self._numeric(y):
+      raise InvalidOperands
+    if not self._exact(x, y):
+      x, y = x.astype(object), y.astype(object)
+
+    errors = []
+    if self.operation == 'sum':
+      results = (x + y).tolist()
+    elif self.operation == 'multiply':
+      results = (x * y).tolist()
+    else:
+      # Las posiciones con y == 0 se reportan con la semántica de CantDivideByZero
+      zeros = np.asarray(y == 0, dtype=bool)
+      if x.dtype == object:
+        results = [None if zero else a / b for a, b, zero in zip(x.tolist(), y.tolist(), zeros.tolist())]
+      else:
+        results = np.divide(x, y, out=np.zeros(x.shape), where=~zeros).tolist()
+      for index in np.flatnonzero(zeros).tolist():
+        results[index] = None
+        errors.append({ 'index': index, 'mssg': CantDivideByZero.description, 'code': CantDivideByZero.code })
+
+    return results, errors
+
+  @staticmethod
+  def _numeric(values):
+    # Los enteros que no caben en int64 llegan como objetos de Python
+    if values.dtype.kind == 'O':
+      return all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values.tolist())
+    return values.dtype.kind in 'iuf'
+
+  def _exact(self, x, y):
+    """True si NumPy puede operar sin desbordar ni perder precisión respecto a Python."""
+    if x.dtype.kind == 'O' or y.dtype.kind == 'O':
+      return False
+    if x.dtype.kind == 'f' or y.dtype.kind == 'f' or x.size == 0:
+      return True
+    bound = self.EXACT_BOUNDS[self.operation]
+    return all(-bound < int(values.min()) and int(values.max()) < bound for values in (x, y))
@@ -0,0 +1,78 @@
+import ast
+import operator
+from functools import lru_cache
+from .base_command import BaseCommannd
+from .divide import Divide
+from ..errors.errors import InvalidExpression, InvalidVariables, UndefinedVariable
+
+MAX_EXPRESSION_LENGTH = 1000
+# Profundidad máxima del árbol: la compilación y la evaluación son recursivas
+MAX_EXPRESSION_DEPTH = 100
+
+BINARY_OPERATORS = {
+  ast.Add: operator.add,
+  ast.Sub: operator.sub,
+  ast.Mult: operator.mul,
+  ast.Div: lambda x, y: Divide(x, y).execute()
+}
+
+UNARY_OPERATORS = {
+  ast.UAdd: operator.pos,
+  ast.USub: operator.neg
+}
+
+def _compile(node, depth=0):
+  """Convierte el AST en funciones anidadas que reciben las variables."""
+  if depth > MAX_EXPRESSION_DEPTH:
+    raise InvalidExpression
+
+  if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+    value = node.value
+    return lambda variables: value
+
+  if isinstance(node, ast.Name):
+    name = node.id
+    def variable(variables):
+      try:
+        value = variables[name]
+      except KeyError:
+        raise UndefinedVariable
+      if type(value) not in (int, float):
+        raise InvalidVariables
+      return value
+    return variable
+
+  if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+    apply, left, right = BINARY_OPERATORS[type(node.op)], _compile(node.left, depth + 1), _compile(node.right, depth + 1)
+    return lambda variables: apply(left(variables), right(variables))
+
+  if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+    apply, operand = UNARY_OPERATORS[type(node.op)], _compile(node.operand, depth + 1)
+    return lambda variables: apply(operand(variables))
+
+  raise InvalidExpression
+
+@lru_cache(maxsize=256)
+def compile_expression(expression):
+  """Analiza la expresión una sola vez; las siguientes llamadas usan la caché."""
+  if not isinstance(expression, str) or len(expression) > MAX_EXPRESSION_LENGTH:
+    raise InvalidExpression
+  try:
+    tree = ast.parse(expression, mode='eval')
+  except (SyntaxError, ValueError, RecursionError):
+    raise InvalidExpression
+  return _compile(tree.body)
+
+class Expression(BaseCommannd):
+  def __init__(self, expression, variables):
+    self.expression = expression
+    self.variables = variables
+
+  def execute(self):
+    if not isinstance(self.expression, str):
+      raise InvalidExpression
+    if not isinstance(self.variables, list) or not all(isinstance(item, dict) for item in self.variables):
+      raise InvalidVariables
+
+    evaluate = compile_expression(self.expression)
+    return [evaluate(variables) for variables in self.variables]
@@ -0,0 +1,80 @@
+import importlib
+import os
+import threading
+from collections import OrderedDict
+from ..errors.errors import InvalidOperation
+
+class MemoCache():
+  """Caché LRU acotada de resultados (op, x, y) con contadores de aciertos y fallos."""
+
+  def __init__(self, max_size):
+    self.max_size = max_size
+    self.hits = 0
+    self.misses = 0
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key):
+    with self._lock:
+      if key in self._entries:
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return True, self._entries[key]
+      self.misses += 1
+      return False, None
+
+  def set(self, key, value):
+    with self._lock:
+      self._entries[key] = value
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_size:
+        self._entries.popitem(last=False)
+
+  def stats(self):
+    return { 'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxSize': self.max_size }
+
+class CommandRegistry():
+  """Registro de comandos por nombre; el módulo de cada comando se importa en su primer uso."""
+
+  def __init__(self, memo_size=0):
+    self._paths = {}
+    self._commands = {}
+    self.memo = MemoCache(memo_size) if memo_size > 0 else None
+
+  def register(self, name, path):
+    """path con formato '.modulo:Clase', relativo al paquete commands."""
+    self._paths[name] = path
+
+  def names(self):
+    return list(self._paths)
+
+  def get(self, name):
+    command = self._commands.get(name)
+    if command is None:
+      path = self._paths.get(name)
+      if path is None:
+        raise InvalidOperation
+      module, class_name = path.split(':')
+      command = self._commands[name] = getattr(importlib.import_module(module, __package__), class_name)
+    return command
+
+  def execute(self, name, x, y):
+    command = self.get(name)
+    if self.memo is None:
+      return command(x, y).execute()
+
+    # El tipo es parte de la llave: 1 y 1.0 son iguales pero dan resultados distintos
+    key = (name, type(x), x, type(y), y)
+    try:
+      found, result = self.memo.get(key)
+    except TypeError:
+      return command(x, y).execute()  # Operandos no hashables: sin memo
+    if not found:
+      result = command(x, y).execute()
+      self.memo.set(key, result)
+    return result
+
+registry = CommandRegistry(memo_size=int(os.getenv('MEMO_SIZE', 1024)))
+registry.register('sum', '.sum:Sum')
+registry.register('multiply', '.multiply:Multiply')
+registry.register('divide', '.divide:Divide')
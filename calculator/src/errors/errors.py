@@ -5,3 +5,27 @@ class ApiError(Exception):
 class CantDivideByZero(ApiError):
     code = 400
     description = "Cant divide by zero"
+
+class InvalidOperation(ApiError):
+    code = 400
+    description = "Invalid operation"
+
+class InvalidOperands(ApiError):
+    code = 400
+    description = "Operands must be numeric arrays of the same length"
+
+class InvalidExpression(ApiError):
+    code = 400
+    description = "Invalid expression"
+
+class UndefinedVariable(ApiError):
+    code = 400
+    description = "Undefined variable in expression"
+
+class InvalidVariables(ApiError):
+    code = 400
+    description = "Variables must be a list of objects with numeric values"
+
+class InvalidRecord(ApiError):
+    code = 400
+    description = "Invalid record, expected {op, x, y}"
@@ -2,17 +2,22 @@ from dotenv import load_dotenv
 loaded = load_dotenv('.env.development')
 
 from flask import Flask, jsonify
-from .blueprints.operations import operations_blueprint
+from .blueprints.operations import operations_blueprint, current_version
 from .errors.errors import ApiError
-import os
+from .commands.registry import registry
+from .metrics import init_metrics, register_cache
 
 app = Flask(__name__)
 app.register_blueprint(operations_blueprint)
 
+init_metrics(app)
+if registry.memo is not None:
+  register_cache('memo', registry.memo)
+
 @app.errorhandler(ApiError)
 def handle_exception(err):
     response = {
       "mssg": err.description,
-      "version": os.environ["VERSION"]
+      "version": current_version()
     }
     return jsonify(response), err.code
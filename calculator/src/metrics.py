@@ -0,0 +1,132 @@
+"""
+Métricas del servicio en formato de exposición de texto de Prometheus (GET /metrics).
+
+No depende de un colector externo: los histogramas guardan conteos por bucket en
+memoria del proceso y solo se acumulan al renderizar, así que cada solicitud cuesta una
+búsqueda binaria y unas pocas sumas bajo un lock. Expone la latencia por ruta, las
+solicitudes en curso y los aciertos de la caché de resultados memoizados.
+"""
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names, values):
+  pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+  return "{" + pairs + "}" if pairs else ""
+
+
+class Histogram:
+  def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+    self.name = name
+    self.help_text = help_text
+    self.label_names = label_names
+    self.buckets = buckets
+    self._series = {}  # valores de etiquetas -> [conteos por bucket, suma, total]
+    self._lock = threading.Lock()
+
+  def observe(self, labels, value):
+    index = bisect_left(self.buckets, value)
+    with self._lock:
+      series = self._series.get(labels)
+      if series is None:
+        series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+      series[0][index] += 1
+      series[1] += value
+      series[2] += 1
+
+  def render(self):
+    lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+    with self._lock:
+      series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+    for labels, counts, total, count in sorted(series):
+      cumulative = 0
+      for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+        cumulative += bucket_count
+        bucket_labels = _labels(self.label_names + ("le",), labels + (bound,))
+        lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+      lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total:.6f}")
+      lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+    return lines
+
+
+class Gauge:
+  def __init__(self, name, help_text):
+    self.name = name
+    self.help_text = help_text
+    self.value = 0
+    self._lock = threading.Lock()
+
+  def inc(self, amount=1):
+    with self._lock:
+      self.value += amount
+
+  def dec(self, amount=1):
+    self.inc(-amount)
+
+  def render(self):
+    return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+request_latency = Histogram("http_request_duration_seconds", "Latencia de las solicitudes por ruta y estado",
+                            ("method", "route", "status"))
+in_flight = Gauge("http_requests_in_flight", "Solicitudes en curso")
+
+_caches = {}
+
+
+def register_cache(name, cache):
+  """Registra una caché que expone los contadores hits y misses."""
+  _caches[name] = cache
+
+
+def _start_timer():
+  g.metrics_start = time.perf_counter()
+  in_flight.inc()
+
+
+def _observe_request(response):
+  started = g.get("metrics_start")
+  if started is not None:
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    request_latency.observe((request.method, route, str(response.status_code)), time.perf_counter() - started)
+  return response
+
+
+def _end_request(error=None):
+  if g.pop("metrics_start", None) is not None:
+    in_flight.dec()
+
+
+def _cache_lines():
+  if not _caches:
+    return []
+  lines = ["# HELP cache_hits_total Aciertos de caché", "# TYPE cache_hits_total counter"]
+  lines += [f'cache_hits_total{{cache="{name}"}} {cache.hits}' for name, cache in _caches.items()]
+  lines += ["# HELP cache_misses_total Fallos de caché", "# TYPE cache_misses_total counter"]
+  lines += [f'cache_misses_total{{cache="{name}"}} {cache.misses}' for name, cache in _caches.items()]
+  lines += ["# HELP cache_hit_ratio Proporción de aciertos de caché", "# TYPE cache_hit_ratio gauge"]
+  for name, cache in _caches.items():
+    lookups = cache.hits + cache.misses
+    lines.append(f'cache_hit_ratio{{cache="{name}"}} {cache.hits / lookups if lookups else 0:.4f}')
+  return lines
+
+
+def render_metrics():
+  lines = request_latency.render() + in_flight.render() + _cache_lines()
+  return "\n".join(lines) + "\n"
+
+
+def metrics_view():
+  return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+  """Registra los hooks de la aplicación y el endpoint /metrics."""
+  app.before_request(_start_timer)
+  app.after_request(_observe_request)
+  app.teardown_request(_end_request)
+  app.add_url_rule("/metrics", "metrics", metrics_view)
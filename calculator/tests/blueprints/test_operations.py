@@ -57,4 +57,113 @@ class TestOperations():
 
       assert response.status_code == 400
       assert 'mssg' in response_json
-      assert 'version' in response_json
\ No newline at end of file
+      assert 'version' in response_json
+
+  def test_batch_divide(self):
+    with app.test_client() as test_client:
+      response = test_client.post(
+        '/batch', json={
+          'operation': 'divide',
+          'x': [6, 5],
+          'y': [3, 0]
+        }
+      )
+      response_json = json.loads(response.data)
+
+      assert response.status_code == 200
+      assert response_json['results'] == ['2.0', None]
+      assert response_json['errors'][0]['index'] == 1
+      assert 'version' in response_json
+
+  def test_batch_invalid_operation(self):
+    with app.test_client() as test_client:
+      response = test_client.post(
+        '/batch', json={
+          'operation': 'power',
+          'x': [1],
+          'y': [1]
+        }
+      )
+      response_json = json.loads(response.data)
+
+      assert response.status_code == 400
+      assert 'mssg' in response_json
+      assert 'version' in response_json
+
+  def test_expression(self):
+    with app.test_client() as test_client:
+      response = test_client.post(
+        '/expression', json={
+          'expression': 'x + y * 2',
+          'variables': [{ 'x': 1, 'y': 2 }, { 'x': 0, 'y': 5 }]
+        }
+      )
+      response_json = json.loads(response.data)
+
+      assert response.status_code == 200
+      assert response_json['results'] == ['5', '10']
+      assert 'version' in response_json
+
+  def test_expression_too_deep(self):
+    with app.test_client() as test_client:
+      response = test_client.post('/expression', json={'expression': '-' * 990 + '1', 'variables': [{}]})
+      response_json = json.loads(response.data)
+
+      assert response.status_code == 400
+      assert 'mssg' in response_json
+
+  def test_stream_operations(self):
+    with app.test_client() as test_client:
+      body = '\n'.join([
+        '{"op": "sum", "x": 1, "y": 2}',
+        '{"op": "divide", "x": 1, "y": 0}',
+        '{"op": "power", "x": 1, "y": 2}',
+        'no es json',
+        '{"op": "multiply", "x": 3, "y": 4}'
+      ])
+      response = test_client.post('/stream', data=body, content_type='application/x-ndjson')
+      lines = [json.loads(line) for line in response.data.decode().splitlines()]
+
+      assert response.status_code == 200
+      assert 'X-Version' in response.headers
+      assert lines[0] == { 'line': 1, 'op': 'sum', 'result': '3' }
+      assert [line.get('code') for line in lines[1:4]] == [400, 400, 400]
+      assert lines[4]['result'] == '12'
+
+  def test_dispatch_operation(self):
+    with app.test_client() as test_client:
+      response = test_client.post(
+        '/operations/multiply', json={
+          'x': 5,
+          'y': 6
+        }
+      )
+      response_json = json.loads(response.data)
+
+      assert response.status_code == 200
+      assert response_json['result'] == '30'
+      assert 'version' in response_json
+
+  def test_dispatch_unknown_operation(self):
+    with app.test_client() as test_client:
+      response = test_client.post(
+        '/operations/power', json={
+          'x': 5,
+          'y': 6
+        }
+      )
+
+      assert response.status_code == 400
+      assert 'mssg' in json.loads(response.data)
+  def test_metrics(self):
+    with app.test_client() as test_client:
+      test_client.post('/sum', json={ 'x': 1, 'y': 2 })
+      test_client.post('/sum', json={ 'x': 1, 'y': 2 })
+      response = test_client.get('/metrics')
+      body = response.data.decode()
+
+      assert response.status_code == 200
+      assert response.content_type.startswith('text/plain')
+      assert 'http_request_duration_seconds_count{method="POST",route="/sum",status="200"}' in body
+      assert 'http_requests_in_flight 1' in body
+      assert 'cache_hit_ratio{cache="memo"}' in body
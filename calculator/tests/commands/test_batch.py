@@ -0,0 +1,41 @@
+import pytest
+from src.commands.batch import Batch
+from src.commands.divide import Divide
+from src.commands.multiply import Multiply
+from src.commands.sum import Sum
+from src.errors.errors import InvalidOperation, InvalidOperands
+
+class TestBatch():
+  def test_sum_arrays(self):
+    results, errors = Batch('sum', [1, 2, 3], [4, 5, 6]).execute()
+    assert results == [5, 7, 9]
+    assert errors == []
+
+  def test_multiply_with_scalar(self):
+    results, errors = Batch('multiply', [1, 2, 3], 2).execute()
+    assert results == [2, 4, 6]
+
+  def test_divide_by_zero_per_element(self):
+    results, errors = Batch('divide', [6, 5, 4], [3, 0, 2]).execute()
+    assert results == [2, None, 2]
+    assert [error['index'] for error in errors] == [1]
+    assert errors[0]['code'] == 400
+
+  def test_matches_scalar_outside_int64(self):
+    # int64 desborda en silencio; el lote debe dar lo mismo que las operaciones escalares
+    x = [2 ** 62, -2 ** 63, 2 ** 64, 3]
+    y = [4, -1, 2 ** 64, 2 ** 62]
+    assert Batch('multiply', x, y).execute()[0] == [Multiply(a, b).execute() for a, b in zip(x, y)]
+    assert Batch('sum', x, y).execute()[0] == [Sum(a, b).execute() for a, b in zip(x, y)]
+    assert Batch('divide', x, y).execute()[0] == [Divide(a, b).execute() for a, b in zip(x, y)]
+    assert Batch('multiply', [2 ** 62], [4]).execute()[0] == [2 ** 64]
+
+  def test_invalid_operation(self):
+    with pytest.raises(InvalidOperation):
+      Batch('power', [1], [1]).execute()
+
+  def test_invalid_operands(self):
+    with pytest.raises(InvalidOperands):
+      Batch('sum', [1, 2], [1, 2, 3]).execute()
+    with pytest.raises(InvalidOperands):
+      Batch('sum', ['a'], [1]).execute()
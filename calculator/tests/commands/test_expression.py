@@ -0,0 +1,39 @@
+import pytest
+from src.commands.expression import Expression, compile_expression
+from src.errors.errors import CantDivideByZero, InvalidExpression, InvalidVariables, UndefinedVariable
+
+class TestExpression():
+  def test_evaluate_many_bindings(self):
+    result = Expression('x * (y + 2) - -1', [{ 'x': 2, 'y': 3 }, { 'x': 1.5, 'y': 0 }]).execute()
+    assert result == [11, 4.0]
+
+  def test_expression_is_cached(self):
+    compile_expression.cache_clear()
+    Expression('a / b', [{ 'a': 1, 'b': 2 }]).execute()
+    Expression('a / b', [{ 'a': 3, 'b': 4 }]).execute()
+    assert compile_expression.cache_info().hits == 1
+
+  def test_divide_by_zero(self):
+    with pytest.raises(CantDivideByZero):
+      Expression('x / (y - 1)', [{ 'x': 1, 'y': 1 }]).execute()
+
+  def test_invalid_expression(self):
+    with pytest.raises(InvalidExpression):
+      Expression('__import__("os")', [{}]).execute()
+    with pytest.raises(InvalidExpression):
+      Expression('2 ** 3', [{}]).execute()
+    with pytest.raises(InvalidExpression):
+      Expression('1 +', [{}]).execute()
+
+  def test_too_deep_expression(self):
+    with pytest.raises(InvalidExpression):
+      Expression('-' * 990 + '1', [{}]).execute()
+    with pytest.raises(InvalidExpression):
+      Expression('1' + ' + 1' * 150, [{}]).execute()
+    assert Expression('-' * 50 + '1', [{}]).execute() == [1]
+
+  def test_invalid_variables(self):
+    with pytest.raises(UndefinedVariable):
+      Expression('x + 1', [{}]).execute()
+    with pytest.raises(InvalidVariables):
+      Expression('x + 1', [{ 'x': '1' }]).execute()
@@ -0,0 +1,36 @@
+import pytest
+from src.commands.registry import CommandRegistry
+from src.errors.errors import CantDivideByZero, InvalidOperation
+
+class TestRegistry():
+  def test_execute_registered_command(self):
+    registry = CommandRegistry()
+    registry.register('sum', '.sum:Sum')
+    assert registry.execute('sum', 5, 6) == 11
+
+  def test_unknown_command(self):
+    with pytest.raises(InvalidOperation):
+      CommandRegistry().execute('power', 2, 3)
+
+  def test_memo_hits_and_misses(self):
+    registry = CommandRegistry(memo_size=2)
+    registry.register('multiply', '.multiply:Multiply')
+    registry.execute('multiply', 2, 3)
+    registry.execute('multiply', 2, 3)
+    assert registry.execute('multiply', 2.0, 3) == 6.0
+    assert registry.memo.stats()['hits'] == 1
+    assert registry.memo.stats()['misses'] == 2
+
+  def test_memo_is_bounded(self):
+    registry = CommandRegistry(memo_size=1)
+    registry.register('sum', '.sum:Sum')
+    registry.execute('sum', 1, 1)
+    registry.execute('sum', 2, 2)
+    assert registry.memo.stats()['size'] == 1
+
+  def test_errors_are_not_memoized(self):
+    registry = CommandRegistry(memo_size=2)
+    registry.register('divide', '.divide:Divide')
+    with pytest.raises(CantDivideByZero):
+      registry.execute('divide', 1, 0)
+    assert registry.memo.stats()['size'] == 0
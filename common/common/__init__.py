@@ -0,0 +1,7 @@
+"""
+Módulos compartidos por los microservicios Flask (users, posts, routes y offers).
+
+Se instala en cada imagen con `pip install ./common` (ver los Dockerfile) y se importa
+como `common.<módulo>`. El estado que guardan (cachés, métricas, réplicas) vive en
+memoria de cada proceso.
+"""
@@ -0,0 +1,67 @@
+"""Caché LRU con TTL en memoria del proceso; cada servicio crea sus instancias en su cache.py."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """Caché LRU con TTL de tokens ya validados (token -> datos del usuario)."""
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token):
+        """Retorna los datos cacheados del token o None si no existe o expiró."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return value
+
+    def set(self, token, value, max_age=None):
+        """Guarda los datos del token; max_age limita la vida de la entrada (en segundos)."""
+        ttl = self.ttl if max_age is None else min(self.ttl, max_age)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token):
+        """Elimina un token de la caché (por ejemplo al emitir uno nuevo)."""
+        if not token:
+            return
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def invalidate_user(self, user_id):
+        """Elimina todas las entradas de un usuario (por ejemplo al recibir user.updated)."""
+        with self._lock:
+            stale = [token for token, (value, _) in self._entries.items()
+                     if isinstance(value, dict) and value.get("id") == user_id]
+            for token in stale:
+                del self._entries[token]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
@@ -0,0 +1,65 @@
+"""
+Configuración del engine de SQLAlchemy común a los microservicios.
+
+El config.py de cada servicio la usa con su propio nombre (application_name y binds de
+réplicas). Todas las opciones se leen de variables de entorno:
+
+- DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT: tamaño del pool, conexiones extra
+  permitidas y segundos de espera por una conexión antes de fallar.
+- DB_POOL_RECYCLE, DB_POOL_PRE_PING: reciclaje de conexiones viejas y verificación
+  antes de usarlas.
+- DB_CONNECT_TIMEOUT: segundos para establecer la conexión.
+- DB_STATEMENT_TIMEOUT, DB_LOCK_TIMEOUT, DB_IDLE_IN_TRANSACTION_TIMEOUT: límites en
+  milisegundos aplicados por PostgreSQL a cada sesión (0 los desactiva).
+- DB_APPLICATION_NAME: nombre con el que la sesión aparece en pg_stat_activity.
+- DB_REPLICA_URIS: URIs de réplicas de solo lectura separadas por coma (ver replicas.py).
+"""
+import os
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def database_uri():
+    return (f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+            f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}")
+
+
+def session_settings():
+    """Parámetros de sesión de PostgreSQL que se envían al conectar (-c nombre=valor)."""
+    settings = {
+        "statement_timeout": _env_int("DB_STATEMENT_TIMEOUT", 10000),
+        "lock_timeout": _env_int("DB_LOCK_TIMEOUT", 5000),
+        "idle_in_transaction_session_timeout": _env_int("DB_IDLE_IN_TRANSACTION_TIMEOUT", 60000),
+    }
+    return " ".join(f"-c {name}={value}" for name, value in settings.items())
+
+
+def engine_options(service, uri):
+    """Opciones para SQLALCHEMY_ENGINE_OPTIONS; el pool y la sesión solo aplican a PostgreSQL."""
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+    }
+    if not uri.startswith("postgresql"):
+        return options
+
+    options.update({
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 10),
+        "connect_args": {
+            "application_name": os.getenv("DB_APPLICATION_NAME", service),
+            "connect_timeout": _env_int("DB_CONNECT_TIMEOUT", 5),
+            "options": session_settings(),
+        },
+    })
+    return options
+
+
+def replica_binds(service):
+    """Binds "replica_<n>" para SQLALCHEMY_BINDS, con las mismas opciones de engine."""
+    uris = [uri.strip() for uri in os.getenv("DB_REPLICA_URIS", "").split(",") if uri.strip()]
+    return {f"replica_{index}": {"url": uri, **engine_options(f"{service}-replica", uri)}
+            for index, uri in enumerate(uris)}
@@ -0,0 +1,22 @@
+"""Lectura de variables de entorno compartidas por los servicios."""
+import os
+
+
+def required_env(name):
+    """Valor de la variable `name`; falla al importar el módulo que la pide si no está definida.
+
+    Se usa para secretos, que no deben tener un valor por defecto utilizable.
+    """
+    value = os.getenv(name)
+    if not value:
+        raise RuntimeError(f"La variable de entorno {name} es obligatoria")
+    return value
+
+
+def web_workers():
+    """Número de workers de gunicorn por contenedor (WEB_WORKERS, por defecto cpu+1).
+
+    Los pools por proceso (por ejemplo el de hashing) lo usan para repartir los núcleos
+    entre los workers en lugar de crear cpu_count procesos en cada uno.
+    """
+    return int(os.getenv("WEB_WORKERS", (os.cpu_count() or 1) + 1))
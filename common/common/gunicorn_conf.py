@@ -0,0 +1,56 @@
+"""
+Configuración de gunicorn común a los microservicios Flask.
+
+El gunicorn.conf.py de cada servicio la importa (from common.gunicorn_conf import *) y
+define su propio `bind`. La aplicación se carga una sola vez en el proceso maestro
+(preload_app) y los workers la heredan al hacer fork; cada worker llama a
+app.init_worker() del servicio tras el fork. Un SIGHUP al maestro recarga los workers de
+forma gradual: los nuevos arrancan antes de que los anteriores terminen sus solicitudes.
+
+WEB_WORKERS (por defecto cpu+1, ver common.env.web_workers) y WEB_THREADS (4) definen
+cuántos procesos e hilos atienden solicitudes. Los hilos cubren la espera de E/S, así que
+para más concurrencia conviene subir WEB_THREADS antes que WEB_WORKERS.
+
+El estado en memoria NO se comparte entre workers: cada proceso tiene su propia copia y
+su costo en memoria, conexiones y tiempo de carga se multiplica por WEB_WORKERS:
+
+- Pool de conexiones a la base de datos (DB_POOL_SIZE + DB_MAX_OVERFLOW por worker).
+- Caché de tokens (TokenCache) y lista de tokens revocados.
+- Catálogo de trayectos de routes (RouteCatalog) y motor de emparejamiento de offers.
+- Pool de hashing de users (HASH_WORKERS procesos por worker).
+- Hilo y conexión LISTEN de posts (el feed lo atiende posts/src/feed_server.py aparte).
+- Métricas: cada worker deja las suyas en METRICS_DIR y /metrics responde con las de
+  todos (ver common.metrics).
+
+Las invalidaciones que deben llegar a todos los workers viajan por la base de datos
+(outbox, NOTIFY), nunca por memoria del proceso que atendió la solicitud.
+"""
+import os
+from common.env import web_workers
+
+os.environ.setdefault("METRICS_DIR", "/tmp/metrics")
+
+workers = web_workers()
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread"
+preload_app = True
+
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("WEB_KEEPALIVE", 5))
+# Reinicia cada worker tras N solicitudes (con jitter para no reiniciarlos a la vez)
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", 500))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    from common.metrics import clear_snapshots
+    clear_snapshots(os.environ["METRICS_DIR"])
+
+
+def post_fork(server, worker):
+    import app
+    app.init_worker()
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USERS_SERVICE_URL = os.getenv("USERS_SERVICE_URL", "http://users:5000")
+
+
+class CircuitOpen(Exception):
+    """Se lanza cuando el circuito está abierto y la llamada se descarta sin esperar."""
+
+
+class CircuitBreaker:
+    """Circuito simple: se abre tras `failure_threshold` fallos seguidos y deja pasar
+    una llamada de prueba cuando pasan `reset_timeout` segundos."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "half-open":
+                # Solo una llamada de prueba; las demás siguen fallando rápido
+                self.opened_at = time.monotonic()
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ServiceClient:
+    """Cliente HTTP para llamadas entre microservicios con pool de conexiones
+    keep-alive, timeouts acotados, reintentos de conexión y circuit breaker.
+
+    Solo se reintentan los fallos al conectar (cada intento dura como mucho
+    connect_timeout). Una respuesta lenta o un 5xx no se reintentan, así que una llamada
+    dura como mucho (retries + 1) * connect_timeout + read_timeout.
+    """
+
+    def __init__(self, base_url, connect_timeout=1.0, read_timeout=3.0, pool_size=20,
+                 retries=2, breaker=None, name=None):
+        self.base_url = base_url.rstrip("/")
+        self.name = name or self.base_url
+        # Función (servicio, estado, duración) que recibe la latencia de cada llamada
+        self.observer = None
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+
+        retry = Retry(total=retries, connect=retries, read=False, status=0, other=0,
+                      backoff_factor=0.1, allowed_methods=["GET"], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, path, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpen(self.base_url)
+
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure()
+            self._observe("error", started)
+            raise
+
+        self._observe(response.status_code, started)
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _observe(self, status, started):
+        if self.observer:
+            self.observer(self.name, status, time.perf_counter() - started)
+
+
+users_client = ServiceClient(
+    USERS_SERVICE_URL,
+    name="users",
+    connect_timeout=float(os.getenv("USERS_CONNECT_TIMEOUT", 1.0)),
+    read_timeout=float(os.getenv("USERS_READ_TIMEOUT", 3.0)),
+    pool_size=int(os.getenv("USERS_POOL_SIZE", 20)),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("USERS_BREAKER_THRESHOLD", 5)),
+        reset_timeout=float(os.getenv("USERS_BREAKER_RESET", 30))
+    )
+)
@@ -0,0 +1,287 @@
+"""
+Métricas del servicio en formato de exposición de texto de Prometheus (GET /metrics).
+
+No depende de un colector externo: los histogramas guardan conteos por bucket en
+memoria del proceso y solo se acumulan al renderizar, así que cada solicitud cuesta una
+búsqueda binaria y unas pocas sumas bajo un lock.
+
+Con varios workers de gunicorn cada proceso tiene sus propios contadores y un scrape
+solo llega a uno de ellos. Si METRICS_DIR está definido (gunicorn_conf lo define):
+
+- Cada worker escribe sus series en METRICS_DIR/<pid>.prom cada METRICS_SNAPSHOT_INTERVAL
+  segundos y al atender /metrics.
+- /metrics responde con las series de todos los workers vivos, cada una con la etiqueta
+  worker="<pid>". Los totales del servicio se obtienen en Prometheus con
+  sum without (worker) (...).
+- Los archivos de workers que ya terminaron se descartan y el maestro vacía el directorio
+  al arrancar.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", 5))
+
+
+def _labels(names, values):
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # valores de etiquetas -> [conteos por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                bucket_labels = _labels(self.label_names + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+request_latency = Histogram("http_request_duration_seconds", "Latencia de las solicitudes por ruta y estado",
+                            ("method", "route", "status"))
+outbound_latency = Histogram("http_client_request_duration_seconds", "Latencia de las llamadas a otros servicios",
+                             ("service", "status"))
+in_flight = Gauge("http_requests_in_flight", "Solicitudes en curso")
+
+_caches = {}
+_engines = []
+_collectors = []
+
+
+def register_cache(name, cache):
+    """Registra una caché que expone los contadores hits y misses."""
+    _caches[name] = cache
+
+
+def register_collector(collector):
+    """Registra una función que retorna líneas adicionales para /metrics."""
+    _collectors.append(collector)
+
+
+def observe_outbound(service, status, duration):
+    outbound_latency.observe((service, str(status)), duration)
+
+
+def _start_timer():
+    _ensure_snapshot_writer()
+    g.metrics_start = time.perf_counter()
+    in_flight.inc()
+
+
+def _observe_request(response):
+    started = g.get("metrics_start")
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        request_latency.observe((request.method, route, str(response.status_code)), time.perf_counter() - started)
+    return response
+
+
+def _end_request(error=None):
+    if g.pop("metrics_start", None) is not None:
+        in_flight.dec()
+
+
+def _pool_lines():
+    lines = []
+    for name, help_text, attribute in (("db_pool_checked_out", "Conexiones en uso", "checkedout"),
+                                       ("db_pool_overflow", "Conexiones sobre pool_size", "overflow"),
+                                       ("db_pool_size", "Tamaño configurado del pool", "size")):
+        # overflow() es negativo mientras el pool no está lleno
+        values = [(engine_name, max(getattr(engine.pool, attribute)(), 0)) for engine_name, engine in _engines
+                  if hasattr(engine.pool, attribute)]
+        if values:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{engine="{engine_name}"}} {value}' for engine_name, value in values]
+    return lines
+
+
+def _cache_lines():
+    if not _caches:
+        return []
+    lines = ["# HELP cache_hits_total Aciertos de caché", "# TYPE cache_hits_total counter"]
+    lines += [f'cache_hits_total{{cache="{name}"}} {cache.hits}' for name, cache in _caches.items()]
+    lines += ["# HELP cache_misses_total Fallos de caché", "# TYPE cache_misses_total counter"]
+    lines += [f'cache_misses_total{{cache="{name}"}} {cache.misses}' for name, cache in _caches.items()]
+    lines += ["# HELP cache_hit_ratio Proporción de aciertos de caché", "# TYPE cache_hit_ratio gauge"]
+    for name, cache in _caches.items():
+        lookups = cache.hits + cache.misses
+        lines.append(f'cache_hit_ratio{{cache="{name}"}} {cache.hits / lookups if lookups else 0:.4f}')
+    return lines
+
+
+def _process_lines():
+    lines = request_latency.render() + in_flight.render()
+    if outbound_latency._series:
+        lines += outbound_latency.render()
+    lines += _pool_lines() + _cache_lines()
+    for collector in _collectors:
+        lines += collector()
+    return lines
+
+
+def _with_worker(line, worker):
+    """Agrega worker="<pid>" a una muestra; los comentarios se dejan igual."""
+    if not line or line.startswith("#"):
+        return line
+    brace, space = line.find("{"), line.find(" ")
+    if brace != -1 and brace < space:
+        return f'{line[:brace + 1]}worker="{worker}",{line[brace + 1:]}'
+    return f'{line[:space]}{{worker="{worker}"}}{line[space:]}'
+
+
+def _snapshot_path(pid):
+    return os.path.join(os.environ["METRICS_DIR"], f"{pid}.prom")
+
+
+def write_snapshot():
+    """Escribe las series de este worker (reemplazo atómico del archivo anterior)."""
+    pid = os.getpid()
+    os.makedirs(os.environ["METRICS_DIR"], exist_ok=True)
+    temporary = _snapshot_path(pid) + ".tmp"
+    with open(temporary, "w") as snapshot:
+        snapshot.write("\n".join(_with_worker(line, pid) for line in _process_lines()))
+    os.replace(temporary, _snapshot_path(pid))
+
+
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def _ensure_snapshot_writer():
+    """Inicia el hilo que escribe las instantáneas; los hilos no sobreviven al fork."""
+    global _writer_pid
+    if not os.getenv("METRICS_DIR") or _writer_pid == os.getpid():
+        return
+    with _writer_lock:
+        if _writer_pid == os.getpid():
+            return
+        _writer_pid = os.getpid()
+
+    def loop():
+        while True:
+            time.sleep(METRICS_SNAPSHOT_INTERVAL)
+            try:
+                write_snapshot()
+            except OSError as error:
+                print(f"[!] No se pudo escribir la instantánea de métricas: {error}", flush=True)
+
+    threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _worker_lines():
+    """Líneas de todos los workers vivos; las del worker actual se escriben al momento."""
+    write_snapshot()
+    directory = os.environ["METRICS_DIR"]
+    lines = []
+    for name in sorted(os.listdir(directory)):
+        pid, extension = os.path.splitext(name)
+        if extension != ".prom" or not pid.isdigit():
+            continue
+        path = os.path.join(directory, name)
+        if not _alive(int(pid)):
+            os.remove(path)
+            continue
+        with open(path) as snapshot:
+            lines += snapshot.read().splitlines()
+    return lines
+
+
+def merge_families(lines):
+    """Agrupa las muestras por familia, con un solo HELP y TYPE por métrica."""
+    families = {}
+    current = None
+    for line in lines:
+        if line.startswith("# HELP ") or line.startswith("# TYPE "):
+            current = line.split(" ", 3)[2]
+            header, _ = families.setdefault(current, ({}, []))
+            header.setdefault(line[2:6], line)
+        elif line:
+            families.setdefault(current, ({}, []))[1].append(line)
+    merged = []
+    for header, samples in families.values():
+        merged += [header[kind] for kind in ("HELP", "TYPE") if kind in header] + samples
+    return merged
+
+
+def render_metrics():
+    lines = merge_families(_worker_lines()) if os.getenv("METRICS_DIR") else _process_lines()
+    return "\n".join(lines) + "\n"
+
+
+def clear_snapshots(directory):
+    """Vacía METRICS_DIR; lo llama el maestro de gunicorn antes de crear los workers."""
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith((".prom", ".tmp")):
+            os.remove(os.path.join(directory, name))
+
+
+def metrics_view():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app, db=None):
+    """Registra los hooks de la aplicación, los engines de db y el endpoint /metrics."""
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    app.teardown_request(_end_request)
+    if db is not None:
+        with app.app_context():
+            _engines.extend((name or "default", engine) for name, engine in db.engines.items())
+    app.add_url_rule("/metrics", "metrics", metrics_view)
@@ -0,0 +1,236 @@
+"""
+Outbox transaccional para publicar eventos de dominio con entrega al menos una vez.
+
+Las escrituras agregan su evento (add_event) a la tabla outbox_events en la misma
+transacción que el cambio, así que un evento existe si y solo si el cambio se confirmó.
+Un hilo por worker (start_dispatcher) toma los eventos pendientes en orden, los publica
+en el broker local y los envía por POST a cada webhook de OUTBOX_WEBHOOKS; solo cuando
+todos responden 2xx se marcan como entregados. Con PostgreSQL un advisory lock de sesión
+deja a un solo worker entregando a la vez, así que el orden se conserva entre workers.
+Las llamadas a los webhooks ocurren fuera de toda transacción: el lote se lee y su estado
+se guarda en transacciones cortas.
+
+Un fallo deja el evento pendiente (y detrás de él a los siguientes) y se reintenta con
+espera exponencial, por lo que los suscriptores pueden recibir duplicados y deben ser
+idempotentes (cada evento lleva un id estable). Tras OUTBOX_MAX_ATTEMPTS intentos el
+evento pasa a dead-letter (dead_lettered_at) y la entrega sigue con los siguientes; queda
+en la tabla para revisarlo o reencolarlo (dead_lettered_at = NULL, attempts = 0).
+
+Cada cuerpo se firma con HMAC-SHA256 usando OUTBOX_SECRET (encabezado
+X-Outbox-Signature; obligatoria en quien publica y en quien recibe). Variables de entorno:
+
+- OUTBOX_WEBHOOKS: URLs separadas por coma que reciben los eventos.
+- OUTBOX_INTERVAL, OUTBOX_BATCH, OUTBOX_TIMEOUT: segundos entre ciclos, eventos por ciclo
+  y segundos de espera por webhook.
+- OUTBOX_MAX_BACKOFF: máximo de segundos entre reintentos de un evento.
+- OUTBOX_MAX_ATTEMPTS: intentos antes de mover un evento a dead-letter.
+- OUTBOX_RETENTION: segundos que se conservan los eventos ya entregados.
+
+Lo usan users y routes, cada uno con su propio modelo OutboxEvent.
+"""
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import requests
+from sqlalchemy import delete, select, text, update
+from common.env import required_env
+
+OUTBOX_SECRET = required_env("OUTBOX_SECRET")
+OUTBOX_INTERVAL = float(os.getenv("OUTBOX_INTERVAL", 1))
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", 50))
+OUTBOX_TIMEOUT = float(os.getenv("OUTBOX_TIMEOUT", 2))
+OUTBOX_MAX_BACKOFF = float(os.getenv("OUTBOX_MAX_BACKOFF", 60))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 10))
+OUTBOX_RETENTION = float(os.getenv("OUTBOX_RETENTION", 86400))
+OUTBOX_LOCK_KEY = 7242301
+
+
+def outbox_webhooks():
+    return [url.strip() for url in os.getenv("OUTBOX_WEBHOOKS", "").split(",") if url.strip()]
+
+
+def sign(body, secret=OUTBOX_SECRET):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature, secret=OUTBOX_SECRET):
+    """Lado del suscriptor: valida el encabezado X-Outbox-Signature de un cuerpo recibido."""
+    return bool(signature) and hmac.compare_digest(sign(body, secret), signature)
+
+
+def add_event(session, model, event_type, aggregate_id, payload):
+    """Agrega un evento a la transacción en curso; se confirma junto con el cambio."""
+    event = model(event_type=event_type, aggregate_id=str(aggregate_id), payload=payload)
+    session.add(event)
+    return event
+
+
+class LocalBroker:
+    """Broker en memoria del proceso: reemplazo local de una cola de mensajes."""
+
+    def __init__(self):
+        self._handlers = []
+
+    def subscribe(self, handler, event_types=None):
+        """Registra `handler(evento)`; event_types limita los tipos recibidos (None = todos)."""
+        self._handlers.append((handler, set(event_types) if event_types else None))
+
+    def publish(self, event):
+        for handler, event_types in list(self._handlers):
+            if event_types is None or event["type"] in event_types:
+                handler(event)
+
+    def clear(self):
+        self._handlers.clear()
+
+
+local_broker = LocalBroker()
+
+
+class OutboxDispatcher:
+    def __init__(self, model, source, webhooks=None, broker=local_broker, batch_size=OUTBOX_BATCH,
+                 timeout=OUTBOX_TIMEOUT, max_backoff=OUTBOX_MAX_BACKOFF, max_attempts=OUTBOX_MAX_ATTEMPTS,
+                 secret=OUTBOX_SECRET):
+        self.model = model
+        self.source = source
+        self.webhooks = outbox_webhooks() if webhooks is None else webhooks
+        self.broker = broker
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.secret = secret
+        self.http = requests.Session()
+        self.delivered = 0
+        self.failed = 0
+        self.dead_lettered = 0
+
+    def to_event(self, row):
+        return {
+            "id": f"{self.source}-{row.id}",
+            "source": self.source,
+            "type": row.event_type,
+            "aggregateId": row.aggregate_id,
+            "payload": row.payload,
+            "createdAt": row.created_at.isoformat() if isinstance(row.created_at, datetime) else row.created_at
+        }
+
+    def deliver(self, event):
+        """Publica un evento en el broker y en cada webhook; lanza si alguno falla."""
+        if self.broker is not None:
+            self.broker.publish(event)
+        body = json.dumps(event).encode()
+        headers = {"Content-Type": "application/json", "X-Outbox-Event-Id": event["id"],
+                   "X-Outbox-Signature": sign(body, self.secret)}
+        for url in self.webhooks:
+            response = self.http.post(url, data=body, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+
+    def _pending(self):
+        return self.model.delivered_at.is_(None) & self.model.dead_lettered_at.is_(None)
+
+    def dispatch(self, session):
+        """Entrega un lote de eventos pendientes; retorna cuántos se entregaron."""
+        engine = session.get_bind()
+        if engine.dialect.name != "postgresql":
+            return self._dispatch_batch(session)
+
+        with engine.connect() as conn:
+            # Lock de sesión en una conexión aparte: no deja una transacción abierta
+            # mientras esperan los webhooks
+            locked = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": OUTBOX_LOCK_KEY}).scalar()
+            conn.commit()
+            if not locked:
+                return 0  # Otro worker está entregando
+            try:
+                return self._dispatch_batch(session)
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": OUTBOX_LOCK_KEY})
+                conn.commit()
+
+    def _dispatch_batch(self, session):
+        model = self.model
+        now = datetime.utcnow()
+        rows = session.execute(
+            select(model).where(self._pending()).order_by(model.id).limit(self.batch_size)
+        ).scalars().all()
+        batch = [(row.id, row.attempts or 0, row.next_attempt_at, self.to_event(row)) for row in rows]
+        session.commit()
+
+        delivered = []
+        failures = {}
+        for event_id, attempts, next_attempt_at, event in batch:
+            # Los eventos se entregan en orden: uno en espera de reintento detiene a los siguientes
+            if next_attempt_at is not None and next_attempt_at > now:
+                break
+            try:
+                self.deliver(event)
+            except Exception as error:
+                self.failed += 1
+                attempts += 1
+                failures[event_id] = {"attempts": attempts, "last_error": str(error)[:255]}
+                if attempts >= self.max_attempts:
+                    # Dead-letter: deja de bloquear a los eventos siguientes
+                    failures[event_id]["dead_lettered_at"] = now
+                    self.dead_lettered += 1
+                    continue
+                failures[event_id]["next_attempt_at"] = now + timedelta(
+                    seconds=min(2 ** attempts, self.max_backoff))
+                break
+            delivered.append(event_id)
+
+        if delivered:
+            session.execute(update(model).where(model.id.in_(delivered)).values(delivered_at=now))
+        for event_id, values in failures.items():
+            session.execute(update(model).where(model.id == event_id).values(**values))
+        session.commit()
+        self.delivered += len(delivered)
+        return len(delivered)
+
+    def purge(self, session, retention=OUTBOX_RETENTION):
+        """Elimina los eventos entregados hace más de `retention` segundos."""
+        cutoff = datetime.utcnow() - timedelta(seconds=retention)
+        session.execute(delete(self.model).where(self.model.delivered_at < cutoff))
+        session.commit()
+
+    def pending(self, session):
+        return session.query(self.model).filter(self._pending()).count()
+
+    def metric_lines(self):
+        return ["# HELP outbox_events_delivered_total Eventos del outbox entregados",
+                "# TYPE outbox_events_delivered_total counter",
+                f"outbox_events_delivered_total {self.delivered}",
+                "# HELP outbox_delivery_failures_total Intentos de entrega fallidos",
+                "# TYPE outbox_delivery_failures_total counter",
+                f"outbox_delivery_failures_total {self.failed}",
+                "# HELP outbox_events_dead_lettered_total Eventos movidos a dead-letter tras OUTBOX_MAX_ATTEMPTS intentos",
+                "# TYPE outbox_events_dead_lettered_total counter",
+                f"outbox_events_dead_lettered_total {self.dead_lettered}"]
+
+
+def start_dispatcher(app, db, dispatcher, interval=OUTBOX_INTERVAL):
+    """Inicia el hilo que entrega los eventos del outbox; retorna el Event para detenerlo."""
+    def loop():
+        purged_at = 0.0
+        while not stop.is_set():
+            delivered = 0
+            try:
+                with app.app_context():
+                    delivered = dispatcher.dispatch(db.session)
+                    if time.monotonic() - purged_at >= 3600:
+                        dispatcher.purge(db.session)
+                        purged_at = time.monotonic()
+            except Exception as error:
+                print(f"[!] Error al entregar eventos del outbox: {error}", flush=True)
+            # Con un lote completo se sigue de inmediato; si no, se espera al siguiente ciclo
+            if delivered < dispatcher.batch_size:
+                stop.wait(interval)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=loop, name="outbox-dispatcher", daemon=True)
+    thread.start()
+    return stop
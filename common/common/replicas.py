@@ -0,0 +1,144 @@
+"""
+Enrutamiento de lecturas a réplicas de la base de datos.
+
+Las réplicas se configuran como binds "replica_<n>" (DB_REPLICA_URIS, ver db_config.py).
+RoutingSession envía a una réplica las consultas de las solicitudes GET/HEAD, elegida en
+round-robin una vez por solicitud entre las réplicas sanas. Las escrituras (flush del ORM
+o sentencias INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE) van siempre al primario y, desde
+ese momento, el resto de las lecturas de la solicitud también.
+
+Una réplica puede no tener todavía lo que otra solicitud acaba de escribir (por ejemplo el
+token recién emitido por POST /users/auth). Las lecturas que deben ver esas escrituras se
+hacen dentro de `with primary_reads():`, que las envía al primario.
+
+La salud y el retraso de cada réplica se verifican como mucho cada REPLICA_CHECK_INTERVAL
+segundos; una réplica que falla o se atrasa más de REPLICA_MAX_LAG segundos se excluye
+hasta la siguiente verificación exitosa.
+"""
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", 5))
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", 0.5))
+READ_METHODS = ("GET", "HEAD")
+
+# Segundos desde la última transacción aplicada; 0 si la réplica ya aplicó todo lo recibido
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, key):
+        self.key = key
+        self.healthy = True
+        self.lag = None
+
+
+class ReplicaRouter:
+    def __init__(self, check_interval=REPLICA_CHECK_INTERVAL, max_lag=REPLICA_MAX_LAG):
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.replicas = []
+        self.checked_at = 0.0
+        self._counter = itertools.count()
+        self._check_lock = threading.Lock()
+
+    def configure(self, bind_keys):
+        self.replicas = [Replica(key) for key in sorted(bind_keys) if key and key.startswith("replica_")]
+        self.checked_at = 0.0
+
+    def check(self, engines):
+        """Mide el retraso de cada réplica y actualiza su estado."""
+        for replica in self.replicas:
+            engine = engines[replica.key]
+            try:
+                with engine.connect() as conn:
+                    lag = float(conn.execute(LAG_QUERY if engine.dialect.name == "postgresql"
+                                             else text("SELECT 0")).scalar())
+                replica.lag = lag
+                replica.healthy = lag <= self.max_lag
+            except Exception as error:
+                replica.healthy = False
+                print(f"[!] Réplica {replica.key} no disponible: {error}", flush=True)
+        self.checked_at = time.monotonic()
+
+    def _check_if_due(self, engines):
+        if time.monotonic() - self.checked_at < self.check_interval:
+            return
+        # Un solo hilo verifica; los demás usan el último estado conocido
+        if self._check_lock.acquire(blocking=False):
+            try:
+                if time.monotonic() - self.checked_at >= self.check_interval:
+                    self.check(engines)
+            finally:
+                self._check_lock.release()
+
+    def pick(self, engines):
+        """Engine de la siguiente réplica sana o None para usar el primario."""
+        if not self.replicas:
+            return None
+        self._check_if_due(engines)
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return engines[healthy[next(self._counter) % len(healthy)].key]
+
+    def metric_lines(self):
+        if not self.replicas:
+            return []
+        lines = ["# HELP db_replica_lag_seconds Retraso de la réplica respecto al primario",
+                 "# TYPE db_replica_lag_seconds gauge"]
+        lines += [f'db_replica_lag_seconds{{replica="{replica.key}"}} {replica.lag}'
+                  for replica in self.replicas if replica.lag is not None]
+        lines += ["# HELP db_replica_healthy Réplica disponible para lecturas (1) o excluida (0)",
+                  "# TYPE db_replica_healthy gauge"]
+        lines += [f'db_replica_healthy{{replica="{replica.key}"}} {int(replica.healthy)}'
+                  for replica in self.replicas]
+        return lines
+
+
+replica_router = ReplicaRouter()
+
+
+def _is_write(clause):
+    return clause is not None and (getattr(clause, "is_dml", False)
+                                   or getattr(clause, "_for_update_arg", None) is not None)
+
+
+class RoutingSession(Session):
+    """Sesión de Flask-SQLAlchemy que usa una réplica para las lecturas de GET/HEAD."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or _is_write(clause):
+                g.db_wrote = True
+            elif request.method in READ_METHODS and not g.get("db_wrote") and not g.get("db_primary"):
+                if "db_replica" not in g:
+                    g.db_replica = replica_router.pick(self._db.engines)
+                if g.db_replica is not None:
+                    return g.db_replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def primary_reads():
+    """Envía al primario las lecturas del bloque (lectura de lo recién escrito)."""
+    previous = g.get("db_primary", False)
+    g.db_primary = True
+    try:
+        yield
+    finally:
+        g.db_primary = previous
+
+
+def init_replicas(app):
+    """Toma las réplicas de los binds configurados (SQLALCHEMY_BINDS)."""
+    replica_router.configure(app.config.get("SQLALCHEMY_BINDS", {}).keys())
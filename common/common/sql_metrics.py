@@ -0,0 +1,106 @@
+"""
+Instrumentación de SQL por solicitud.
+
+Se engancha a los eventos before/after_cursor_execute de los engines del servicio y
+acumula en flask.g la cantidad de consultas, el tiempo total en base de datos y las
+sentencias lentas. Las formas de consulta repetidas dentro de una misma solicitud
+(patrón N+1) se marcan. El resultado se expone en encabezados de la respuesta y en el
+logger "sql_metrics".
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", 100))
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", 3))
+SQL_METRICS = os.getenv("SQL_METRICS", "true").lower() == "true"
+
+logger = logging.getLogger("sql_metrics")
+
+# Las listas IN expandidas (?, ?, ?) o (%(id_1)s, %(id_2)s) se reducen a una sola forma
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def query_shape(statement):
+    return _SPACES.sub(" ", _IN_LIST.sub("(?)", statement)).strip()
+
+
+def _stats():
+    if "sql_stats" not in g:
+        g.sql_stats = {"count": 0, "time": 0.0, "shapes": Counter(), "slow": []}
+    return g.sql_stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    if not has_request_context():
+        return
+    elapsed = (time.perf_counter() - started) * 1000
+    stats = _stats()
+    stats["count"] += 1
+    stats["time"] += elapsed
+    stats["shapes"][query_shape(statement)] += 1
+    if elapsed >= SQL_SLOW_MS:
+        stats["slow"].append((round(elapsed, 2), query_shape(statement)))
+
+
+def _handle_error(context):
+    # after_cursor_execute no se llama cuando la sentencia falla
+    starts = context.connection.info.get("query_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def repeated_shapes(stats):
+    return {shape: count for shape, count in stats["shapes"].items() if count >= SQL_REPEAT_THRESHOLD}
+
+
+def add_sql_headers(response):
+    """Encabezados con el resumen de SQL de la solicitud y registro en el log."""
+    stats = g.get("sql_stats")
+    if not stats:
+        return response
+
+    repeated = repeated_shapes(stats)
+    response.headers["X-DB-Queries"] = str(stats["count"])
+    response.headers["X-DB-Time"] = f"{stats['time']:.2f}"
+    if repeated:
+        response.headers["X-DB-Repeated"] = str(max(repeated.values()))
+    metric = f"db;dur={stats['time']:.2f}"
+    previous = response.headers.get("Server-Timing")
+    response.headers["Server-Timing"] = f"{previous}, {metric}" if previous else metric
+
+    summary = {"method": request.method, "path": request.path, "queries": stats["count"],
+               "dbTimeMs": round(stats["time"], 2)}
+    for shape, count in repeated.items():
+        logger.warning("Posible N+1: %s ejecutada %d veces en %s %s", shape, count, request.method, request.path)
+    for elapsed, shape in stats["slow"]:
+        logger.warning("Consulta lenta (%.2f ms) en %s %s: %s", elapsed, request.method, request.path, shape)
+    logger.info("SQL por solicitud %s", summary)
+    return response
+
+
+def init_sql_metrics(app, db):
+    """Instrumenta los engines de db y registra el after_request de la aplicación."""
+    if not SQL_METRICS:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+    app.after_request(add_sql_headers)
@@ -0,0 +1,113 @@
+"""
+Tokens firmados y autoverificables compartidos por users, posts y routes.
+
+users emite tokens con el id y el estado del usuario firmados con TOKEN_SECRET
+(obligatoria y con el mismo valor en todos los servicios); posts y routes los validan
+localmente sin llamar a users. Los tokens reemplazados
+o de usuarios con cambios de estado se publican en GET /users/tokens/revoked y cada
+servicio refresca esa lista cada REVOCATION_REFRESH segundos en un hilo de fondo, así
+que validar un token nunca espera una llamada de red.
+"""
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+import requests
+from itsdangerous import BadSignature, URLSafeSerializer
+from common.env import required_env
+from common.http_client import CircuitOpen, users_client
+
+TOKEN_SECRET = required_env("TOKEN_SECRET")
+REVOCATION_REFRESH = float(os.getenv("REVOCATION_REFRESH", 30))
+
+_serializer = URLSafeSerializer(TOKEN_SECRET, salt="users-token")
+
+
+def is_signed_token(token):
+    """Los tokens opacos son hexadecimales; los firmados llevan payload y firma separados por '.'."""
+    return bool(token) and "." in token
+
+
+def issue_token(user_id, status, expire_at):
+    """Genera un token firmado; retorna (token, jti)."""
+    jti = secrets.token_hex(8)
+    token = _serializer.dumps({
+        "id": str(user_id),
+        "status": status,
+        "exp": int(expire_at.replace(tzinfo=timezone.utc).timestamp()),
+        "jti": jti
+    })
+    return token, jti
+
+
+def read_claims(token):
+    """Retorna los claims de un token con firma válida (sin revisar expiración ni revocación)."""
+    try:
+        return _serializer.loads(token)
+    except BadSignature:
+        return None
+
+
+def verify_token(token, revocations=None):
+    """Valida firma, expiración y revocación. Retorna {"id", "status"} o None."""
+    claims = read_claims(token)
+    if not claims or claims.get("exp", 0) < time.time():
+        return None
+
+    revocations = revocations if revocations is not None else revocation_list
+    if revocations and revocations.is_revoked(claims.get("jti")):
+        return None
+
+    return {"id": claims["id"], "status": claims["status"]}
+
+
+class RevocationList:
+    """Conjunto de jti revocados que un hilo de fondo refresca periódicamente desde users.
+
+    is_revoked solo consulta el conjunto vigente. El hilo se inicia con la primera consulta
+    de cada proceso (los hilos no sobreviven al fork de los workers) y usa el cliente con
+    pool de conexiones y circuit breaker hacia users.
+    """
+
+    def __init__(self, client, path, refresh_interval):
+        self.client = client
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self._revoked = frozenset()
+        self._thread_pid = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        self._ensure_refresher()
+        return jti in self._revoked
+
+    def refresh(self):
+        try:
+            response = self.client.get(self.path)
+            if response.status_code == 200:
+                self._revoked = frozenset(response.json().get("revoked", []))
+        except (requests.exceptions.RequestException, CircuitOpen):
+            pass  # Se conserva la última lista conocida
+
+    def _ensure_refresher(self):
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+
+        def loop():
+            while True:
+                self.refresh()
+                time.sleep(self.refresh_interval)
+
+        threading.Thread(target=loop, name="token-revocations", daemon=True).start()
+
+
+revocation_list = RevocationList(users_client, "/users/tokens/revoked", REVOCATION_REFRESH)
+
+
+def expire_at_from_claims(claims):
+    return datetime.fromtimestamp(claims["exp"], tz=timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,13 @@
+from common.cache import TokenCache
+
+
+### 🧪 TEST: Un evento de users descarta todos los tokens cacheados del usuario ###
+def test_token_cache_invalidate_user():
+    cache = TokenCache(ttl=3600)
+    cache.set("old", {"id": "u1", "status": "VERIFICADO"})
+    cache.set("new", {"id": "u1", "status": "VERIFICADO"})
+    cache.set("other", {"id": "u2", "status": "VERIFICADO"})
+
+    assert cache.invalidate_user("u1") == 2
+    assert cache.get("old") is None and cache.get("new") is None
+    assert cache.get("other") == {"id": "u2", "status": "VERIFICADO"}
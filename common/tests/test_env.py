@@ -0,0 +1,22 @@
+import os
+import pytest
+from common.env import required_env, web_workers
+
+
+### 🧪 TEST: Un secreto sin definir detiene el arranque ###
+def test_required_env(monkeypatch):
+    monkeypatch.delenv("TOKEN_SECRET", raising=False)
+    with pytest.raises(RuntimeError):
+        required_env("TOKEN_SECRET")
+
+    monkeypatch.setenv("TOKEN_SECRET", "secreto")
+    assert required_env("TOKEN_SECRET") == "secreto"
+
+
+### 🧪 TEST: WEB_WORKERS define cuántos workers comparten los núcleos ###
+def test_web_workers(monkeypatch):
+    monkeypatch.setenv("WEB_WORKERS", "3")
+    assert web_workers() == 3
+
+    monkeypatch.delenv("WEB_WORKERS")
+    assert web_workers() == (os.cpu_count() or 1) + 1
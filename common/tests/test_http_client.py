@@ -0,0 +1,80 @@
+import time
+import pytest
+import requests
+from common.http_client import CircuitBreaker, CircuitOpen, ServiceClient
+
+
+### 🧪 TEST: El circuito se abre tras los fallos consecutivos ###
+def test_circuit_breaker_opens_after_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+### 🧪 TEST: Tras el reset_timeout se permite una sola llamada de prueba ###
+def test_circuit_breaker_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+### 🧪 TEST: El cliente falla rápido con el circuito abierto ###
+def test_service_client_fails_fast():
+    client = ServiceClient("http://127.0.0.1:9", connect_timeout=0.2, retries=0,
+                           breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30))
+
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get("/users/me")
+    with pytest.raises(CircuitOpen):
+        client.get("/users/me")
+
+
+### 🧪 TEST: La latencia de las llamadas salientes se reporta al observador ###
+def test_service_client_observer():
+    observed = []
+    client = ServiceClient("http://127.0.0.1:9", connect_timeout=0.2, retries=0, name="users")
+    client.observer = lambda service, status, duration: observed.append((service, status))
+
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get("/users/me")
+    assert observed == [("users", "error")]
+
+
+### 🧪 TEST: Una respuesta lenta no se reintenta: la llamada dura como mucho un read_timeout ###
+def test_service_client_does_not_retry_reads():
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    received = []
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            received.append(self.path)
+            time.sleep(0.3)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = ServiceClient(f"http://127.0.0.1:{server.server_port}", read_timeout=0.1, retries=2)
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.get("/users/me")
+        assert received == ["/users/me"]
+    finally:
+        server.shutdown()
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from common import metrics
+
+
+### 🧪 TEST: /metrics junta las series de todos los workers vivos, etiquetadas por worker ###
+def test_metrics_merge_worker_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "_collectors", [lambda: ["# HELP demo_total Demo",
+                                                          "# TYPE demo_total counter",
+                                                          "demo_total 3"]])
+    other = os.getppid()
+    (tmp_path / f"{other}.prom").write_text(
+        f'# HELP demo_total Demo\n# TYPE demo_total counter\ndemo_total{{worker="{other}"}} 5')
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    (tmp_path / f"{finished.pid}.prom").write_text(f'demo_total{{worker="{finished.pid}"}} 7')
+
+    lines = metrics.render_metrics().splitlines()
+
+    assert lines.count("# TYPE demo_total counter") == 1
+    assert f'demo_total{{worker="{os.getpid()}"}} 3' in lines
+    assert f'demo_total{{worker="{other}"}} 5' in lines
+    assert not any(f'worker="{finished.pid}"' in line for line in lines)
+    assert not (tmp_path / f"{finished.pid}.prom").exists()
+    assert any(line.startswith(f'http_requests_in_flight{{worker="{os.getpid()}"}}') for line in lines)
+
+
+def test_with_worker_keeps_existing_labels():
+    assert metrics._with_worker('a_bucket{le="0.1"} 2', 9) == 'a_bucket{worker="9",le="0.1"} 2'
+    assert metrics._with_worker("a_total 2", 9) == 'a_total{worker="9"} 2'
+    assert metrics._with_worker("# TYPE a_total counter", 9) == "# TYPE a_total counter"
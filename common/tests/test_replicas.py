@@ -0,0 +1,48 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from common.replicas import RoutingSession, init_replicas, primary_reads, replica_router
+
+
+### 🧪 TEST: Lecturas de GET a la réplica; escrituras y lecturas posteriores al primario ###
+def test_replica_routing(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path}/primary.db"
+    app.config["SQLALCHEMY_BINDS"] = {"replica_0": f"sqlite:///{tmp_path}/replica.db"}
+    db = SQLAlchemy(app, session_options={"class_": RoutingSession})
+    init_replicas(app)
+    with app.app_context():
+        for engine, name in ((db.engines[None], "primary"), (db.engines["replica_0"], "replica")):
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE source (name TEXT)"))
+                conn.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+
+    def read():
+        return db.session.execute(text("SELECT name FROM source")).scalar()
+
+    @app.route("/read", methods=["GET", "POST"])
+    def read_view():
+        return read()
+
+    @app.route("/read-after-write")
+    def read_after_write():
+        before = read()
+        db.session.execute(db.table("source", db.column("name")).insert().values(name="primary"))
+        return f"{before},{read()}"
+
+    @app.route("/read-primary")
+    def read_primary():
+        with primary_reads():
+            pinned = read()
+        return f"{pinned},{read()}"
+
+    client = app.test_client()
+    assert client.get("/read").data == b"replica"
+    assert client.get("/read-primary").data == b"primary,replica"
+    assert client.post("/read").data == b"primary"
+    assert client.get("/read-after-write").data == b"replica,primary"
+
+    replica_router.replicas[0].healthy = False
+    replica_router.checked_at = float("inf")
+    assert client.get("/read").data == b"primary"
+    replica_router.configure([])
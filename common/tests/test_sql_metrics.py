@@ -0,0 +1,28 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from common.sql_metrics import init_sql_metrics, query_shape
+
+
+### 🧪 TEST: Las listas IN de distinto largo comparten la misma forma ###
+def test_query_shape():
+    assert query_shape("SELECT * FROM posts WHERE id IN (?, ?, ?)") == query_shape("SELECT *\n FROM posts WHERE id IN (?)")
+
+
+### 🧪 TEST: Conteo de consultas y detección de formas repetidas por solicitud ###
+def test_sql_metrics_headers():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db = SQLAlchemy(app)
+    init_sql_metrics(app, db)
+
+    @app.route("/n-plus-one")
+    def n_plus_one():
+        for value in range(4):
+            db.session.execute(text("SELECT :value"), {"value": value})
+        return "ok"
+
+    response = app.test_client().get("/n-plus-one")
+    assert response.headers["X-DB-Queries"] == "4"
+    assert response.headers["X-DB-Repeated"] == "4"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
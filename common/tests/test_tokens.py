@@ -0,0 +1,33 @@
+import os
+import threading
+import time
+# Secreto obligatorio (ver common/env.py) antes de importar el módulo que lo lee
+os.environ.setdefault("TOKEN_SECRET", "test-token-secret")
+from common.tokens import RevocationList
+
+
+### 🧪 TEST: La lista de revocación se refresca en segundo plano sin bloquear la validación ###
+def test_revocation_list_refreshes_in_background():
+    release = threading.Event()
+
+    class SlowResponse:
+        status_code = 200
+
+        def json(self):
+            return {"revoked": ["jti-1"]}
+
+    class SlowClient:
+        def get(self, path):
+            release.wait(5)
+            return SlowResponse()
+
+    revocations = RevocationList(SlowClient(), "/users/tokens/revoked", refresh_interval=60)
+    started = time.perf_counter()
+    assert not revocations.is_revoked("jti-1")
+    assert time.perf_counter() - started < 0.1
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while not revocations.is_revoked("jti-1") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert revocations.is_revoked("jti-1")
@@ -0,0 +1,35 @@
+-- Crear la tabla offers
+CREATE TABLE IF NOT EXISTS offers (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    post_id UUID NOT NULL,
+    user_id UUID NOT NULL,
+    description VARCHAR(140) NOT NULL,
+    size VARCHAR(10) NOT NULL CHECK (size IN ('LARGE', 'MEDIUM', 'SMALL')),
+    fragile BOOLEAN NOT NULL,
+    offer NUMERIC(12, 2) NOT NULL CHECK (offer >= 0),
+    version INTEGER NOT NULL DEFAULT 1,  -- Control de concurrencia optimista
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Índices: (post_id, offer) sirve al filtro por publicación y al cálculo de la mejor oferta
+CREATE INDEX IF NOT EXISTS idx_offers_post_id_offer ON offers(post_id, offer);
+CREATE INDEX IF NOT EXISTS idx_offers_user_id ON offers(user_id);
+
+-- Agregados por publicación mantenidos en cada escritura
+CREATE TABLE IF NOT EXISTS offer_post_stats (
+    post_id UUID PRIMARY KEY,
+    offer_count INTEGER NOT NULL DEFAULT 0,
+    total_offer NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    best_offer NUMERIC(12, 2),
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Registro de cambios de ofertas que cada worker aplica a su motor de emparejamiento
+CREATE TABLE IF NOT EXISTS offer_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(30) NOT NULL,
+    offer_ids JSON NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_offer_events_created_at ON offer_events(created_at);
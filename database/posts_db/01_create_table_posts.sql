@@ -1,13 +1,53 @@
-# 📌 Creación de la tabla posts en PostgreSQL
+-- 📌 Creación de la tabla posts en PostgreSQL, particionada por rango de expire_at.
+-- La llave primaria incluye expire_at porque PostgreSQL exige la columna de partición.
 CREATE TABLE IF NOT EXISTS posts (
-    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
     route_id UUID NOT NULL,
     user_id UUID NOT NULL,
     expire_at TIMESTAMP NOT NULL,
-    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, expire_at)
+) PARTITION BY RANGE (expire_at);
 
-# 📌 Índices para mejorar la búsqueda
+-- 📌 Partición por defecto para fechas fuera de las particiones mensuales
+CREATE TABLE IF NOT EXISTS posts_default PARTITION OF posts DEFAULT;
+
+-- 📌 Crea la partición mensual posts_pYYYYMM que contiene la fecha indicada.
+-- Las filas de ese mes que ya estén en posts_default se mueven a la nueva partición
+-- (crear la partición directamente fallaría porque la default ya las contiene).
+CREATE OR REPLACE FUNCTION create_posts_partition(month_start DATE)
+RETURNS VOID AS $$
+DECLARE
+    start_date DATE := date_trunc('month', month_start);
+    end_date DATE := start_date + INTERVAL '1 month';
+    partition_name TEXT := 'posts_p' || to_char(start_date, 'YYYYMM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE posts INCLUDING DEFAULTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM posts_default WHERE expire_at >= %L AND expire_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        start_date, end_date, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE posts ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_date, end_date
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- 📌 Particiones del mes anterior y los próximos 12 meses; el archivador crea las siguientes
+SELECT create_posts_partition((date_trunc('month', NOW()) + (n || ' month')::INTERVAL)::DATE)
+FROM generate_series(-1, 12) AS n;
+
+-- 📌 Esquema donde se mueven las particiones expiradas
+CREATE SCHEMA IF NOT EXISTS posts_archive;
+
+-- 📌 Índices para mejorar la búsqueda (se propagan a cada partición)
 CREATE INDEX IF NOT EXISTS idx_posts_user_id ON posts(user_id);
 CREATE INDEX IF NOT EXISTS idx_posts_route_id ON posts(route_id);
-CREATE INDEX IF NOT EXISTS idx_posts_expire_at ON posts(expire_at);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_posts_expire_at ON posts(expire_at);
+CREATE INDEX IF NOT EXISTS idx_posts_created_at_id ON posts(created_at, id);
@@ -15,3 +15,28 @@ CREATE TABLE IF NOT EXISTS routes (
 
 -- Índice para búsqueda rápida por flight_id
 CREATE INDEX IF NOT EXISTS idx_routes_flight_id ON routes (flight_id);
+
+-- Índices compuestos para la búsqueda por aeropuertos, países y ventana de fechas
+CREATE INDEX IF NOT EXISTS idx_routes_airports_start ON routes (source_airport_code, destiny_airport_code, planned_start_date);
+CREATE INDEX IF NOT EXISTS idx_routes_countries_start ON routes (source_country, destiny_country, planned_start_date);
+CREATE INDEX IF NOT EXISTS idx_routes_planned_dates ON routes (planned_start_date, planned_end_date);
+
+-- Outbox transaccional: eventos confirmados junto con su cambio y pendientes de entrega.
+-- El catálogo de trayectos de cada worker también lo lee como registro de cambios.
+CREATE TABLE IF NOT EXISTS outbox_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL,
+    aggregate_id VARCHAR(64) NOT NULL,
+    payload JSON NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP,
+    delivered_at TIMESTAMP,
+    -- Evento descartado tras OUTBOX_MAX_ATTEMPTS intentos fallidos (dead-letter)
+    dead_lettered_at TIMESTAMP,
+    last_error VARCHAR(255),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Índice parcial: el dispatcher solo recorre los eventos pendientes
+CREATE INDEX IF NOT EXISTS idx_outbox_events_pending ON outbox_events (id)
+    WHERE delivered_at IS NULL AND dead_lettered_at IS NULL;
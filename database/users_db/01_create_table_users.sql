@@ -18,4 +18,36 @@ CREATE TABLE IF NOT EXISTS users (
 
 -- Crear índices
 CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users(email);
-CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users(username);
\ No newline at end of file
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users(username);
+CREATE INDEX IF NOT EXISTS idx_users_token ON users(token);
+
+-- Tokens firmados revocados antes de su expiración
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    jti VARCHAR(32) NOT NULL UNIQUE,
+    expire_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expire_at ON revoked_tokens(expire_at);
+
+-- Outbox transaccional: eventos confirmados junto con su cambio y pendientes de entrega
+CREATE TABLE IF NOT EXISTS outbox_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL,
+    aggregate_id VARCHAR(64) NOT NULL,
+    payload JSON NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP,
+    delivered_at TIMESTAMP,
+    -- Evento descartado tras OUTBOX_MAX_ATTEMPTS intentos fallidos (dead-letter)
+    dead_lettered_at TIMESTAMP,
+    last_error VARCHAR(255),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Índice parcial: el dispatcher solo recorre los eventos pendientes
+CREATE INDEX IF NOT EXISTS idx_outbox_events_pending ON outbox_events (id)
+    WHERE delivered_at IS NULL AND dead_lettered_at IS NULL;
@@ -0,0 +1,52 @@
+import os
+from flask import Flask
+from db import db
+from config import Config
+from routes import register_routes
+from common.replicas import init_replicas, replica_router
+from common.metrics import init_metrics, register_cache, register_collector, observe_outbound
+from cache import token_cache
+from common.http_client import users_client
+from matching_sync import matching_sync, start_matching_sync
+
+app = Flask(__name__)
+app.config.from_object(Config)
+
+# Inicializar la base de datos y las réplicas de lectura
+db.init_app(app)
+init_replicas(app)
+
+# Métricas en formato Prometheus expuestas en /metrics
+init_metrics(app, db)
+register_collector(replica_router.metric_lines)
+register_collector(matching_sync.metric_lines)
+register_cache("users_auth", token_cache)
+users_client.observer = observe_outbound
+
+# Registrar las rutas del microservicio
+register_routes(app)
+
+# Crear las tablas si no existen y cargar el motor de emparejamiento (una sola vez, en el
+# maestro; los workers lo heredan al hacer fork)
+with app.app_context():
+    db.create_all()
+    matching_sync.load()
+
+def start_background_tasks():
+    if os.getenv("ENV") != "test":
+        start_matching_sync(app)
+
+def init_worker():
+    """Se ejecuta en cada worker de gunicorn tras el fork: descarta las conexiones heredadas
+    del maestro sin cerrarlas e inicia el hilo que aplica a su motor de emparejamiento los
+    cambios de ofertas hechos por los demás workers."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # Los hilos no sobreviven al fork
+    start_background_tasks()
+
+if __name__ == '__main__':
+    start_background_tasks()
+    port = int(os.getenv("CONFIG_PORT", 5003))
+    app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,41 @@
+import requests
+from flask import request
+from cache import token_cache
+from common.http_client import CircuitOpen, users_client
+from common.tokens import is_signed_token, verify_token
+
+def authenticate_user():
+    """Verifica el token con el microservicio de users y obtiene el user_id."""
+    auth_header = request.headers.get("Authorization")
+
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None, 403  # No hay token en la solicitud
+
+    token = auth_header.split(" ")[1]
+
+    # Los tokens firmados se validan localmente, sin llamar a users
+    if is_signed_token(token):
+        user_data = verify_token(token)
+        return (user_data, None) if user_data else (None, 401)
+
+    # Respuesta reciente de users para el mismo token
+    user_data = token_cache.get(token)
+    if user_data:
+        return user_data, None
+
+    # Consultar users para validar el token y obtener el user_id
+    try:
+        response = users_client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+
+        if response.status_code == 200:
+            user_data = response.json()
+            token_cache.set(token, user_data)
+            return user_data, None  # Retorna user_id y otros datos
+        elif response.status_code in [401, 403]:
+            return None, response.status_code
+        else:
+            return None, 500  # Error interno
+    except CircuitOpen:
+        return None, 503  # users no está disponible; se falla rápido
+    except requests.exceptions.RequestException:
+        return None, 500  # Error en la conexión con `users`
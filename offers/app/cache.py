@@ -0,0 +1,8 @@
+import os
+from common.cache import TokenCache
+
+# Caché de corta duración de las respuestas de users /users/me
+token_cache = TokenCache(
+    max_size=int(os.getenv("USERS_AUTH_CACHE_SIZE", 4096)),
+    ttl=int(os.getenv("USERS_AUTH_CACHE_TTL", 10))
+)
@@ -0,0 +1,27 @@
+from dotenv import load_dotenv
+from common.db_config import database_uri, engine_options, replica_binds
+import os
+
+class Config:
+    """Configuración de la aplicación y base de datos."""
+
+    # Cargar variables desde el archivo .env y forzar su carga
+    load_dotenv(override=True)
+
+    # Depuración: Imprimir valores de entorno cargados
+    print("[*] DB_USER:", os.getenv("DB_USER"))
+    print("[*] DB_PASSWORD:", os.getenv("DB_PASSWORD"))
+    print("[*] DB_NAME:", os.getenv("DB_NAME"))
+    print("[*] DB_HOST:", os.getenv("DB_HOST"))
+    print("[*] DB_PORT:", os.getenv("DB_PORT"))
+
+    # Construir la URI de conexión y las opciones del pool (ver db_config.py)
+    SQLALCHEMY_DATABASE_URI = database_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options("offers", SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_BINDS = replica_binds("offers")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Imprimir la URI construida
+    print(f"[*] Conectando a la base de datos: {SQLALCHEMY_DATABASE_URI}")
+
+
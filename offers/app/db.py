@@ -0,0 +1,4 @@
+from flask_sqlalchemy import SQLAlchemy
+from common.replicas import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -0,0 +1,164 @@
+"""
+Motor de emparejamiento de ofertas y publicaciones.
+
+Cada publicación tiene un heap de máximos de sus ofertas, ordenadas por puntaje (precio
+ajustado por el encaje del paquete). Un heap de mínimos global guarda el mejor puntaje
+de cada publicación y permite ubicar la publicación menos disputada. Los elementos
+eliminados o actualizados se descartan de forma perezosa al llegar a la cima, por lo que
+insertar, eliminar, consultar el top-k y la mejor publicación cuestan O(log n) por elemento.
+"""
+import heapq
+import os
+import threading
+
+# Factores de encaje: a igual precio se prefieren paquetes pequeños y no frágiles
+SIZE_FIT = {"SMALL": 1.0, "MEDIUM": 0.9, "LARGE": 0.8}
+FRAGILE_FIT = float(os.getenv("MATCHING_FRAGILE_FIT", 0.9))
+
+
+def fit_score(price, size, fragile):
+    return round(float(price) * SIZE_FIT.get(size, 0) * (FRAGILE_FIT if fragile else 1.0), 4)
+
+
+class MatchingEngine:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pending = None   # cambios recibidos durante una reconstrucción (ver load)
+        self._reset()
+
+    def _reset(self):
+        self._offers = {}      # offer_id -> datos de la oferta con su puntaje
+        self._queues = {}      # post_id -> heap de (-puntaje, offer_id)
+        self._post_top = {}    # post_id -> mejor puntaje vigente
+        self._posts = []       # heap de (mejor puntaje, post_id)
+
+    def load(self, offers):
+        """Reconstruye las colas a partir de todas las ofertas (heapify por publicación).
+
+        Las colas nuevas se arman fuera del lock, mientras las consultas siguen usando las
+        vigentes, y se intercambian al terminar. Los add/remove/clear que llegan durante la
+        reconstrucción se aplican también sobre las nuevas antes del intercambio.
+        """
+        with self._lock:
+            self._pending = []
+        fresh = MatchingEngine()
+        try:
+            for offer in offers:
+                entry = fresh.describe(offer)
+                fresh._offers[entry["id"]] = entry
+                fresh._queues.setdefault(entry["postId"], []).append((-entry["score"], entry["id"]))
+            for post_id, queue in fresh._queues.items():
+                heapq.heapify(queue)
+                fresh._post_top[post_id] = -queue[0][0]
+            fresh._posts = [(score, post_id) for post_id, score in fresh._post_top.items()]
+            heapq.heapify(fresh._posts)
+
+            with self._lock:
+                for operation, argument in self._pending:
+                    getattr(fresh, operation)(*argument)
+                self._offers, self._queues = fresh._offers, fresh._queues
+                self._post_top, self._posts = fresh._post_top, fresh._posts
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def _record(self, operation, *argument):
+        if self._pending is not None:
+            self._pending.append((operation, argument))
+
+    def describe(self, offer):
+        """Acepta una instancia de Offer o un dict con sus columnas (filas del INSERT en lote)."""
+        field = offer.get if isinstance(offer, dict) else lambda name: getattr(offer, name)
+        return {
+            "id": str(field("id")),
+            "postId": str(field("post_id")),
+            "userId": str(field("user_id")),
+            "offer": float(field("offer")),
+            "size": field("size"),
+            "fragile": field("fragile"),
+            "score": fit_score(field("offer"), field("size"), field("fragile"))
+        }
+
+    def _is_current(self, post_id, item):
+        entry = self._offers.get(item[1])
+        return entry is not None and entry["postId"] == post_id and entry["score"] == -item[0]
+
+    def _refresh_post(self, post_id):
+        """Limpia la cima del heap de la publicación y publica su mejor puntaje."""
+        queue = self._queues.get(post_id, [])
+        while queue and not self._is_current(post_id, queue[0]):
+            heapq.heappop(queue)
+        if not queue:
+            self._queues.pop(post_id, None)
+            self._post_top.pop(post_id, None)
+            return
+        top = -queue[0][0]
+        if self._post_top.get(post_id) != top:
+            self._post_top[post_id] = top
+            heapq.heappush(self._posts, (top, post_id))
+
+    def add(self, offer):
+        """Agrega o re-puntúa una oferta (la entrada anterior queda obsoleta en el heap)."""
+        entry = self.describe(offer)
+        with self._lock:
+            self._record("add", offer)
+            previous = self._offers.get(entry["id"])
+            self._offers[entry["id"]] = entry
+            heapq.heappush(self._queues.setdefault(entry["postId"], []), (-entry["score"], entry["id"]))
+            if previous and previous["postId"] != entry["postId"]:
+                self._refresh_post(previous["postId"])
+            self._refresh_post(entry["postId"])
+
+    def remove(self, offer_id):
+        with self._lock:
+            self._record("remove", offer_id)
+            entry = self._offers.pop(str(offer_id), None)
+            if entry:
+                self._refresh_post(entry["postId"])
+
+    def top(self, post_id, k):
+        """Las k mejores ofertas de la publicación en O(k log n)."""
+        with self._lock:
+            post_id = str(post_id)
+            queue = self._queues.get(post_id, [])
+            best = []
+            while queue and len(best) < k:
+                item = heapq.heappop(queue)
+                if self._is_current(post_id, item):
+                    best.append(item)
+            for item in best:
+                heapq.heappush(queue, item)
+            return [self._offers[offer_id] for _, offer_id in best]
+
+    def best_post(self, score, exclude=None):
+        """Publicación donde un puntaje dado compite mejor: la de menor mejor-puntaje vigente."""
+        with self._lock:
+            skipped = []
+            found = None
+            while self._posts:
+                top, post_id = self._posts[0]
+                if self._post_top.get(post_id) != top:
+                    heapq.heappop(self._posts)  # Entrada obsoleta
+                    continue
+                if post_id == exclude:
+                    skipped.append(heapq.heappop(self._posts))
+                    continue
+                found = {"postId": post_id, "topScore": top, "score": score, "wouldLead": score > top}
+                break
+            for item in skipped:
+                heapq.heappush(self._posts, item)
+            return found
+
+    def get(self, offer_id):
+        return self._offers.get(str(offer_id))
+
+    def __len__(self):
+        return len(self._offers)
+
+    def clear(self):
+        with self._lock:
+            self._record("clear")
+            self._reset()
+
+
+matching_engine = MatchingEngine()
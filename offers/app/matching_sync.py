@@ -0,0 +1,144 @@
+"""
+Actualización incremental del motor de emparejamiento de cada worker.
+
+Cada worker de gunicorn tiene su propio MatchingEngine. Toda escritura de ofertas agrega a
+offer_events, en la misma transacción, un evento con los ids que cambiaron:
+
+- El worker que escribe aplica el cambio a su motor al confirmar.
+- Cada MATCHING_SYNC_INTERVAL segundos un hilo por worker lee solo los eventos nuevos y
+  vuelve a consultar únicamente las ofertas que cambiaron: las que siguen en la base se
+  agregan o re-puntúan y las que ya no están se eliminan.
+- La carga completa solo ocurre al arrancar (en el maestro, antes del fork), nunca en el
+  hilo de una solicitud.
+
+Como en el catálogo de routes, los ids de offer_events se asignan al insertar y no al
+confirmar: `position` solo avanza sobre los eventos con más de MATCHING_SETTLE segundos y
+los recientes se releen en cada ciclo; `applied` evita volver a aplicarlos. Los eventos
+con más de MATCHING_EVENTS_RETENTION segundos se eliminan.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+from db import db
+from matching import matching_engine
+from models import Offer, OfferEvent
+
+MATCHING_SYNC_INTERVAL = float(os.getenv("MATCHING_SYNC_INTERVAL", 1))
+MATCHING_SETTLE = float(os.getenv("MATCHING_SETTLE", 60))
+MATCHING_EVENTS_RETENTION = float(os.getenv("MATCHING_EVENTS_RETENTION", 86400))
+
+
+def record_offer_event(session, event_type, offer_ids):
+    """Agrega el evento a la transacción en curso; retorna su id (se asigna con flush)."""
+    event = OfferEvent(event_type=event_type, offer_ids=[str(offer_id) for offer_id in offer_ids])
+    session.add(event)
+    session.flush()
+    return event.id
+
+
+class MatchingSync:
+    def __init__(self, engine=matching_engine):
+        self.engine = engine
+        self.position = None   # id de offer_events hasta el cual todo está aplicado
+        self.applied = set()   # ids posteriores a position ya aplicados
+        self.synced = 0
+
+    def load(self):
+        """Carga el motor completo y se ubica en el último evento asentado."""
+        horizon = datetime.utcnow() - timedelta(seconds=MATCHING_SETTLE)
+        position = db.session.execute(
+            select(func.coalesce(func.max(OfferEvent.id), 0)).where(OfferEvent.created_at <= horizon)
+        ).scalar()
+        # Los eventos ya visibles quedan reflejados en las ofertas que se leen después
+        applied = set(db.session.execute(select(OfferEvent.id).where(OfferEvent.id > position)).scalars())
+        self.engine.load(db.session.execute(select(Offer)).scalars().yield_per(1000))
+        self.position, self.applied = position, applied
+
+    def sync(self):
+        """Aplica los eventos posteriores a `position`; retorna cuántas ofertas re-consultó."""
+        if self.position is None:
+            self.load()
+            return 0
+        horizon = datetime.utcnow() - timedelta(seconds=MATCHING_SETTLE)
+        events = db.session.execute(
+            select(OfferEvent.id, OfferEvent.event_type, OfferEvent.offer_ids, OfferEvent.created_at)
+            .where(OfferEvent.id > self.position).order_by(OfferEvent.id)
+        ).all()
+
+        position, settled, reset = self.position, True, False
+        changed, applied = set(), []
+        for event in events:
+            settled = settled and event.created_at <= horizon
+            if settled:
+                position = event.id
+            if event.id in self.applied:
+                continue
+            if event.event_type == "offers.reset":
+                reset = True
+            changed.update(event.offer_ids)
+            applied.append(event.id)
+
+        # La base decide el estado final: así el orden de los eventos no importa
+        offers = {}
+        if changed:
+            rows = db.session.execute(
+                select(Offer).where(Offer.id.in_([uuid.UUID(offer_id) for offer_id in changed]))).scalars()
+            offers = {str(offer.id): offer for offer in rows}
+        if reset:
+            self.engine.clear()
+        for offer_id in changed:
+            if offer_id in offers:
+                self.engine.add(offers[offer_id])
+            else:
+                self.engine.remove(offer_id)
+
+        self.applied.update(applied)
+        self.position = position
+        self.applied = {event_id for event_id in self.applied if event_id > position}
+        self.synced += len(changed)
+        return len(changed)
+
+    def applied_locally(self, event_id):
+        """Marca un evento que este worker ya aplicó a su motor al escribir."""
+        if self.position is not None and event_id > self.position:
+            self.applied.add(event_id)
+
+    def purge(self, retention=MATCHING_EVENTS_RETENTION):
+        cutoff = datetime.utcnow() - timedelta(seconds=retention)
+        db.session.execute(delete(OfferEvent).where(OfferEvent.created_at < cutoff))
+        db.session.commit()
+
+    def metric_lines(self):
+        return ["# HELP matching_synced_offers_total Ofertas re-consultadas por cambios de otros workers",
+                "# TYPE matching_synced_offers_total counter",
+                f"matching_synced_offers_total {self.synced}",
+                "# HELP matching_offers Ofertas en el motor de emparejamiento de este worker",
+                "# TYPE matching_offers gauge",
+                f"matching_offers {len(self.engine)}"]
+
+
+matching_sync = MatchingSync()
+
+
+def start_matching_sync(app, sync=matching_sync, interval=MATCHING_SYNC_INTERVAL):
+    """Inicia el hilo que sigue offer_events en este worker; retorna el Event para detenerlo."""
+    def loop():
+        purged_at = time.monotonic()
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    sync.sync()
+                    if time.monotonic() - purged_at >= 3600:
+                        sync.purge()
+                        purged_at = time.monotonic()
+            except Exception as error:
+                print(f"[!] Error al sincronizar el motor de emparejamiento: {error}", flush=True)
+            stop.wait(interval)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=loop, name="matching-sync", daemon=True)
+    thread.start()
+    return stop
@@ -0,0 +1,59 @@
+from db import db
+from datetime import datetime
+import uuid
+
+class Offer(db.Model):
+    """Modelo para la tabla de ofertas."""
+    __tablename__ = 'offers'
+
+    id = db.Column(db.UUID, primary_key=True, default=uuid.uuid4)
+    post_id = db.Column(db.UUID, nullable=False)
+    user_id = db.Column(db.UUID, nullable=False)
+    description = db.Column(db.String(140), nullable=False)
+    size = db.Column(db.String(10), nullable=False)
+    fragile = db.Column(db.Boolean, nullable=False)
+    offer = db.Column(db.Numeric(12, 2), nullable=False)
+    # Control de concurrencia optimista: cada actualización incrementa la versión
+    version = db.Column(db.Integer, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_offers_post_id_offer', 'post_id', 'offer'),
+        db.Index('idx_offers_user_id', 'user_id'),
+    )
+
+    def __repr__(self):
+        return f"<Offer {self.id}>"
+
+
+class OfferPostStats(db.Model):
+    """Agregados por publicación, mantenidos en cada escritura para no recorrer las ofertas."""
+    __tablename__ = 'offer_post_stats'
+
+    post_id = db.Column(db.UUID, primary_key=True)
+    offer_count = db.Column(db.Integer, nullable=False, default=0)
+    total_offer = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    best_offer = db.Column(db.Numeric(12, 2), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OfferPostStats {self.post_id}>"
+
+
+class OfferEvent(db.Model):
+    """Registro de cambios de ofertas; cada worker lo sigue para actualizar su motor de
+    emparejamiento (ver matching_sync.py)."""
+    __tablename__ = 'offer_events'
+
+    # Secuencia en lugar de UUID: los workers leen los eventos posteriores a su posición
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = db.Column(db.String(30), nullable=False)
+    offer_ids = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Los ids no se reutilizan tras un reset
+    __table_args__ = ({"sqlite_autoincrement": True},)
+
+    def __repr__(self):
+        return f"<OfferEvent {self.id} {self.event_type}>"
@@ -0,0 +1,174 @@
+from flask import Blueprint, request, jsonify
+from auth import authenticate_user  # el middleware de autenticación id
+from models import Offer
+import services
+import uuid
+
+offers_bp = Blueprint('offers', __name__)
+
+def register_routes(app):
+    """Registra todas las rutas del microservicio."""
+    app.register_blueprint(offers_bp)
+
+@offers_bp.errorhandler(services.OfferError)
+def handle_offer_error(error):
+    return jsonify({"msg": error.msg}), error.code
+
+def auth_error(error_code):
+    return jsonify({"error": "Token inválido o no autorizado"}), error_code or 403
+
+def parse_offer_id(offer_id):
+    if not services.is_valid_uuid(offer_id):
+        return None
+    return uuid.UUID(offer_id)
+
+# Endpoint para crear una oferta
+@offers_bp.route('/offers', methods=['POST'])
+def create_offer():
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    rows, errors = services.create_offers(user.get("id"), [request.get_json(silent=True)])
+    if errors:
+        return jsonify({"msg": errors[0]["msg"]}), errors[0]["code"]
+
+    return jsonify({
+        "id": str(rows[0]["id"]),
+        "userId": user.get("id"),
+        "createdAt": rows[0]["created_at"].isoformat() + "Z"
+    }), 201
+
+# Endpoint para crear ofertas en lote (un solo INSERT)
+@offers_bp.route('/offers/batch', methods=['POST'])
+def create_offers_batch():
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        return jsonify({"msg": "Se espera un arreglo de ofertas"}), 400
+
+    rows, errors = services.create_offers(user.get("id"), records)
+    return jsonify({
+        "ids": [str(row["id"]) for row in rows],
+        "errors": errors
+    }), 201 if rows else 400
+
+# Endpoint para ver y filtrar ofertas
+@offers_bp.route('/offers', methods=['GET'])
+def get_offers():
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    query = Offer.query
+
+    post_filter = request.args.get("post")
+    if post_filter:
+        if not services.is_valid_uuid(post_filter):
+            return jsonify({"error": "post debe ser un UUID válido"}), 400
+        query = query.filter(Offer.post_id == uuid.UUID(post_filter))
+
+    owner_filter = request.args.get("owner")
+    if owner_filter:
+        if owner_filter.lower() == "me":
+            query = query.filter(Offer.user_id == uuid.UUID(user.get("id")))
+        elif services.is_valid_uuid(owner_filter):
+            query = query.filter(Offer.user_id == uuid.UUID(owner_filter))
+        else:
+            return jsonify({"error": "owner debe ser 'me' o un UUID válido"}), 400
+
+    return jsonify([services.offer_to_json(offer) for offer in query.all()]), 200
+
+# Endpoint para consultar una oferta específica
+@offers_bp.route('/offers/<string:offer_id>', methods=['GET'])
+def get_offer(offer_id):
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    offer_uuid = parse_offer_id(offer_id)
+    if not offer_uuid:
+        return jsonify({"msg": "El id no es un valor string con formato uuid"}), 400
+
+    return jsonify(services.offer_to_json(services.get_offer(offer_uuid))), 200
+
+# Endpoint para actualizar una oferta con control de concurrencia optimista
+@offers_bp.route('/offers/<string:offer_id>', methods=['PATCH'])
+def update_offer(offer_id):
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    offer_uuid = parse_offer_id(offer_id)
+    if not offer_uuid:
+        return jsonify({"msg": "El id no es un valor string con formato uuid"}), 400
+
+    data = request.get_json(silent=True) or {}
+    offer = services.update_offer(offer_uuid, user.get("id"), data.get("version"), data)
+    return jsonify(services.offer_to_json(offer)), 200
+
+# Endpoint para eliminar una oferta
+@offers_bp.route('/offers/<string:offer_id>', methods=['DELETE'])
+def delete_offer(offer_id):
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    offer_uuid = parse_offer_id(offer_id)
+    if not offer_uuid:
+        return jsonify({"msg": "El id no es un valor string con formato uuid"}), 400
+
+    services.delete_offer(offer_uuid, user.get("id"))
+    return jsonify({"msg": "la oferta fue eliminada"}), 200
+
+# Endpoint con el agregado de ofertas de una publicación
+@offers_bp.route('/offers/posts/<uuid:post_id>/summary', methods=['GET'])
+def get_post_summary(post_id):
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    return jsonify(services.post_summary(post_id)), 200
+
+# Endpoint con las k mejores ofertas de una publicación según el motor de emparejamiento
+@offers_bp.route('/offers/posts/<uuid:post_id>/top', methods=['GET'])
+def get_top_offers(post_id):
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    k = request.args.get("k", "5")
+    if not k.isdigit() or not 1 <= int(k) <= services.MAX_TOP_OFFERS:
+        return jsonify({"msg": f"k debe ser un entero entre 1 y {services.MAX_TOP_OFFERS}"}), 400
+
+    return jsonify(services.top_offers(post_id, int(k))), 200
+
+# Endpoint con la publicación donde una oferta quedaría mejor ubicada
+@offers_bp.route('/offers/<string:offer_id>/best-post', methods=['GET'])
+def get_best_post(offer_id):
+    user, error_code = authenticate_user()
+    if error_code or not user:
+        return auth_error(error_code)
+
+    offer_uuid = parse_offer_id(offer_id)
+    if not offer_uuid:
+        return jsonify({"msg": "El id no es un valor string con formato uuid"}), 400
+
+    match = services.best_post_for_offer(offer_uuid)
+    if not match:
+        return jsonify({"msg": "No hay otras publicaciones con ofertas"}), 404
+    return jsonify(match), 200
+
+# Endpoint para verificar la salud del servicio
+@offers_bp.route('/offers/ping', methods=['GET'])
+def ping():
+    return "pong", 200
+
+# Endpoint para resetear la base de datos (solo pruebas)
+@offers_bp.route('/offers/reset', methods=['POST'])
+def reset_db():
+    services.reset()
+    return jsonify({"msg": "Todos los datos fueron eliminados"}), 200
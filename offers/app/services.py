@@ -0,0 +1,274 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects import postgresql, sqlite
+from db import db
+from matching import matching_engine
+from matching_sync import matching_sync, record_offer_event
+from models import Offer, OfferPostStats
+import os
+import uuid
+
+SIZES = ("LARGE", "MEDIUM", "SMALL")
+REQUIRED_FIELDS = ["postId", "description", "size", "fragile", "offer"]
+MAX_TOP_OFFERS = int(os.getenv("MAX_TOP_OFFERS", 50))
+# Límites de las columnas description VARCHAR(140) y offer NUMERIC(12, 2)
+MAX_DESCRIPTION = 140
+MAX_OFFER = Decimal("1e10")
+
+
+class OfferError(Exception):
+    """Error de negocio con el código HTTP y el mensaje que se responde."""
+    code = 400
+    msg = "Parámetros inválidos"
+
+    def __init__(self, msg=None):
+        super().__init__(msg or self.msg)
+        self.msg = msg or self.msg
+
+class InvalidOffer(OfferError):
+    code = 412
+    msg = "Valores de la oferta inválidos"
+
+class OfferNotFound(OfferError):
+    code = 404
+    msg = "La oferta no existe"
+
+class OfferForbidden(OfferError):
+    code = 403
+    msg = "No tienes permiso sobre esta oferta"
+
+class VersionConflict(OfferError):
+    code = 409
+    msg = "La oferta fue modificada por otra solicitud"
+
+
+def is_valid_uuid(value):
+    try:
+        return str(uuid.UUID(str(value))) == value
+    except (ValueError, TypeError):
+        return False
+
+def validate_offer(data):
+    """Retorna las columnas de una oferta nueva o lanza OfferError."""
+    if not isinstance(data, dict) or not all(field in data for field in REQUIRED_FIELDS):
+        raise OfferError("postId, description, size, fragile y offer son obligatorios")
+
+    if not is_valid_uuid(data["postId"]) or not isinstance(data["description"], str) \
+            or not isinstance(data["fragile"], bool):
+        raise OfferError()
+
+    try:
+        amount = Decimal(str(data["offer"]))
+    except InvalidOperation:
+        raise OfferError()
+    if isinstance(data["offer"], bool) or not amount.is_finite():
+        raise OfferError()
+
+    if data["size"] not in SIZES or amount < 0:
+        raise InvalidOffer()
+
+    # Se valida antes de escribir para que un valor fuera de rango no falle en la base
+    if len(data["description"]) > MAX_DESCRIPTION:
+        raise InvalidOffer(f"description admite máximo {MAX_DESCRIPTION} caracteres")
+    if amount >= MAX_OFFER or amount.as_tuple().exponent < -2:
+        raise InvalidOffer("offer debe ser menor a 10000000000 y tener máximo 2 decimales")
+
+    return {
+        "post_id": uuid.UUID(data["postId"]),
+        "description": data["description"],
+        "size": data["size"],
+        "fragile": data["fragile"],
+        "offer": amount
+    }
+
+def offer_to_json(offer):
+    return {
+        "id": str(offer.id),
+        "postId": str(offer.post_id),
+        "userId": str(offer.user_id),
+        "description": offer.description,
+        "size": offer.size,
+        "fragile": offer.fragile,
+        "offer": float(offer.offer),
+        "version": offer.version,
+        "createdAt": offer.created_at.isoformat() + "Z"
+    }
+
+
+def _upsert_stats(post_id, count, total, best):
+    """Suma count/total al agregado de la publicación (INSERT ... ON CONFLICT DO UPDATE)."""
+    dialect = db.session.get_bind().dialect.name
+    insert_stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(OfferPostStats)
+    stmt = insert_stmt.values(
+        post_id=post_id, offer_count=count, total_offer=total, best_offer=best,
+        updated_at=datetime.utcnow()
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[OfferPostStats.post_id],
+        set_={
+            "offer_count": OfferPostStats.offer_count + stmt.excluded.offer_count,
+            "total_offer": OfferPostStats.total_offer + stmt.excluded.total_offer,
+            "best_offer": case(
+                (OfferPostStats.best_offer.is_(None), stmt.excluded.best_offer),
+                (stmt.excluded.best_offer > OfferPostStats.best_offer, stmt.excluded.best_offer),
+                else_=OfferPostStats.best_offer
+            ),
+            "updated_at": stmt.excluded.updated_at
+        }
+    ))
+
+def _recompute_best(post_id):
+    """La mejor oferta se recalcula con idx_offers_post_id_offer, solo sobre esa publicación."""
+    best = select(func.max(Offer.offer)).where(Offer.post_id == post_id).scalar_subquery()
+    db.session.execute(
+        update(OfferPostStats).where(OfferPostStats.post_id == post_id).values(best_offer=best)
+    )
+
+
+def create_offers(user_id, records):
+    """Inserta en un solo lote las ofertas válidas; retorna (ofertas creadas, errores por índice)."""
+    now = datetime.utcnow()
+    rows = []
+    indexes = []
+    errors = []
+    for index, record in enumerate(records):
+        try:
+            fields = validate_offer(record)
+        except OfferError as error:
+            errors.append({"index": index, "code": error.code, "msg": error.msg})
+            continue
+        indexes.append(index)
+        rows.append({**fields, "id": uuid.uuid4(), "user_id": uuid.UUID(user_id),
+                     "version": 1, "created_at": now, "updated_at": now})
+
+    if rows:
+        try:
+            db.session.execute(insert(Offer), rows)
+
+            # Un solo upsert del agregado por publicación
+            stats = {}
+            for row in rows:
+                count, total, best = stats.get(row["post_id"], (0, Decimal(0), None))
+                stats[row["post_id"]] = (count + 1, total + row["offer"],
+                                         row["offer"] if best is None else max(best, row["offer"]))
+            # Siempre en el mismo orden: dos lotes sobre las mismas publicaciones toman los
+            # bloqueos de offer_post_stats en igual secuencia y no se interbloquean
+            for post_id in sorted(stats):
+                _upsert_stats(post_id, *stats[post_id])
+            event_id = record_offer_event(db.session, "offers.upserted", [row["id"] for row in rows])
+            db.session.commit()
+        except SQLAlchemyError:
+            # El lote es un solo INSERT: si la base lo rechaza no se guarda ninguna oferta
+            db.session.rollback()
+            errors.extend({"index": index, "code": 400, "msg": "La base de datos rechazó la oferta"}
+                          for index in indexes)
+            errors.sort(key=lambda error: error["index"])
+            return [], errors
+
+        for row in rows:
+            matching_engine.add(row)
+        matching_sync.applied_locally(event_id)
+
+    return rows, errors
+
+
+def get_offer(offer_id):
+    offer = db.session.get(Offer, offer_id)
+    if not offer:
+        raise OfferNotFound()
+    return offer
+
+
+def update_offer(offer_id, user_id, version, data):
+    """Actualiza description/size/fragile/offer si la versión enviada sigue vigente."""
+    offer = get_offer(offer_id)
+    if str(offer.user_id) != user_id:
+        raise OfferForbidden()
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise OfferError("version es obligatorio")
+
+    current = {"postId": str(offer.post_id), "description": offer.description, "size": offer.size,
+               "fragile": offer.fragile, "offer": offer.offer}
+    changes = validate_offer({**current, **{key: data[key] for key in REQUIRED_FIELDS[1:] if key in data}})
+    changes.pop("post_id")
+    old_amount = offer.offer
+
+    # Sin bloqueo de fila: la escritura solo aplica si nadie cambió la versión
+    result = db.session.execute(
+        update(Offer)
+        .where(Offer.id == offer_id, Offer.version == version)
+        .values(**changes, version=Offer.version + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        raise VersionConflict()
+
+    new_amount = changes["offer"]
+    if new_amount != old_amount:
+        _upsert_stats(offer.post_id, 0, new_amount - old_amount, new_amount)
+        if new_amount < old_amount:
+            _recompute_best(offer.post_id)
+    event_id = record_offer_event(db.session, "offers.upserted", [offer_id])
+    db.session.commit()
+
+    db.session.expire(offer)
+    matching_engine.add(offer)
+    matching_sync.applied_locally(event_id)
+    return offer
+
+
+def delete_offer(offer_id, user_id):
+    offer = get_offer(offer_id)
+    if str(offer.user_id) != user_id:
+        raise OfferForbidden()
+
+    post_id, amount = offer.post_id, offer.offer
+    db.session.delete(offer)
+    db.session.flush()
+    db.session.execute(
+        update(OfferPostStats).where(OfferPostStats.post_id == post_id).values(
+            offer_count=OfferPostStats.offer_count - 1,
+            total_offer=OfferPostStats.total_offer - amount,
+            updated_at=datetime.utcnow()
+        )
+    )
+    _recompute_best(post_id)
+    event_id = record_offer_event(db.session, "offers.deleted", [offer_id])
+    db.session.commit()
+    matching_engine.remove(offer_id)
+    matching_sync.applied_locally(event_id)
+
+
+def top_offers(post_id, k):
+    return matching_engine.top(post_id, k)
+
+
+def best_post_for_offer(offer_id):
+    """Publicación (distinta a la propia) donde la oferta quedaría mejor ubicada."""
+    entry = matching_engine.get(offer_id) or matching_engine.describe(get_offer(offer_id))
+    return matching_engine.best_post(entry["score"], exclude=entry["postId"])
+
+
+def post_summary(post_id):
+    """Agregado de ofertas de una publicación leído de offer_post_stats (una sola fila)."""
+    stats = db.session.get(OfferPostStats, post_id)
+    count = stats.offer_count if stats else 0
+    return {
+        "postId": str(post_id),
+        "count": count,
+        "bestOffer": float(stats.best_offer) if count and stats.best_offer is not None else None,
+        "averageOffer": float(stats.total_offer / count) if count else None
+    }
+
+
+def reset():
+    db.session.execute(delete(Offer))
+    db.session.execute(delete(OfferPostStats))
+    # Los demás workers vacían su motor al leer este evento
+    event_id = record_offer_event(db.session, "offers.reset", [])
+    db.session.commit()
+    matching_engine.clear()
+    matching_sync.applied_locally(event_id)
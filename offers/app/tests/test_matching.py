@@ -0,0 +1,65 @@
+import uuid
+from matching import MatchingEngine, fit_score
+
+POST_A = "aaaaaaaa-0000-4000-8000-00000000000a"
+POST_B = "bbbbbbbb-0000-4000-8000-00000000000b"
+
+
+def offer(post_id, amount, size="SMALL", fragile=False):
+    return {"id": uuid.uuid4(), "post_id": post_id, "user_id": uuid.uuid4(),
+            "offer": amount, "size": size, "fragile": fragile}
+
+
+### 🧪 TEST: El puntaje ajusta el precio por tamaño y fragilidad ###
+def test_fit_score():
+    assert fit_score(100, "SMALL", False) == 100
+    assert fit_score(100, "LARGE", False) < fit_score(100, "MEDIUM", False)
+    assert fit_score(100, "SMALL", True) < fit_score(100, "SMALL", False)
+
+
+### 🧪 TEST: Top-k con inserciones, actualizaciones y eliminaciones ###
+def test_top_offers():
+    engine = MatchingEngine()
+    offers = [offer(POST_A, amount) for amount in (10, 40, 30, 20)]
+    engine.load(offers[:2])
+    for item in offers[2:]:
+        engine.add(item)
+
+    assert [entry["offer"] for entry in engine.top(POST_A, 3)] == [40, 30, 20]
+
+    engine.remove(offers[1]["id"])
+    engine.add({**offers[0], "offer": 50})
+    assert [entry["offer"] for entry in engine.top(POST_A, 10)] == [50, 30, 20]
+    assert engine.top(POST_B, 5) == []
+
+
+### 🧪 TEST: Mejor publicación para una oferta ###
+def test_best_post():
+    engine = MatchingEngine()
+    engine.load([offer(POST_A, 100), offer(POST_B, 60)])
+
+    assert engine.best_post(80)["postId"] == POST_B
+    assert engine.best_post(80)["wouldLead"] is True
+    assert engine.best_post(80, exclude=POST_B)["postId"] == POST_A
+    assert engine.best_post(80, exclude=POST_B)["wouldLead"] is False
+
+    engine.add(offer(POST_B, 200))
+    assert engine.best_post(80)["postId"] == POST_A
+
+
+### 🧪 TEST: Los cambios durante una reconstrucción no se pierden ###
+def test_load_keeps_concurrent_changes():
+    engine = MatchingEngine()
+    old = offer(POST_A, 10)
+    engine.load([old])
+    added = offer(POST_A, 99)
+
+    def offers():
+        yield offer(POST_A, 20)
+        # Mientras se reconstruye, las consultas usan las colas vigentes
+        assert [entry["offer"] for entry in engine.top(POST_A, 5)] == [10]
+        engine.add(added)
+        engine.remove(old["id"])
+
+    engine.load(offers())
+    assert [entry["offer"] for entry in engine.top(POST_A, 5)] == [99, 20]
@@ -0,0 +1,159 @@
+import os
+import datetime
+import pytest
+# Secretos obligatorios (ver common/env.py) antes de importar los módulos que los leen
+os.environ.setdefault("TOKEN_SECRET", "test-token-secret")
+from common import tokens
+import config
+# SQLite en memoria configurado antes de importar la aplicación, para que drop_all nunca
+# corra contra la base de DB_HOST
+config.Config.SQLALCHEMY_DATABASE_URI = "sqlite://"
+config.Config.SQLALCHEMY_ENGINE_OPTIONS = config.engine_options("offers", "sqlite://")
+config.Config.SQLALCHEMY_BINDS = {}
+from app import app as offers_app, db
+import services
+from matching import matching_engine
+
+USER_ID = "aaaaaaaa-1111-4111-8111-111111111111"
+POST_ID = "bbbbbbbb-2222-4222-8222-222222222222"
+OFFER = {"postId": POST_ID, "description": "Caja", "size": "LARGE", "fragile": True, "offer": 100}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """ Cliente de pruebas con base de datos en memoria y token firmado """
+    class NoRevocations:
+        def is_revoked(self, jti):
+            return False
+    monkeypatch.setattr(tokens, "revocation_list", NoRevocations())
+
+    offers_app.config["TESTING"] = True
+    with offers_app.app_context():
+        db.drop_all()
+        db.create_all()
+    matching_engine.clear()
+    with offers_app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def headers():
+    expire_at = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    token, _ = tokens.issue_token(USER_ID, "VERIFICADO", expire_at)
+    return {"Authorization": f"Bearer {token}"}
+
+
+### 🧪 TEST: Crear una oferta ###
+def test_create_offer(client, headers):
+    response = client.post("/offers", json=OFFER, headers=headers)
+
+    assert response.status_code == 201
+    assert response.get_json()["userId"] == USER_ID
+
+
+### 🧪 TEST: Actualización con versión vencida ###
+def test_update_offer_version_conflict(client, headers):
+    offer_id = client.post("/offers", json=OFFER, headers=headers).get_json()["id"]
+
+    response = client.patch(f"/offers/{offer_id}", json={"version": 1, "offer": 150}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["version"] == 2
+
+    response = client.patch(f"/offers/{offer_id}", json={"version": 1, "offer": 90}, headers=headers)
+    assert response.status_code == 409
+
+
+### 🧪 TEST: Un lote que la base rechaza se revierte completo ###
+def test_create_offers_database_error(client, headers, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+
+    def fail(*args):
+        raise IntegrityError("INSERT", {}, Exception("offer_post_stats"))
+    monkeypatch.setattr(services, "_upsert_stats", fail)
+
+    response = client.post("/offers/batch", json=[OFFER, {**OFFER, "size": "HUGE"}], headers=headers)
+    assert response.status_code == 400
+    assert [error["index"] for error in response.get_json()["errors"]] == [0, 1]
+    assert client.post("/offers", json=OFFER, headers=headers).status_code == 400
+
+    monkeypatch.undo()
+    assert client.get("/offers", headers=headers).get_json() == []
+
+
+### 🧪 TEST: Los agregados de un lote se actualizan en orden de publicación ###
+def test_create_offers_stats_order(client, headers, monkeypatch):
+    import uuid
+    upserted = []
+    upsert = services._upsert_stats
+    monkeypatch.setattr(services, "_upsert_stats",
+                        lambda post_id, *args: (upserted.append(post_id), upsert(post_id, *args)))
+    posts = ["dddddddd-4444-4444-8444-444444444444", POST_ID, "cccccccc-3333-4333-8333-333333333333"]
+
+    response = client.post("/offers/batch", json=[{**OFFER, "postId": post} for post in posts], headers=headers)
+    assert response.status_code == 201
+    assert upserted == sorted(uuid.UUID(post) for post in posts)
+
+
+### 🧪 TEST: Agregado por publicación sin recorrer las ofertas ###
+def test_post_summary(client, headers):
+    response = client.post("/offers/batch", json=[{**OFFER, "offer": 50}, {**OFFER, "offer": 150}], headers=headers)
+    assert response.status_code == 201
+    offer_id = response.get_json()["ids"][1]
+
+    summary = client.get(f"/offers/posts/{POST_ID}/summary", headers=headers).get_json()
+    assert (summary["count"], summary["bestOffer"], summary["averageOffer"]) == (2, 150.0, 100.0)
+
+    client.delete(f"/offers/{offer_id}", headers=headers)
+    summary = client.get(f"/offers/posts/{POST_ID}/summary", headers=headers).get_json()
+    assert (summary["count"], summary["bestOffer"]) == (1, 50.0)
+
+
+### 🧪 TEST: Ranking de ofertas y mejor publicación para una oferta ###
+def test_matching(client, headers):
+    other_post = "cccccccc-3333-4333-8333-333333333333"
+    response = client.post("/offers/batch", json=[
+        {**OFFER, "offer": 100}, {**OFFER, "offer": 300}, {**OFFER, "postId": other_post, "offer": 200}
+    ], headers=headers)
+    low_id, high_id, _ = response.get_json()["ids"]
+
+    top = client.get(f"/offers/posts/{POST_ID}/top?k=1", headers=headers).get_json()
+    assert [offer["id"] for offer in top] == [high_id]
+
+    match = client.get(f"/offers/{low_id}/best-post", headers=headers).get_json()
+    assert match["postId"] == other_post
+    assert match["wouldLead"] is False
+
+    client.delete(f"/offers/{high_id}", headers=headers)
+    top = client.get(f"/offers/posts/{POST_ID}/top", headers=headers).get_json()
+    assert [offer["id"] for offer in top] == [low_id]
+
+
+### 🧪 TEST: Otro worker aplica los cambios de ofertas sin recargar todo el motor ###
+def test_matching_sync_other_worker(client, headers, monkeypatch):
+    from matching import MatchingEngine
+    from matching_sync import MatchingSync
+
+    # Otro worker: su propio motor, cargado antes de los cambios
+    other_engine = MatchingEngine()
+    other_worker = MatchingSync(other_engine)
+    with offers_app.app_context():
+        other_worker.load()
+
+    def full_load(offers):
+        raise AssertionError("no se recarga el motor completo")
+    monkeypatch.setattr(other_engine, "load", full_load)
+    monkeypatch.setattr(matching_engine, "load", full_load)
+
+    low_id, high_id = client.post("/offers/batch", json=[{**OFFER, "offer": 100}, {**OFFER, "offer": 300}],
+                                  headers=headers).get_json()["ids"]
+    client.patch(f"/offers/{low_id}", json={"version": 1, "offer": 400}, headers=headers)
+    client.delete(f"/offers/{high_id}", headers=headers)
+    with offers_app.app_context():
+        assert other_worker.sync() == 2
+        assert other_worker.sync() == 0
+    assert [(entry["id"], entry["offer"]) for entry in other_engine.top(POST_ID, 5)] == [(low_id, 400.0)]
+
+    client.post("/offers/reset", headers=headers)
+    with offers_app.app_context():
+        other_worker.sync()
+    assert len(other_engine) == 0
@@ -0,0 +1,48 @@
+import pytest
+from decimal import Decimal
+from services import InvalidOffer, OfferError, validate_offer
+
+OFFER = {
+    "postId": "0b5c3a8e-5f7e-4c36-9a52-3c1f1b8c2d11",
+    "description": "Caja de libros",
+    "size": "MEDIUM",
+    "fragile": False,
+    "offer": 120.5
+}
+
+
+### 🧪 TEST: Validar una oferta correcta ###
+def test_validate_offer():
+    fields = validate_offer(OFFER)
+    assert fields["offer"] == Decimal("120.5")
+    assert fields["size"] == "MEDIUM"
+
+
+### 🧪 TEST: Campos faltantes o con formato inválido ###
+def test_validate_offer_missing_fields():
+    with pytest.raises(OfferError) as error:
+        validate_offer({"offer": 10})
+    assert error.value.code == 400
+
+    with pytest.raises(OfferError) as error:
+        validate_offer({**OFFER, "postId": "1"})
+    assert error.value.code == 400
+
+
+### 🧪 TEST: Tamaño inválido u oferta negativa ###
+def test_validate_offer_invalid_values():
+    with pytest.raises(InvalidOffer):
+        validate_offer({**OFFER, "size": "HUGE"})
+    with pytest.raises(InvalidOffer):
+        validate_offer({**OFFER, "offer": -1})
+
+
+### 🧪 TEST: Descripción y monto dentro de los límites de la tabla ###
+def test_validate_offer_column_bounds():
+    assert validate_offer({**OFFER, "description": "x" * 140, "offer": "9999999999.99"})["offer"] == Decimal("9999999999.99")
+    with pytest.raises(InvalidOffer):
+        validate_offer({**OFFER, "description": "x" * 141})
+    with pytest.raises(InvalidOffer):
+        validate_offer({**OFFER, "offer": 10 ** 10})
+    with pytest.raises(InvalidOffer):
+        validate_offer({**OFFER, "offer": "1.234"})
@@ -3,12 +3,30 @@ from flask import Flask
 from db import db
 from config import Config
 from routes import register_routes
+from common.replicas import init_replicas, replica_router
+from common.metrics import init_metrics, register_cache, register_collector, observe_outbound
+from cache import token_cache
+from common.http_client import users_client
+from common.sql_metrics import init_sql_metrics
+from partitions import start_archiver
+from feed import start_listener
+from routes.webhooks import AUTH_CHANNEL
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Inicializar la base de datos
+# Inicializar la base de datos y las réplicas de lectura
 db.init_app(app)
+init_replicas(app)
+
+# Conteo y tiempos de SQL por solicitud
+init_sql_metrics(app, db)
+
+# Métricas en formato Prometheus expuestas en /metrics
+init_metrics(app, db)
+register_collector(replica_router.metric_lines)
+register_cache("users_auth", token_cache)
+users_client.observer = observe_outbound
 
 # Registrar las rutas del microservicio
 register_routes(app)
@@ -17,6 +35,27 @@ register_routes(app)
 with app.app_context():
     db.create_all()
 
+def start_background_tasks():
+    if os.getenv("ENV") == "test":
+        return
+    # Mantenimiento de las particiones de posts por expire_at
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("postgresql"):
+        start_archiver(app, db)
+    # Avisos de invalidación de la caché de tokens de los demás workers; el feed lo
+    # atiende feed_server.py en su propio proceso
+    start_listener(app, db, {AUTH_CHANNEL: token_cache.invalidate_user})
+
+def init_worker():
+    """Se ejecuta en cada worker de gunicorn tras el fork: descarta las conexiones heredadas
+    del maestro (dispose(close=False)) y arranca el archivado de particiones y el hilo
+    LISTEN de este worker."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # Los hilos no sobreviven al fork; el advisory lock evita trabajo duplicado entre workers
+    start_background_tasks()
+
 if __name__ == '__main__':
+    start_background_tasks()
     port = int(os.getenv("CONFIG_PORT", 5001)) 
     app.run(host="0.0.0.0", port=port)
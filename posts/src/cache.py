@@ -0,0 +1,10 @@
+import os
+from common.cache import TokenCache
+
+# Caché de corta duración de las respuestas de users /users/me. Cada worker tiene la
+# suya; los eventos de users la invalidan en todos (routes/webhooks.py) y el TTL acota
+# lo que dure un dato viejo si un aviso se pierde
+token_cache = TokenCache(
+    max_size=int(os.getenv("USERS_AUTH_CACHE_SIZE", 4096)),
+    ttl=int(os.getenv("USERS_AUTH_CACHE_TTL", 10))
+)
@@ -1,4 +1,5 @@
 from dotenv import load_dotenv
+from common.db_config import database_uri, engine_options, replica_binds
 import os
 
 class Config:
@@ -14,8 +15,10 @@ class Config:
     print("[*] DB_HOST:", os.getenv("DB_HOST"))
     print("[*] DB_PORT:", os.getenv("DB_PORT"))
 
-    # Construir la URI de conexión
-    SQLALCHEMY_DATABASE_URI = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    # Construir la URI de conexión y las opciones del pool (ver db_config.py)
+    SQLALCHEMY_DATABASE_URI = database_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options("posts", SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_BINDS = replica_binds("posts")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
     # Imprimir la URI construida
@@ -0,0 +1,329 @@
+"""
+Feed de eventos de publicaciones para GET /posts/feed (server-sent events).
+
+Las conexiones del feed duran minutos u horas, así que no las atienden los workers de
+gunicorn (cada una ocuparía un hilo) sino un proceso aparte con aiohttp
+(feed_server.py): todas comparten un event loop y solo cuestan un socket y una entrada
+en la lista de espera. Ese proceso mantiene un búfer circular en memoria (PostFeed) con
+los últimos FEED_BUFFER_SIZE eventos ya serializados; todas las conexiones leen de ese
+búfer, así que un cambio en la base de datos se serializa una sola vez sin importar
+cuántos clientes escuchen.
+
+- post-created y post-deleted: con PostgreSQL los workers los publican con pg_notify
+  dentro de la transacción del cambio (solo se entregan si se confirma) y un hilo del
+  servidor del feed los recibe con LISTEN. Con otros motores (pruebas, un solo proceso)
+  se publican en el búfer del proceso tras el commit.
+- post-expired: el mismo hilo consulta cada FEED_EXPIRE_INTERVAL segundos las
+  publicaciones cuyo expire_at quedó atrás desde la consulta anterior.
+- reset: los NOTIFY enviados mientras la conexión LISTEN está caída se pierden, así que
+  al reconectarse se publica un evento `reset` que reciben todas las conexiones, sin
+  importar sus filtros, para que vuelvan a consultar GET /posts.
+
+El id de cada evento es "<búfer>.<secuencia>.<recibido>": el búfer identifica al proceso
+que lo emitió, la secuencia sigue el orden en que lo recibió (el orden de commit, porque
+PostgreSQL entrega los NOTIFY en ese orden) y `recibido` es el instante de llegada en
+microsegundos. Un cliente que reconecta con Last-Event-ID:
+
+- Al mismo proceso: recibe exactamente los eventos con secuencia posterior.
+- A otro proceso (o tras un reinicio): las secuencias no son comparables, así que se
+  repiten los eventos recibidos desde FEED_REPLAY_WINDOW segundos antes del último
+  visto. Puede recibir duplicados (el par tipo e id de la publicación los identifica).
+
+Si la reanudación cae fuera del búfer también se envía un evento `reset`.
+
+Los workers de gunicorn usan start_listener solo para los canales adicionales (por
+ejemplo el aviso de invalidación de la caché de tokens que envía routes/webhooks.py),
+con una sola conexión dedicada a LISTEN por proceso.
+"""
+import asyncio
+import json
+import os
+import secrets
+import select
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+FEED_BUFFER_SIZE = int(os.getenv("FEED_BUFFER_SIZE", 10000))
+FEED_HEARTBEAT = float(os.getenv("FEED_HEARTBEAT", 15))
+FEED_EXPIRE_INTERVAL = float(os.getenv("FEED_EXPIRE_INTERVAL", 1))
+FEED_RETRY_MS = int(os.getenv("FEED_RETRY_MS", 3000))
+FEED_REPLAY_WINDOW = float(os.getenv("FEED_REPLAY_WINDOW", 5))
+# Conexiones abiertas a la vez en el servidor del feed; cada una es solo un socket
+FEED_MAX_STREAMS = int(os.getenv("FEED_MAX_STREAMS", 10000))
+FEED_CHANNEL = "posts_events"
+
+
+def _now_micros():
+    return int(time.time() * 1_000_000)
+
+
+def parse_event_id(event_id):
+    """(búfer, secuencia, recibido) de un Last-Event-ID o None si no es válido."""
+    try:
+        boot, seq, received = (event_id or "").split(".")
+        return boot, int(seq), int(received)
+    except ValueError:
+        return None
+
+
+class FeedEvent:
+    __slots__ = ("seq", "received", "type", "route_id", "user_id", "frame")
+
+    def __init__(self, event_type, data, boot, seq, received):
+        self.seq = seq
+        self.received = received
+        self.type = event_type
+        self.route_id = data.get("routeId")
+        self.user_id = data.get("userId")
+        # Serializado una sola vez para todos los clientes
+        self.frame = (f"id: {boot}.{seq}.{received}\nevent: {event_type}\n"
+                      f"data: {json.dumps(data)}\n\n").encode()
+
+    def matches(self, route_id=None, user_id=None):
+        if self.type == "reset":
+            return True  # afecta a todas las conexiones, sin importar sus filtros
+        return (route_id is None or self.route_id == route_id) and (user_id is None or self.user_id == user_id)
+
+
+class PostFeed:
+    def __init__(self, size=FEED_BUFFER_SIZE, max_streams=FEED_MAX_STREAMS):
+        self._events = deque(maxlen=size)
+        self._seq = 0  # eventos publicados en este proceso; posición de cada cliente
+        # Último evento descartado del búfer: la reanudación es completa si es posterior
+        self._dropped_seq = 0
+        self.covered_from = _now_micros()
+        self._lock = threading.Lock()
+        # Event loop de las conexiones (attach) y evento que se reemplaza en cada publicación
+        self._loop = None
+        self._changed = None
+        self.boot = secrets.token_hex(4)
+        self.max_streams = max_streams
+        self.listeners = 0
+        self.published = 0
+        self.rejected = 0
+
+    def reset_boot(self):
+        """Nuevo identificador de búfer para el proceso que alimenta el feed."""
+        with self._lock:
+            self.boot = secrets.token_hex(4)
+
+    def attach(self, loop):
+        """Las conexiones esperan en `loop`; publish puede llamarse desde cualquier hilo."""
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def publish(self, event_type, data):
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                dropped = self._events[0]
+                self._dropped_seq, self.covered_from = dropped.seq, dropped.received
+            self._seq += 1
+            self._events.append(FeedEvent(event_type, data, self.boot, self._seq, _now_micros()))
+            self.published += 1
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        # Se ejecuta en el event loop: despierta a todas las conexiones en espera
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def subscribe(self, last_event_id=None):
+        """Posición actual y eventos a repetir tras `last_event_id`.
+
+        Retorna (posición, eventos, completo); completo es False si parte de lo que siguió
+        a ese evento ya salió del búfer y el cliente pudo perder eventos.
+        """
+        with self._lock:
+            position = self._seq
+            last = parse_event_id(last_event_id) if last_event_id else None
+            if last is None:
+                return position, [], last_event_id is None
+            boot, seq, received = last
+            if boot == self.boot:
+                backlog = [feed_event for feed_event in self._events if feed_event.seq > seq]
+                return position, backlog, seq >= self._dropped_seq
+            since = received - int(FEED_REPLAY_WINDOW * 1_000_000)
+            backlog = [feed_event for feed_event in self._events if feed_event.received > since]
+            return position, backlog, since >= self.covered_from
+
+    def reserve(self):
+        """Ocupa un lugar para una conexión; False si ya hay max_streams abiertas."""
+        with self._lock:
+            if self.listeners >= self.max_streams:
+                self.rejected += 1
+                return False
+            self.listeners += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.listeners -= 1
+
+    def since(self, position):
+        """Eventos posteriores a `position` sin esperar; retorna (posición, eventos, completo)."""
+        with self._lock:
+            pending = self._seq - position
+            if pending > len(self._events):
+                # El cliente se atrasó más que el tamaño del búfer
+                return self._seq, list(self._events), False
+            size = len(self._events)
+            return self._seq, [self._events[index] for index in range(size - pending, size)], True
+
+    async def wait(self, position, timeout=FEED_HEARTBEAT):
+        """Espera en el event loop eventos posteriores a `position` (como since)."""
+        # Se toma el evento antes de comparar: una publicación posterior lo marca
+        changed = self._changed
+        if self._seq == position:
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.since(position)
+
+    async def stream(self, last_event_id=None, route_id=None, user_id=None, heartbeat=FEED_HEARTBEAT):
+        """Genera el flujo SSE filtrado por trayecto y dueño (el lugar se reserva aparte)."""
+        position, backlog, complete = self.subscribe(last_event_id)
+        yield f"retry: {FEED_RETRY_MS}\n\n".encode()
+        while True:
+            if not complete:
+                yield b"event: reset\ndata: {}\n\n"
+            frames = [feed_event.frame for feed_event in backlog if feed_event.matches(route_id, user_id)]
+            if frames:
+                yield b"".join(frames)
+            position, backlog, complete = await self.wait(position, heartbeat)
+            if not backlog:
+                # Comentario SSE: mantiene viva la conexión y detecta clientes desconectados
+                yield b": keep-alive\n\n"
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._dropped_seq = self._seq
+            self.covered_from = _now_micros()
+
+    def metric_lines(self):
+        return ["# HELP posts_feed_listeners Conexiones abiertas a /posts/feed",
+                "# TYPE posts_feed_listeners gauge",
+                f"posts_feed_listeners {self.listeners}",
+                "# HELP posts_feed_rejected_total Conexiones a /posts/feed rechazadas por el límite FEED_MAX_STREAMS",
+                "# TYPE posts_feed_rejected_total counter",
+                f"posts_feed_rejected_total {self.rejected}",
+                "# HELP posts_feed_events_total Eventos publicados en el feed",
+                "# TYPE posts_feed_events_total counter",
+                f"posts_feed_events_total {self.published}"]
+
+
+post_feed = PostFeed()
+
+
+def notify_post_event(session, event_type, data):
+    """Publica un evento de la transacción en curso; solo se entrega si se confirma."""
+    if session.get_bind().dialect.name == "postgresql":
+        payload = json.dumps({"type": event_type, "data": data})
+        session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": FEED_CHANNEL, "payload": payload})
+    else:
+        session.connection()  # los eventos quedan ligados a una transacción iniciada
+        session.info.setdefault("feed_events", []).append((event_type, data))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_local_events(session):
+    for event_type, data in session.info.pop("feed_events", []):
+        post_feed.publish(event_type, data)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_local_events(session, previous_transaction):
+    session.info.pop("feed_events", None)
+
+
+def publish_expired(db, model, serialize, since, until, feed=post_feed):
+    """Publica post-expired para las publicaciones con expire_at en (since, until]."""
+    posts = db.session.query(model).filter(model.expire_at > since, model.expire_at <= until) \
+        .order_by(model.expire_at, model.id).all()
+    for post in posts:
+        feed.publish("post-expired", serialize(post))
+    return len(posts)
+
+
+def _listen(engine, channels):
+    """Conexión dedicada en autocommit con LISTEN sobre los canales dados."""
+    connection = engine.raw_connection()
+    driver_connection = connection.driver_connection
+    driver_connection.autocommit = True
+    with driver_connection.cursor() as cursor:
+        for channel in channels:
+            cursor.execute(f"LISTEN {channel}")
+    return connection, driver_connection
+
+
+def start_listener(app, db, handlers, interval=FEED_EXPIRE_INTERVAL, on_idle=None, on_reconnect=None):
+    """Inicia el hilo con una conexión dedicada a LISTEN sobre los canales de `handlers`.
+
+    `handlers` asocia cada canal de NOTIFY a una función que recibe el payload.
+    `on_idle` se llama en cada vuelta (al menos cada `interval` segundos) y
+    `on_reconnect` cada vez que la conexión se restablece tras un error, porque los
+    NOTIFY enviados mientras estuvo caída se perdieron.
+    """
+    def loop():
+        connection = driver_connection = None
+        lost = False
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    if driver_connection is None and db.engine.dialect.name == "postgresql":
+                        connection, driver_connection = _listen(db.engine, handlers)
+                        if lost and on_reconnect is not None:
+                            on_reconnect()
+                        lost = False
+                    if driver_connection is not None:
+                        if select.select([driver_connection], [], [], interval)[0]:
+                            driver_connection.poll()
+                            while driver_connection.notifies:
+                                notify = driver_connection.notifies.pop(0)
+                                handlers[notify.channel](notify.payload)
+                    else:
+                        stop.wait(interval)
+                    if on_idle is not None:
+                        on_idle()
+            except Exception as error:
+                print(f"[!] Error en el hilo LISTEN de posts: {error}", flush=True)
+                if connection is not None:
+                    connection.invalidate()
+                connection = driver_connection = None
+                lost = True
+                stop.wait(interval)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=loop, name="posts-listen", daemon=True)
+    thread.start()
+    return stop
+
+
+def start_feed(app, db, model, serialize, feed=post_feed, interval=FEED_EXPIRE_INTERVAL, handlers=None):
+    """Inicia el hilo que alimenta el búfer del servidor del feed (NOTIFY y vencimientos).
+
+    `handlers` agrega otros canales de NOTIFY, como en start_listener.
+    """
+    feed.reset_boot()
+    checked_at = datetime.utcnow()
+
+    def publish_notify(payload):
+        message = json.loads(payload)
+        feed.publish(message["type"], message["data"])
+
+    def publish_due():
+        nonlocal checked_at
+        now = datetime.utcnow()
+        if now - checked_at >= timedelta(seconds=interval):
+            publish_expired(db, model, serialize, checked_at, now, feed)
+            checked_at = now
+
+    return start_listener(app, db, {FEED_CHANNEL: publish_notify, **(handlers or {})}, interval,
+                          on_idle=publish_due, on_reconnect=lambda: feed.publish("reset", {}))
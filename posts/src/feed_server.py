@@ -0,0 +1,93 @@
+"""
+Servidor del feed de publicaciones: GET /posts/feed (server-sent events, ver feed.py).
+
+Corre como proceso aparte de gunicorn (`python feed_server.py`, puerto FEED_PORT): las
+conexiones del feed duran minutos u horas y en un worker gthread cada una ocupaba un
+hilo. Aquí todas comparten el event loop de aiohttp; un solo hilo alimenta el búfer
+(LISTEN y vencimientos) y la autenticación corre en el executor del loop solo mientras
+se abre la conexión.
+"""
+import asyncio
+import os
+from aiohttp import web
+from app import app as flask_app
+from auth import authenticate_header
+from cache import token_cache
+from db import db
+from feed import FEED_RETRY_MS, post_feed, start_feed
+from models import Post
+from routes.posts import is_valid_uuid, post_to_json
+from routes.webhooks import AUTH_CHANNEL
+
+routes = web.RouteTableDef()
+
+
+# Endpoint de eventos en vivo (SSE): post-created, post-deleted, post-expired y reset
+@routes.get("/posts/feed")
+async def get_feed(request):
+    loop = asyncio.get_running_loop()
+    user, error_code = await loop.run_in_executor(None, authenticate_header, request.headers.get("Authorization"))
+    if error_code or not user:
+        return web.json_response({"error": "Token inválido o no autorizado"}, status=error_code or 403)
+
+    route_filter = request.query.get("route")
+    if route_filter and not is_valid_uuid(route_filter):
+        return web.json_response({"error": "route debe ser un UUID válido"}, status=400)
+
+    owner_filter = request.query.get("owner")
+    if owner_filter and owner_filter.lower() == "me":
+        owner_filter = str(user.get("id"))
+    elif owner_filter and not is_valid_uuid(owner_filter):
+        return web.json_response({"error": "owner debe ser 'me' o un UUID válido"}, status=400)
+
+    # Reanudación: el navegador reenvía el último id recibido en Last-Event-ID
+    last_event_id = request.headers.get("Last-Event-ID") or request.query.get("lastEventId")
+
+    if not post_feed.reserve():
+        return web.json_response({"error": "Demasiadas conexiones abiertas al feed, intenta más tarde"},
+                                 status=503, headers={"Retry-After": str(FEED_RETRY_MS // 1000)})
+    try:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream",
+                                               "Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        await response.prepare(request)
+        events = post_feed.stream(last_event_id, route_id=route_filter or None, user_id=owner_filter or None)
+        # Termina cuando el cliente se desconecta (handler_cancellation cancela la tarea)
+        async for chunk in events:
+            await response.write(chunk)
+    except ConnectionResetError:
+        pass
+    finally:
+        post_feed.release()
+    return response
+
+
+# Métricas del feed en formato Prometheus
+@routes.get("/metrics")
+async def metrics(request):
+    return web.Response(text="\n".join(post_feed.metric_lines()) + "\n", content_type="text/plain")
+
+
+async def start_feed_listener(app):
+    post_feed.attach(asyncio.get_running_loop())
+    if os.getenv("ENV") != "test":
+        # El mismo hilo recibe los avisos de invalidación de la caché de tokens
+        app["feed_stop"] = start_feed(flask_app, db, Post, post_to_json,
+                                      handlers={AUTH_CHANNEL: token_cache.invalidate_user})
+
+
+async def stop_feed_listener(app):
+    if "feed_stop" in app:
+        app["feed_stop"].set()
+
+
+def create_app():
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(start_feed_listener)
+    app.on_cleanup.append(stop_feed_listener)
+    return app
+
+
+if __name__ == '__main__':
+    # Cancela la conexión en cuanto el cliente se desconecta y libera su lugar
+    web.run_app(create_app(), host="0.0.0.0", port=int(os.getenv("FEED_PORT", 5011)), handler_cancellation=True)
@@ -12,5 +12,10 @@ class Post(db.Model):
     expire_at = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Índice para la paginación por keyset
+    __table_args__ = (
+        db.Index('idx_posts_created_at_id', 'created_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Post {self.id}>"
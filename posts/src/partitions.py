@@ -0,0 +1,121 @@
+"""
+Mantenimiento de las particiones mensuales de posts (ver database/posts_db).
+
+Un hilo en segundo plano crea por adelantado las particiones de los próximos meses
+y separa (DETACH) las particiones cuyo rango de expire_at terminó hace más de
+POSTS_RETENTION_DAYS días. Las particiones separadas se mueven al esquema
+posts_archive o se eliminan según POSTS_ARCHIVE_MODE.
+
+Cada partición se crea en su propia transacción y el archivado en otra, así que un mes
+que no se pueda crear no detiene a los demás ni al archivado. create_posts_partition
+mueve a la nueva partición las filas que hubieran caído en posts_default para ese mes.
+"""
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+
+POSTS_PARTITIONS_AHEAD = int(os.getenv("POSTS_PARTITIONS_AHEAD", 12))
+POSTS_RETENTION_DAYS = int(os.getenv("POSTS_RETENTION_DAYS", 30))
+POSTS_ARCHIVE_MODE = os.getenv("POSTS_ARCHIVE_MODE", "archive")  # archive | drop
+POSTS_ARCHIVE_INTERVAL = int(os.getenv("POSTS_ARCHIVE_INTERVAL", 3600))
+
+# Llave del advisory lock para que un solo worker haga el mantenimiento
+ARCHIVER_LOCK_KEY = 7201
+PARTITION_NAME = re.compile(r"^posts_p(\d{4})(\d{2})$")
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_partitions(conn, today=None):
+    """Crea las particiones del mes actual (en UTC, como expire_at) y de los próximos
+    POSTS_PARTITIONS_AHEAD meses.
+
+    Retorna los meses que no se pudieron crear; se reintentan en el siguiente ciclo.
+    """
+    first = (today or datetime.utcnow().date()).replace(day=1)
+    failed = []
+    for offset in range(POSTS_PARTITIONS_AHEAD + 1):
+        month = add_months(first, offset)
+        try:
+            with conn.begin():
+                conn.execute(text("SELECT create_posts_partition(:month)"), {"month": month})
+        except Exception as error:
+            print(f"[!] No se pudo crear la partición de {month:%Y-%m}: {error}", flush=True)
+            failed.append(month)
+    return failed
+
+
+def expired_partitions(conn, now=None):
+    """Particiones cuyo límite superior de expire_at es anterior al periodo de retención."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=POSTS_RETENTION_DAYS)
+    names = conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'posts'"
+    )).scalars()
+
+    expired = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue  # posts_default nunca se archiva
+        upper_bound = add_months(date(int(match.group(1)), int(match.group(2)), 1), 1)
+        if datetime.combine(upper_bound, datetime.min.time()) <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+def archive_partition(conn, name):
+    """Separa una partición completa de posts; es una operación de catálogo, sin DELETE fila a fila."""
+    conn.execute(text(f'ALTER TABLE posts DETACH PARTITION "{name}"'))
+    if POSTS_ARCHIVE_MODE == "drop":
+        conn.execute(text(f'DROP TABLE "{name}"'))
+    else:
+        conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA posts_archive'))
+
+
+def run_maintenance(engine):
+    """Ejecuta un ciclo de mantenimiento; retorna las particiones archivadas."""
+    with engine.connect() as conn:
+        # Lock de sesión: se mantiene entre las transacciones de creación y archivado
+        locked = conn.execute(text("SELECT pg_try_advisory_lock(:key)"),
+                              {"key": ARCHIVER_LOCK_KEY}).scalar()
+        conn.commit()
+        if not locked:
+            return []  # Otro worker ya está haciendo el mantenimiento
+
+        try:
+            ensure_partitions(conn)
+            with conn.begin():
+                archived = expired_partitions(conn)
+                for name in archived:
+                    archive_partition(conn, name)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ARCHIVER_LOCK_KEY})
+            conn.commit()
+    return archived
+
+
+def start_archiver(app, db):
+    """Inicia el hilo de mantenimiento de particiones (solo con PostgreSQL)."""
+    def loop():
+        while True:
+            try:
+                with app.app_context():
+                    archived = run_maintenance(db.engine)
+                if archived:
+                    print(f"[*] Particiones de posts archivadas: {archived}", flush=True)
+            except Exception as error:
+                print(f"[!] Error en el mantenimiento de particiones: {error}", flush=True)
+            stop.wait(POSTS_ARCHIVE_INTERVAL)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=loop, name="posts-archiver", daemon=True)
+    thread.start()
+    return stop
@@ -1,6 +1,8 @@
 from flask import Blueprint
 from .posts import posts_bp
+from .webhooks import webhooks_bp
 
 def register_routes(app):
     """Registra todas las rutas del microservicio."""
     app.register_blueprint(posts_bp)
+    app.register_blueprint(webhooks_bp)
@@ -1,12 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from models import Post
 from db import db
 from datetime import datetime
 from auth import authenticate_user  # el middleware de autenticación id
+from feed import notify_post_event
+from sqlalchemy import and_, or_
+import base64
+import json
+import os
 import uuid
 
 posts_bp = Blueprint('posts', __name__)
 
+POSTS_MAX_LIMIT = int(os.getenv("POSTS_MAX_LIMIT", 1000))
+POSTS_STREAM_BATCH = int(os.getenv("POSTS_STREAM_BATCH", 500))
+
 # Validación de UUID
 def is_valid_uuid(value):
     try:
@@ -14,6 +22,27 @@ def is_valid_uuid(value):
     except (ValueError, TypeError):
         return False
 
+def post_to_json(post):
+    return {
+        "id": str(post.id),
+        "routeId": str(post.route_id),
+        "userId": str(post.user_id),
+        "expireAt": post.expire_at.isoformat() + "Z",
+        "createdAt": post.created_at.isoformat() + "Z"
+    }
+
+# Cursor opaco con la última posición (created_at, id) entregada
+def encode_cursor(post):
+    raw = f"{post.created_at.isoformat()}|{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(post_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
 # Endpoint para crear una publicación
 @posts_bp.route('/posts', methods=['POST'])
 def create_post():
@@ -47,6 +76,8 @@ def create_post():
     )
 
     db.session.add(new_post)
+    db.session.flush()  # asigna id y created_at para el evento
+    notify_post_event(db.session, "post-created", post_to_json(new_post))
     db.session.commit()
 
     return jsonify({
@@ -86,17 +117,47 @@ def get_posts():
         else:
             return jsonify({"error": "owner debe ser 'me' o un UUID válido"}), 400
 
-    posts = query.all()
+    # Exportación: se emite el arreglo JSON por lotes desde un cursor del servidor
+    if request.args.get("stream", "").lower() == "true":
+        rows = query.order_by(Post.created_at, Post.id).yield_per(POSTS_STREAM_BATCH)
+        return Response(stream_with_context(stream_posts(rows)), mimetype="application/json")
+
+    limit = request.args.get("limit")
+    if limit is None:
+        posts = query.all()
+        return jsonify([post_to_json(post) for post in posts]), 200
+
+    # Paginación por keyset sobre (created_at, id)
+    if not limit.isdigit() or not 0 < int(limit) <= POSTS_MAX_LIMIT:
+        return jsonify({"error": f"limit debe ser un entero entre 1 y {POSTS_MAX_LIMIT}"}), 400
+    limit = int(limit)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor)
+        if not position:
+            return jsonify({"error": "cursor inválido"}), 400
+        created_at, post_id = position
+        query = query.filter(or_(
+            Post.created_at > created_at,
+            and_(Post.created_at == created_at, Post.id > post_id)
+        ))
+
+    posts = query.order_by(Post.created_at, Post.id).limit(limit + 1).all()
+    has_more = len(posts) > limit
+    posts = posts[:limit]
 
-    return jsonify([
-        {
-            "id": str(post.id),
-            "routeId": str(post.route_id),
-            "userId": str(post.user_id),
-            "expireAt": post.expire_at.isoformat() + "Z",
-            "createdAt": post.created_at.isoformat() + "Z"
-        } for post in posts
-    ]), 200
+    return jsonify({
+        "posts": [post_to_json(post) for post in posts],
+        "next": encode_cursor(posts[-1]) if has_more else None
+    }), 200
+
+def stream_posts(rows):
+    """Genera el arreglo JSON elemento por elemento sin cargar toda la consulta."""
+    yield "["
+    for index, post in enumerate(rows):
+        yield ("," if index else "") + json.dumps(post_to_json(post))
+    yield "]"
 
 # Endpoint para consultar una publicación específica
 @posts_bp.route('/posts/<uuid:id>', methods=['GET'])
@@ -110,13 +171,7 @@ def get_post(id):
     if not post:
         return jsonify({"error": "Publicación no encontrada"}), 404
 
-    return jsonify({
-        "id": str(post.id),
-        "routeId": str(post.route_id),
-        "userId": str(post.user_id),
-        "expireAt": post.expire_at.isoformat() + "Z",
-        "createdAt": post.created_at.isoformat() + "Z"
-    }), 200
+    return jsonify(post_to_json(post)), 200
 
 # Endpoint para eliminar una publicación
 @posts_bp.route('/posts/<uuid:id>', methods=['DELETE'])
@@ -135,6 +190,7 @@ def delete_post(id):
         return jsonify({"error": "No tienes permiso para eliminar esta publicación"}), 403
 
     db.session.delete(post)
+    notify_post_event(db.session, "post-deleted", post_to_json(post))
     db.session.commit()
 
     return jsonify({"msg": "La publicación fue eliminada"}), 200
@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import text
+from cache import token_cache
+from db import db
+from common.outbox import verify_signature
+
+webhooks_bp = Blueprint('webhooks', __name__)
+
+# Eventos de users que dejan obsoletas las respuestas de /users/me cacheadas
+USER_EVENTS = ("user.updated", "user.token_issued")
+
+# Canal de NOTIFY con el que el worker que recibe el evento avisa a los demás workers;
+# el hilo LISTEN de cada worker (feed.start_listener) y el del servidor del feed
+# invalidan su propia caché
+AUTH_CHANNEL = "posts_auth"
+
+def broadcast_invalidation(user_id):
+    """Descarta los tokens cacheados del usuario en este worker y en los demás.
+
+    Si un worker no está escuchando (por ejemplo mientras su hilo LISTEN se reconecta)
+    pierde el aviso; en ese caso USERS_AUTH_CACHE_TTL es el límite de la inconsistencia.
+    """
+    invalidated = token_cache.invalidate_user(user_id)
+    if user_id and db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_notify(:channel, :user_id)"),
+                           {"channel": AUTH_CHANNEL, "user_id": str(user_id)})
+        db.session.commit()
+    return invalidated
+
+# Endpoint que recibe los eventos del outbox de users y routes (entrega al menos una vez)
+@webhooks_bp.route('/posts/webhooks/outbox', methods=['POST'])
+def receive_outbox_event():
+    # Mismo OUTBOX_SECRET con el que users y routes firman los eventos de su outbox
+    if not verify_signature(request.get_data(), request.headers.get("X-Outbox-Signature")):
+        return jsonify({"error": "Firma inválida"}), 401
+
+    event = request.get_json(silent=True) or {}
+    # Invalidar es idempotente, así que los duplicados no requieren deduplicación; si el
+    # aviso a los demás workers falla se responde 500 y users reintenta el evento
+    invalidated = 0
+    if event.get("type") in USER_EVENTS:
+        invalidated = broadcast_invalidation(event.get("payload", {}).get("userId"))
+
+    # Los tipos desconocidos también se confirman para que no se reintenten
+    return jsonify({"id": event.get("id"), "invalidated": invalidated}), 200
@@ -0,0 +1,249 @@
+import asyncio
+import threading
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from src.feed import PostFeed, notify_post_event, post_feed
+
+
+### 🧪 TEST: Selección de particiones expiradas ###
+def test_expired_partitions():
+    from datetime import date, datetime
+    from src import partitions
+
+    class FakeResult:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def scalars(self):
+            return iter(self.rows)
+
+    class FakeConnection:
+        def execute(self, *args, **kwargs):
+            return FakeResult(["posts_default", "posts_p202501", "posts_p202502", "posts_p202503"])
+
+    now = datetime(2025, 4, 15)
+    # Con 30 días de retención solo marzo sigue dentro del periodo
+    assert partitions.expired_partitions(FakeConnection(), now=now) == ["posts_p202501", "posts_p202502"]
+    assert partitions.add_months(date(2025, 12, 1), 1) == date(2026, 1, 1)
+
+
+### 🧪 TEST: Un mes que falla no detiene las demás particiones ni el archivado ###
+def test_run_maintenance_isolates_failures(monkeypatch):
+    from contextlib import contextmanager
+    from datetime import date
+    from src import partitions
+
+    class FakeResult:
+        def __init__(self, value):
+            self.value = value
+
+        def scalar(self):
+            return self.value
+
+        def scalars(self):
+            return iter(["posts_p202001"])
+
+    class FakeConnection:
+        def __init__(self):
+            self.statements, self.transactions = [], []
+
+        @contextmanager
+        def begin(self):
+            self.statements.append("BEGIN")
+            try:
+                yield
+                self.transactions.append("commit")
+            except Exception:
+                self.transactions.append("rollback")
+                raise
+
+        def commit(self):
+            pass
+
+        def execute(self, statement, params=None):
+            statement = str(statement)
+            self.statements.append(statement)
+            if "create_posts_partition" in statement and params["month"].month == 2:
+                raise RuntimeError("posts_default contiene filas de febrero")
+            return FakeResult(True)
+
+    class FakeEngine:
+        def __init__(self):
+            self.connection = FakeConnection()
+
+        @contextmanager
+        def connect(self):
+            yield self.connection
+
+    engine = FakeEngine()
+    monkeypatch.setattr(partitions, "POSTS_PARTITIONS_AHEAD", 2)
+    failed = partitions.ensure_partitions(engine.connection, today=date(2025, 1, 10))
+    assert failed == [date(2025, 2, 1)]
+    assert engine.connection.transactions == ["commit", "rollback", "commit"]
+
+    assert partitions.run_maintenance(engine) == ["posts_p202001"]
+    assert any("DETACH PARTITION" in statement for statement in engine.connection.statements)
+    assert "pg_advisory_unlock" in engine.connection.statements[-1]
+
+
+### 🧪 TEST: El mes actual se toma en UTC, igual que expire_at ###
+def test_ensure_partitions_uses_utc(monkeypatch):
+    from datetime import date, datetime
+    from src import partitions
+
+    class FakeConnection:
+        def __init__(self):
+            self.months = []
+
+        def begin(self):
+            from contextlib import nullcontext
+            return nullcontext()
+
+        def execute(self, statement, params=None):
+            self.months.append(params["month"])
+
+    class UTCMidnight(datetime):
+        # 1 de marzo en UTC mientras la hora local todavía es 28 de febrero
+        @classmethod
+        def utcnow(cls):
+            return datetime(2025, 3, 1, 0, 30)
+
+    monkeypatch.setattr(partitions, "datetime", UTCMidnight)
+    monkeypatch.setattr(partitions, "POSTS_PARTITIONS_AHEAD", 0)
+    connection = FakeConnection()
+    partitions.ensure_partitions(connection)
+    assert connection.months == [date(2025, 3, 1)]
+
+
+### 🧪 TEST: El feed filtra por trayecto y reanuda desde Last-Event-ID ###
+def test_post_feed_stream_and_resume():
+    async def scenario():
+        feed = PostFeed(size=3)
+        feed.attach(asyncio.get_running_loop())
+        events = feed.stream(route_id="r1", heartbeat=0.01)
+        assert (await anext(events)).startswith(b"retry:")
+
+        feed.publish("post-created", {"id": "p1", "routeId": "r1", "userId": "u1"})
+        feed.publish("post-created", {"id": "p2", "routeId": "r2", "userId": "u1"})
+        frame = await anext(events)
+        assert b"event: post-created" in frame and b'"p1"' in frame and b'"p2"' not in frame
+        assert await anext(events) == b": keep-alive\n\n"
+
+        # Reanudación en el mismo proceso: se repite solo lo posterior en orden de llegada
+        last_id = frame.split(b"\n")[0].split(b": ")[1].decode()
+        _, backlog, complete = feed.subscribe(last_id)
+        assert complete and [event.seq for event in backlog] == [2]
+
+        # En otro proceso se repite la ventana FEED_REPLAY_WINDOW (con posibles duplicados)
+        other = PostFeed(size=3)
+        other.publish("post-created", {"id": "p1", "routeId": "r1", "userId": "u1"})
+        _, backlog, _ = other.subscribe(last_id)
+        assert len(backlog) == 1
+
+        # Un id que ya salió del búfer pide al cliente volver a consultar
+        for index in range(3):
+            feed.publish("post-expired", {"id": f"x{index}"})
+        _, _, complete = feed.subscribe(last_id)
+        assert not complete
+        resumed = feed.stream(last_id, heartbeat=0.01)
+        await anext(resumed)
+        assert (await anext(resumed)).startswith(b"event: reset")
+        await events.aclose()
+        await resumed.aclose()
+
+    asyncio.run(scenario())
+
+
+### 🧪 TEST: Una publicación desde otro hilo despierta a las conexiones sin esperar el keep-alive ###
+def test_post_feed_wakes_from_other_thread():
+    async def scenario():
+        feed = PostFeed()
+        feed.attach(asyncio.get_running_loop())
+        events = feed.stream(heartbeat=30)
+        await anext(events)
+        publisher = threading.Timer(0.05, feed.publish, ("post-created", {"id": "p1"}))
+        publisher.start()
+        frame = await asyncio.wait_for(anext(events), 2)
+        assert b'"p1"' in frame
+        await events.aclose()
+
+    asyncio.run(scenario())
+
+
+### 🧪 TEST: Al reconectarse LISTEN todas las conexiones reciben reset ###
+def test_post_feed_reset_reaches_filtered_streams():
+    async def scenario():
+        feed = PostFeed()
+        feed.attach(asyncio.get_running_loop())
+        events = feed.stream(route_id="r1", user_id="u1", heartbeat=0.01)
+        await anext(events)
+        feed.publish("reset", {})
+        assert b"event: reset" in await anext(events)
+        await events.aclose()
+
+    asyncio.run(scenario())
+
+
+### 🧪 TEST: El hilo LISTEN avisa la reconexión tras un error ###
+def test_start_listener_reports_reconnect(monkeypatch):
+    from src import feed
+
+    class FakeDriver:
+        notifies = []
+
+    class FakeConnection:
+        def invalidate(self):
+            pass
+
+    attempts = []
+
+    def fake_listen(engine, channels):
+        attempts.append(list(channels))
+        return FakeConnection(), FakeDriver()
+
+    def fake_select(readers, writers, errors, timeout):
+        if len(attempts) == 1:
+            raise OSError("conexión perdida")
+        return [], [], []
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db = SQLAlchemy(app)
+    monkeypatch.setattr(feed, "_listen", fake_listen)
+    monkeypatch.setattr(feed.select, "select", fake_select)
+    with app.app_context():
+        monkeypatch.setattr(type(db.engine.dialect), "name", "postgresql")
+    reconnected = threading.Event()
+    stop = feed.start_listener(app, db, {"canal": print}, interval=0.01, on_reconnect=reconnected.set)
+    try:
+        assert reconnected.wait(2)
+        assert attempts[:2] == [["canal"], ["canal"]]
+    finally:
+        stop.set()
+
+
+### 🧪 TEST: Las conexiones al feed se limitan por proceso ###
+def test_post_feed_max_streams():
+    feed = PostFeed(max_streams=1)
+    assert feed.reserve()
+    assert not feed.reserve() and feed.rejected == 1
+    feed.release()
+    assert feed.reserve() and feed.listeners == 1
+
+
+### 🧪 TEST: Sin PostgreSQL los eventos se publican solo tras el commit ###
+def test_notify_post_event_after_commit():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db = SQLAlchemy(app)
+    published = post_feed.published
+    with app.app_context():
+        notify_post_event(db.session, "post-deleted", {"id": "p1"})
+        db.session.rollback()
+        assert post_feed.published == published
+
+        notify_post_event(db.session, "post-created", {"id": "p2"})
+        db.session.commit()
+        assert post_feed.published == published + 1
+    post_feed.clear()
@@ -3,12 +3,31 @@ from flask import Flask
 from db import db
 from config import Config
 from routes import register_routes
+from common.replicas import init_replicas, replica_router
+from common.metrics import init_metrics, register_cache, register_collector
+from catalog import route_catalog
+from common.sql_metrics import init_sql_metrics
+from common.outbox import OutboxDispatcher, start_dispatcher
+from models import OutboxEvent
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Inicializar la base de datos
+# Inicializar la base de datos y las réplicas de lectura
 db.init_app(app)
+init_replicas(app)
+
+# Conteo y tiempos de SQL por solicitud
+init_sql_metrics(app, db)
+
+# Métricas en formato Prometheus expuestas en /metrics
+init_metrics(app, db)
+register_collector(replica_router.metric_lines)
+register_cache("route_catalog", route_catalog)
+
+# Entrega de los eventos del outbox a los suscriptores (OUTBOX_WEBHOOKS)
+outbox_dispatcher = OutboxDispatcher(OutboxEvent, source="routes")
+register_collector(outbox_dispatcher.metric_lines)
 
 # Registrar las rutas del microservicio
 register_routes(app)
@@ -17,6 +36,23 @@ register_routes(app)
 with app.app_context():
     db.create_all()
 
+def start_background_tasks():
+    # Sin webhooks los eventos igual se marcan como entregados y se purgan; el advisory
+    # lock deja a un solo worker entregando a la vez
+    if os.getenv("ENV") != "test":
+        start_dispatcher(app, db, outbox_dispatcher)
+
+def init_worker():
+    """Se ejecuta en cada worker de gunicorn tras el fork: descarta las conexiones heredadas
+    del maestro (dispose(close=False)) y arranca el despachador del outbox de trayectos;
+    el advisory lock deja que solo un worker entregue a la vez."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # Los hilos no sobreviven al fork
+    start_background_tasks()
+
 if __name__ == '__main__':
+    start_background_tasks()
     port = int(os.getenv("CONFIG_PORT", 5002)) 
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select
+from db import db
+from models import OutboxEvent, Route
+from search_index import route_index
+
+# Cada cuánto (segundos) se buscan cambios de otros workers en outbox_events
+ROUTE_CACHE_CHECK_INTERVAL = float(os.getenv("ROUTE_CACHE_CHECK_INTERVAL", 1))
+# Segundos tras los cuales un evento del outbox se da por asentado: ninguna transacción
+# con un id menor puede seguir abierta (ver DB_IDLE_IN_TRANSACTION_TIMEOUT)
+ROUTE_CATALOG_SETTLE = float(os.getenv("ROUTE_CATALOG_SETTLE", 60))
+
+
+class RouteCatalog:
+    """Caché write-through de trayectos serializados (bytes JSON) por id y por flightId.
+
+    Toda escritura de trayectos agrega su evento a outbox_events en la misma transacción,
+    así que esa tabla sirve también como registro de cambios del catálogo:
+
+    - El worker que escribe aplica el cambio localmente al confirmar.
+    - Cada ROUTE_CACHE_CHECK_INTERVAL segundos cada worker lee solo los eventos nuevos y
+      vuelve a consultar únicamente los trayectos que cambiaron.
+    - El catálogo completo solo se carga al arrancar, tras invalidate() o con un evento
+      routes.reset.
+
+    Un solo hilo por worker carga o sincroniza a la vez; los demás responden con el
+    catálogo vigente y solo esperan si todavía no se ha cargado.
+
+    Los ids del outbox se asignan al insertar y no al confirmar, así que un evento puede
+    hacerse visible después de otro con id mayor. Por eso `position` solo avanza sobre
+    los eventos con más de ROUTE_CATALOG_SETTLE segundos y los recientes se releen en cada
+    ciclo; `applied` evita volver a aplicarlos, y aplicarlos dos veces tampoco cambiaría
+    nada porque el trayecto se lee de la base.
+    """
+
+    def __init__(self, check_interval=ROUTE_CACHE_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.position = None   # id del outbox hasta el cual todo está aplicado
+        self.applied = set()   # ids posteriores a position ya aplicados
+        self.checked_at = 0.0
+        self.by_id = {}
+        self.by_flight = {}
+        self._list = None
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _encode(self, route):
+        return current_app.json.dumps(route.to_json()).encode()
+
+    def ensure_fresh(self):
+        if self.position is not None and time.monotonic() - self.checked_at < self.check_interval:
+            return
+        if not self._sync_lock.acquire(blocking=self.position is None):
+            return  # Otro hilo ya está sincronizando
+        try:
+            if self.position is None:
+                self.reload()
+            elif time.monotonic() - self.checked_at >= self.check_interval:
+                self.sync()
+            self.checked_at = time.monotonic()
+        finally:
+            self._sync_lock.release()
+
+    def reload(self):
+        """Carga el catálogo completo y se ubica en el último evento asentado."""
+        horizon = datetime.utcnow() - timedelta(seconds=ROUTE_CATALOG_SETTLE)
+        position = db.session.execute(
+            select(func.coalesce(func.max(OutboxEvent.id), 0)).where(OutboxEvent.created_at <= horizon)
+        ).scalar()
+        # Los eventos ya visibles quedan reflejados en los trayectos que se leen después
+        applied = set(db.session.execute(select(OutboxEvent.id).where(OutboxEvent.id > position)).scalars())
+        routes = Route.query.all()
+        with self._lock:
+            self.by_id = {route.id: self._encode(route) for route in routes}
+            self.by_flight = {route.flightId: route.id for route in routes}
+            self._list = None
+            route_index.load(routes)
+            self.position, self.applied = position, applied
+            self.reloads += 1
+
+    def sync(self):
+        """Aplica los eventos de trayectos posteriores a `position` que aún no se aplicaron."""
+        horizon = datetime.utcnow() - timedelta(seconds=ROUTE_CATALOG_SETTLE)
+        events = db.session.execute(
+            select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload, OutboxEvent.created_at)
+            .where(OutboxEvent.id > self.position).order_by(OutboxEvent.id)
+        ).all()
+
+        position, settled = self.position, True
+        changed, deleted, applied = set(), [], []
+        for event in events:
+            settled = settled and event.created_at <= horizon
+            if settled:
+                position = event.id
+            if event.id in self.applied:
+                continue
+            if event.event_type == "routes.reset":
+                return self.reload()
+            if event.event_type == "route.created":
+                changed.add(event.payload["routeId"])
+            elif event.event_type == "routes.imported":
+                changed.update(event.payload["routeIds"])
+            elif event.event_type == "route.deleted":
+                deleted.append((event.payload["routeId"], event.payload["flightId"]))
+            applied.append(event.id)
+
+        routes = Route.query.filter(Route.id.in_(changed)).all() if changed else []
+        with self._lock:
+            # Se borra antes de agregar: un flightId eliminado pudo reutilizarse en otro trayecto
+            for route_id, flight_id in deleted:
+                self._drop(route_id, flight_id)
+            for route in routes:
+                self._store(route)
+            if deleted or routes:
+                self._list = None
+            self.applied.update(applied)
+            self.position = position
+            self.applied = {event_id for event_id in self.applied if event_id > position}
+
+    def _store(self, route):
+        self.by_id[route.id] = self._encode(route)
+        self.by_flight[route.flightId] = route.id
+        route_index.add(route)
+
+    def _drop(self, route_id, flight_id):
+        self.by_id.pop(route_id, None)
+        if self.by_flight.get(flight_id) == route_id:
+            self.by_flight.pop(flight_id)
+        route_index.remove(route_id)
+
+    def _applied_locally(self, event_id):
+        if self.position is not None and event_id > self.position:
+            self.applied.add(event_id)
+
+    def put(self, route, event_id):
+        """Aplica una escritura de este worker; `event_id` es el id de su evento en el outbox."""
+        with self._lock:
+            self._store(route)
+            self._list = None
+            self._applied_locally(event_id)
+
+    def remove(self, route_id, flight_id, event_id):
+        with self._lock:
+            self._drop(route_id, flight_id)
+            self._list = None
+            self._applied_locally(event_id)
+
+    def expire(self):
+        """La próxima lectura busca cambios sin esperar ROUTE_CACHE_CHECK_INTERVAL."""
+        self.checked_at = 0.0
+
+    def invalidate(self):
+        """La próxima lectura carga el catálogo completo."""
+        with self._lock:
+            self.position = None
+
+    def _load_missing(self, route):
+        """Lectura de respaldo para filas escritas sin pasar por la API (sin evento en el outbox)."""
+        if route is None:
+            return None
+        with self._lock:
+            self.by_id[route.id] = self._encode(route)
+            self.by_flight[route.flightId] = route.id
+            self._list = None
+            route_index.add(route)
+            return self.by_id[route.id]
+
+    def get(self, route_id):
+        encoded = self.by_id.get(route_id)
+        if encoded is None:
+            self.misses += 1
+            encoded = self._load_missing(db.session.get(Route, route_id))
+        else:
+            self.hits += 1
+        return encoded
+
+    def get_by_flight(self, flight_id):
+        route_id = self.by_flight.get(flight_id)
+        if route_id is None:
+            self.misses += 1
+            return self._load_missing(Route.query.filter_by(flightId=flight_id).first())
+        self.hits += 1
+        return self.by_id.get(route_id)
+
+    def encode_list(self, route_ids):
+        return b"[" + b",".join(self.by_id[route_id] for route_id in route_ids) + b"]"
+
+    def all(self):
+        """Arreglo JSON con todo el catálogo; se arma de nuevo solo después de un cambio."""
+        encoded = self._list
+        if encoded is None:
+            with self._lock:
+                encoded = self._list = b"[" + b",".join(self.by_id.values()) + b"]"
+        return encoded
+
+
+route_catalog = RouteCatalog()
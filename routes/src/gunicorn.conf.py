@@ -0,0 +1,5 @@
+"""Gunicorn de routes: gunicorn -c gunicorn.conf.py app:app (ver common/gunicorn_conf.py)."""
+import os
+from common.gunicorn_conf import *  # noqa: F401,F403
+
+bind = f"0.0.0.0:{os.getenv('CONFIG_PORT', 5002)}"
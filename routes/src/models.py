@@ -18,6 +18,13 @@ class Route(db.Model):
     createdAt = db.Column(db.DateTime, default=datetime.utcnow)
     updatedAt = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Índices compuestos para la búsqueda por aeropuertos, países y fechas
+    __table_args__ = (
+        db.Index('idx_routes_airports_start', 'sourceAirportCode', 'destinyAirportCode', 'plannedStartDate'),
+        db.Index('idx_routes_countries_start', 'sourceCountry', 'destinyCountry', 'plannedStartDate'),
+        db.Index('idx_routes_planned_dates', 'plannedStartDate', 'plannedEndDate'),
+    )
+
     def __repr__(self):
         """Devuelve una representación legible del objeto Route."""
         return f"<Route flightId={self.flightId} source={self.sourceAirportCode} -> destiny={self.destinyAirportCode}>"
@@ -38,3 +45,23 @@ class Route(db.Model):
             "updatedAt": self.updatedAt.isoformat(),
         }
 
+
+class OutboxEvent(db.Model):
+    """Eventos de dominio pendientes de publicar (ver outbox.py)."""
+    __tablename__ = 'outbox_events'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    aggregate_id = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    delivered_at = db.Column(db.DateTime, nullable=True)
+    dead_lettered_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_outbox_events_pending', 'id',
+                 postgresql_where=delivered_at.is_(None) & dead_lettered_at.is_(None)),
+    )
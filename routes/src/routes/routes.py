@@ -1,87 +1,328 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from db import db
-from models import Route
-from datetime import datetime
+from models import OutboxEvent, Route
+from common.tokens import is_signed_token, verify_token
+from search_index import route_index
+from catalog import route_catalog
+from common.outbox import add_event
+from datetime import datetime, timezone
+from itertools import islice
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+import csv
+import io
+import json
+import os
 import uuid
 
 routes_bp = Blueprint('routes', __name__)
 
-### CREAR TRAYECTO ###
-@routes_bp.route('/routes', methods=['POST'])
-def create_route():
-    data = request.get_json()
-    token_user_id = request.headers.get("Authorization")
+ROUTES_IMPORT_BATCH = int(os.getenv("ROUTES_IMPORT_BATCH", 1000))
+ROUTES_IMPORT_MAX_ERRORS = int(os.getenv("ROUTES_IMPORT_MAX_ERRORS", 1000))
+ROUTES_MAX_IDS = int(os.getenv("ROUTES_MAX_IDS", 100))
 
-    # Validar si hay token
-    if not token_user_id:
+# Proyección compacta de GET /routes?ids= para los clientes que enriquecen listas
+COMPACT_ROUTE_COLUMNS = (Route.id, Route.flightId, Route.sourceAirportCode, Route.destinyAirportCode,
+                         Route.bagCost, Route.plannedStartDate, Route.plannedEndDate)
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def token_error():
+    """Valida el encabezado Authorization; retorna la respuesta de error o None."""
+    auth_header = request.headers.get("Authorization")
+    if not auth_header:
         return jsonify({"msg": "No hay token en la solicitud"}), 403
 
+    # Los tokens firmados por users se verifican localmente (firma, expiración y revocación)
+    token = auth_header.split(" ")[-1]
+    if is_signed_token(token) and not verify_token(token):
+        return jsonify({"msg": "Token inválido o expirado"}), 401
+
+    return None
+
+def parse_utc(value):
+    """Fecha ISO 8601 como datetime UTC sin zona, igual a como se guardan los trayectos."""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+REQUIRED_FIELDS = ["flightId", "sourceAirportCode", "sourceCountry",
+                   "destinyAirportCode", "destinyCountry", "bagCost",
+                   "plannedStartDate", "plannedEndDate"]
+
+def validate_route(data, flight_exists):
+    """Reglas de creación de un trayecto; retorna (campos, None) o (None, (mensaje, código))."""
     # Validar si faltan campos en la solicitud
-    required_fields = ["flightId", "sourceAirportCode", "sourceCountry",
-                       "destinyAirportCode", "destinyCountry", "bagCost",
-                       "plannedStartDate", "plannedEndDate"]
-    
-    if not all(field in data for field in required_fields):
-        return jsonify({"msg": "Parámetros inválidos"}), 400
+    if not all(data.get(field) not in (None, "") for field in REQUIRED_FIELDS):
+        return None, ("Parámetros inválidos", 400)
 
     # Validar que `flightId` no exista
-    existing_route = Route.query.filter_by(flightId=data['flightId']).first()
-    if existing_route:
-        return jsonify({"msg": "El flightId ya existe"}), 412
+    if flight_exists(data["flightId"]):
+        return None, ("El flightId ya existe", 412)
 
     # Validar fechas
     try:
         planned_start_date = datetime.fromisoformat(data['plannedStartDate'])
         planned_end_date = datetime.fromisoformat(data['plannedEndDate'])
         if planned_start_date >= planned_end_date or planned_start_date < datetime.utcnow():
-            return jsonify({"msg": "Las fechas del trayecto no son válidas"}), 412
-    except ValueError:
-        return jsonify({"msg": "Formato de fecha inválido"}), 400
+            return None, ("Las fechas del trayecto no son válidas", 412)
+    except (TypeError, ValueError):
+        return None, ("Formato de fecha inválido", 400)
 
-    # Crear el trayecto
-    route = Route(
-        id=str(uuid.uuid4()),
-        flightId=data["flightId"],
-        sourceAirportCode=data["sourceAirportCode"],
-        sourceCountry=data["sourceCountry"],
-        destinyAirportCode=data["destinyAirportCode"],
-        destinyCountry=data["destinyCountry"],
-        bagCost=data["bagCost"],
-        plannedStartDate=planned_start_date,
-        plannedEndDate=planned_end_date,
-        createdAt=datetime.utcnow(),
-        updatedAt=datetime.utcnow()
+    try:
+        bag_cost = int(data["bagCost"])
+    except (TypeError, ValueError):
+        return None, ("Parámetros inválidos", 400)
+
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()),
+        "flightId": data["flightId"],
+        "sourceAirportCode": data["sourceAirportCode"],
+        "sourceCountry": data["sourceCountry"],
+        "destinyAirportCode": data["destinyAirportCode"],
+        "destinyCountry": data["destinyCountry"],
+        "bagCost": bag_cost,
+        "plannedStartDate": planned_start_date,
+        "plannedEndDate": planned_end_date,
+        "createdAt": now,
+        "updatedAt": now
+    }, None
+
+### CREAR TRAYECTO ###
+@routes_bp.route('/routes', methods=['POST'])
+def create_route():
+    data = request.get_json()
+
+    # Validar el token
+    error = token_error()
+    if error:
+        return error
+
+    fields, error = validate_route(
+        data, lambda flight_id: Route.query.filter_by(flightId=flight_id).first() is not None
     )
+    if error:
+        msg, code = error
+        return jsonify({"msg": msg}), code
+
+    # Crear el trayecto
+    route = Route(**fields)
 
     # Guardar en la base de datos
     db.session.add(route)
-    db.session.commit()
+    try:
+        # El evento se confirma en la misma transacción que el trayecto (outbox)
+        event = add_event(db.session, OutboxEvent, "route.created", route.id, {
+            "routeId": route.id, "flightId": route.flightId
+        })
+        db.session.commit()
+    except IntegrityError:
+        # Otra solicitud creó el mismo flightId después de la validación
+        db.session.rollback()
+        return jsonify({"msg": "El flightId ya existe"}), 412
+    except DataError:
+        db.session.rollback()
+        return jsonify({"msg": "Parámetros inválidos"}), 400
+    route_catalog.put(route, event.id)
 
     return jsonify({"id": route.id, "createdAt": route.createdAt.isoformat()}), 201
 
 
+### IMPORTAR TRAYECTOS EN LOTE (JSONL O CSV) ###
+@routes_bp.route('/routes/import', methods=['POST'])
+def import_routes():
+    error = token_error()
+    if error:
+        return error
+
+    # El cuerpo se lee línea por línea, sin cargarlo completo en memoria
+    body = io.TextIOWrapper(io.BufferedReader(request.stream), encoding="utf-8")
+    if "csv" in (request.content_type or ""):
+        rows = ((line + 2, dict(row)) for line, row in enumerate(csv.DictReader(body)))
+    else:
+        rows = ((line + 1, row) for line, row in enumerate(body) if row.strip())
+
+    inserted = 0
+    failed = 0
+    errors = []
+    seen_flights = set()
+
+    def report(line, flight_id, msg):
+        nonlocal failed
+        failed += 1
+        if len(errors) < ROUTES_IMPORT_MAX_ERRORS:
+            errors.append({"line": line, "flightId": flight_id, "msg": msg})
+
+    def summary(status=200):
+        # La siguiente lectura aplica los eventos routes.imported sin esperar al intervalo
+        route_catalog.expire()
+        errors.sort(key=lambda error: error["line"])
+        return jsonify({"inserted": inserted, "failed": failed, "errors": errors}), status
+
+    def aborted(pending, status):
+        # La base rechazó el lote sin indicar la fila: los lotes anteriores ya quedaron
+        # confirmados, las filas de este se reportan y el resto del archivo no se procesa
+        for line, fields in pending:
+            report(line, fields["flightId"], "La base de datos rechazó el lote")
+        return summary(status)
+
+    for batch in batched(rows, ROUTES_IMPORT_BATCH):
+        parsed = []
+        for line, row in batch:
+            if isinstance(row, str):
+                try:
+                    row = json.loads(row)
+                except ValueError:
+                    report(line, None, "JSON inválido")
+                    continue
+            if not isinstance(row, dict):
+                report(line, None, "Parámetros inválidos")
+                continue
+            parsed.append((line, row))
+
+        # Una sola consulta por lote para los flightId que ya existen
+        flight_ids = {row.get("flightId") for _, row in parsed if row.get("flightId")}
+        existing = set(db.session.execute(
+            select(Route.flightId).where(Route.flightId.in_(flight_ids))
+        ).scalars()) if flight_ids else set()
+
+        new_routes = []
+        for line, row in parsed:
+            fields, error = validate_route(
+                row, lambda flight_id: flight_id in existing or flight_id in seen_flights
+            )
+            if error:
+                report(line, row.get("flightId"), error[0])
+                continue
+            seen_flights.add(fields["flightId"])
+            new_routes.append((line, fields))
+
+        while new_routes:
+            try:
+                db.session.execute(insert(Route), [fields for _, fields in new_routes])
+                # Un solo evento por lote con los trayectos creados
+                add_event(db.session, OutboxEvent, "routes.imported", new_routes[0][1]["id"], {
+                    "routeIds": [fields["id"] for _, fields in new_routes]
+                })
+                db.session.commit()
+                inserted += len(new_routes)
+                break
+            except IntegrityError:
+                db.session.rollback()
+                # Otra solicitud creó alguno de los flightId después de la consulta del lote:
+                # esas filas fallan como en la creación individual y el resto se reintenta
+                taken = set(db.session.execute(select(Route.flightId).where(
+                    Route.flightId.in_([fields["flightId"] for _, fields in new_routes])
+                )).scalars())
+                for line, fields in new_routes:
+                    if fields["flightId"] in taken:
+                        report(line, fields["flightId"], "El flightId ya existe")
+                if not taken:
+                    return aborted(new_routes, 412)
+                new_routes = [(line, fields) for line, fields in new_routes if fields["flightId"] not in taken]
+            except DataError:
+                db.session.rollback()
+                return aborted(new_routes, 400)
+
+    return summary()
+
+
 ### OBTENER TRAYECTOS (CON FILTRO OPCIONAL) ###
 @routes_bp.route('/routes', methods=['GET'])
 def get_routes():
-    token_user_id = request.headers.get("Authorization")
-    if not token_user_id:
-        return jsonify({"msg": "No hay token en la solicitud"}), 403
+    error = token_error()
+    if error:
+        return error
 
+    if "ids" in request.args:
+        return get_routes_by_ids()
+
+    # Se responde con el catálogo ya serializado, sin pasar por el ORM
+    route_catalog.ensure_fresh()
     flight_id = request.args.get("flight")
-    query = Route.query
     if flight_id:
-        query = query.filter_by(flightId=flight_id)
+        route = route_catalog.get_by_flight(flight_id)
+        body = b"[" + route + b"]" if route else b"[]"
+    else:
+        body = route_catalog.all()
+
+    return Response(body, status=200, mimetype="application/json")
 
-    routes = query.all()
-    return jsonify([route.to_json() for route in routes]), 200
+
+def parse_ids(max_ids):
+    """Ids de ?ids=a,b (o ids repetido) sin duplicados; retorna (ids, respuesta de error)."""
+    ids = list(dict.fromkeys(value.strip() for raw in request.args.getlist("ids")
+                             for value in raw.split(",") if value.strip()))
+    if not ids or len(ids) > max_ids:
+        return None, (jsonify({"msg": f"ids debe tener entre 1 y {max_ids} valores"}), 400)
+    try:
+        for value in ids:
+            uuid.UUID(value)
+    except ValueError:
+        return None, (jsonify({"msg": "Los ids deben tener formato uuid"}), 400)
+    return ids, None
+
+def get_routes_by_ids():
+    """Consulta en lote: un solo SELECT ... WHERE id IN (...) con las columnas compactas."""
+    route_ids, error = parse_ids(ROUTES_MAX_IDS)
+    if error:
+        return error
+
+    rows = db.session.execute(select(*COMPACT_ROUTE_COLUMNS).where(Route.id.in_(route_ids))).all()
+    found = {row.id: {
+        "id": row.id,
+        "flightId": row.flightId,
+        "sourceAirportCode": row.sourceAirportCode,
+        "destinyAirportCode": row.destinyAirportCode,
+        "bagCost": row.bagCost,
+        "plannedStartDate": row.plannedStartDate.isoformat(),
+        "plannedEndDate": row.plannedEndDate.isoformat()
+    } for row in rows}
+
+    # Los ids que no existen quedan en null
+    return jsonify({route_id: found.get(route_id) for route_id in route_ids}), 200
+
+
+### BUSCAR TRAYECTOS POR AEROPUERTOS, PAÍSES Y VENTANA DE FECHAS ###
+@routes_bp.route('/routes/search', methods=['GET'])
+def search_routes():
+    error = token_error()
+    if error:
+        return error
+
+    # Ventana de fechas: trayectos que se cruzan con [from, to]
+    try:
+        window_start = parse_utc(request.args["from"]) if "from" in request.args else None
+        window_end = parse_utc(request.args["to"]) if "to" in request.args else None
+    except ValueError:
+        return jsonify({"msg": "Formato de fecha inválido"}), 400
+
+    # El índice se actualiza junto con el catálogo (ver catalog.py)
+    route_catalog.ensure_fresh()
+    route_ids = route_index.search(
+        source=request.args.get("source"),
+        destiny=request.args.get("destiny"),
+        source_country=request.args.get("sourceCountry"),
+        destiny_country=request.args.get("destinyCountry"),
+        window_start=window_start,
+        window_end=window_end
+    )
+    return Response(route_catalog.encode_list(route_ids), status=200, mimetype="application/json")
 
 
 ### CONSULTAR UN TRAYECTO POR ID ###
 @routes_bp.route('/routes/<string:route_id>', methods=['GET'])
 def get_route_by_id(route_id):
-    token_user_id = request.headers.get("Authorization")
-    if not token_user_id:
-        return jsonify({"msg": "No hay token en la solicitud"}), 403
+    error = token_error()
+    if error:
+        return error
 
     # Validar que el ID sea un UUID válido
     try:
@@ -89,19 +330,20 @@ def get_route_by_id(route_id):
     except ValueError:
         return jsonify({"msg": "El id no es un valor string con formato uuid"}), 400
 
-    route = Route.query.get(route_id)
+    route_catalog.ensure_fresh()
+    route = route_catalog.get(route_id)
     if not route:
         return jsonify({"msg": "El trayecto con ese id no existe"}), 404
 
-    return jsonify(route.to_json()), 200
+    return Response(route, status=200, mimetype="application/json")
 
 
 ### ELIMINAR TRAYECTO ###
 @routes_bp.route('/routes/<string:route_id>', methods=['DELETE'])
 def delete_route(route_id):
-    token_user_id = request.headers.get("Authorization")
-    if not token_user_id:
-        return jsonify({"msg": "No hay token en la solicitud"}), 403
+    error = token_error()
+    if error:
+        return error
 
     # Validar que el ID sea un UUID válido
     try:
@@ -113,8 +355,13 @@ def delete_route(route_id):
     if not route:
         return jsonify({"msg": "El trayecto con ese id no existe"}), 404
 
+    flight_id = route.flightId
     db.session.delete(route)
+    event = add_event(db.session, OutboxEvent, "route.deleted", route_id, {
+        "routeId": route_id, "flightId": flight_id
+    })
     db.session.commit()
+    route_catalog.remove(route_id, flight_id, event.id)
     
     return jsonify({"msg": "El trayecto fue eliminado"}), 200
 
@@ -129,5 +376,9 @@ def health_check():
 @routes_bp.route('/routes/reset', methods=['POST'])
 def reset_database():
     db.session.query(Route).delete()
+    db.session.query(OutboxEvent).delete()
+    # Los demás workers recargan el catálogo completo al leer este evento
+    add_event(db.session, OutboxEvent, "routes.reset", "routes", {})
     db.session.commit()
+    route_catalog.invalidate()
     return jsonify({"msg": "Todos los datos fueron eliminados"}), 200
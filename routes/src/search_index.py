@@ -0,0 +1,129 @@
+import bisect
+import threading
+from collections import defaultdict, namedtuple
+
+RouteEntry = namedtuple("RouteEntry", [
+    "id", "source", "source_country", "destiny", "destiny_country", "start", "end"
+])
+
+
+class RouteIndex:
+    """Índice en memoria de trayectos para búsquedas por aeropuertos, países y ventana de fechas.
+
+    Cada grupo (todos, por aeropuerto o país de origen, de destino y por par
+    origen-destino) es una lista ordenada por plannedStartDate. Como la duración de un trayecto está acotada por
+    `max_duration`, los trayectos que se cruzan con la ventana [desde, hasta] están
+    entre las posiciones de `desde - max_duration` y `hasta`, que se ubican con bisect.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.entries = {}
+        self.max_duration = None
+        self._all = []
+        self._by_source = defaultdict(list)
+        self._by_destiny = defaultdict(list)
+        self._by_pair = defaultdict(list)
+        self._by_source_country = defaultdict(list)
+        self._by_destiny_country = defaultdict(list)
+        self._by_country_pair = defaultdict(list)
+
+    def _groups(self, entry):
+        return (self._all, self._by_source[entry.source], self._by_destiny[entry.destiny],
+                self._by_pair[(entry.source, entry.destiny)],
+                self._by_source_country[entry.source_country],
+                self._by_destiny_country[entry.destiny_country],
+                self._by_country_pair[(entry.source_country, entry.destiny_country)])
+
+    def load(self, routes):
+        """Reconstruye el índice a partir de todos los trayectos (un solo ordenamiento por grupo)."""
+        with self._lock:
+            self._reset()
+            for route in routes:
+                entry = self._entry(route)
+                self._track(entry)
+                for group in self._groups(entry):
+                    group.append((entry.start, entry.id))
+            for groups in (self._by_source, self._by_destiny, self._by_pair, self._by_source_country,
+                           self._by_destiny_country, self._by_country_pair):
+                for group in groups.values():
+                    group.sort()
+            self._all.sort()
+
+    def _entry(self, route):
+        return RouteEntry(route.id, route.sourceAirportCode, route.sourceCountry,
+                          route.destinyAirportCode, route.destinyCountry,
+                          route.plannedStartDate, route.plannedEndDate)
+
+    def _track(self, entry):
+        self.entries[entry.id] = entry
+        duration = entry.end - entry.start
+        if self.max_duration is None or duration > self.max_duration:
+            self.max_duration = duration
+
+    def add(self, route):
+        entry = self._entry(route)
+        with self._lock:
+            if entry.id in self.entries:
+                self.remove(entry.id)
+            self._track(entry)
+            for group in self._groups(entry):
+                bisect.insort(group, (entry.start, entry.id))
+
+    def remove(self, route_id):
+        with self._lock:
+            entry = self.entries.pop(route_id, None)
+            if entry is None:
+                return
+            for group in self._groups(entry):
+                position = bisect.bisect_left(group, (entry.start, entry.id))
+                if position < len(group) and group[position] == (entry.start, entry.id):
+                    del group[position]
+
+    def search(self, source=None, destiny=None, source_country=None, destiny_country=None,
+               window_start=None, window_end=None):
+        """Retorna los ids de los trayectos (ordenados por plannedStartDate) que cumplen los filtros."""
+        with self._lock:
+            if source and destiny:
+                group = self._by_pair.get((source, destiny), [])
+            elif source:
+                group = self._by_source.get(source, [])
+            elif destiny:
+                group = self._by_destiny.get(destiny, [])
+            # Sin aeropuertos, los países también tienen su propio grupo
+            elif source_country and destiny_country:
+                group = self._by_country_pair.get((source_country, destiny_country), [])
+            elif source_country:
+                group = self._by_source_country.get(source_country, [])
+            elif destiny_country:
+                group = self._by_destiny_country.get(destiny_country, [])
+            else:
+                group = self._all
+
+            low, high = 0, len(group)
+            if window_start is not None and self.max_duration is not None:
+                low = bisect.bisect_left(group, (window_start - self.max_duration,))
+            if window_end is not None:
+                high = bisect.bisect_right(group, (window_end, chr(0x10FFFF)))
+
+            results = []
+            for _, route_id in group[low:high]:
+                entry = self.entries[route_id]
+                if window_start is not None and entry.end < window_start:
+                    continue
+                if source_country and entry.source_country != source_country:
+                    continue
+                if destiny_country and entry.destiny_country != destiny_country:
+                    continue
+                results.append(entry.id)
+            return results
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+
+route_index = RouteIndex()
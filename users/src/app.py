@@ -3,12 +3,32 @@ from flask import Flask
 from db import db
 from config import Config
 from routes import register_routes
+from common.replicas import init_replicas, replica_router
+from common.metrics import init_metrics, register_cache, register_collector
+from cache import start_token_invalidations, token_cache, token_invalidations
+from common.sql_metrics import init_sql_metrics
+from common.outbox import OutboxDispatcher, start_dispatcher
+from models.models import OutboxEvent
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Inicializar la base de datos
+# Inicializar la base de datos y las réplicas de lectura
 db.init_app(app)
+init_replicas(app)
+
+# Conteo y tiempos de SQL por solicitud
+init_sql_metrics(app, db)
+
+# Métricas en formato Prometheus expuestas en /metrics
+init_metrics(app, db)
+register_collector(replica_router.metric_lines)
+register_cache("token", token_cache)
+register_collector(token_invalidations.metric_lines)
+
+# Entrega de los eventos del outbox a los suscriptores (OUTBOX_WEBHOOKS)
+outbox_dispatcher = OutboxDispatcher(OutboxEvent, source="users")
+register_collector(outbox_dispatcher.metric_lines)
 
 # Registrar las rutas del microservicio
 register_routes(app)
@@ -18,6 +38,25 @@ with app.app_context():
     if os.getenv("ENV") != "test":
         db.create_all()
 
+def start_background_tasks():
+    # Sin webhooks los eventos igual se marcan como entregados y se purgan; el advisory
+    # lock deja a un solo worker entregando a la vez
+    if os.getenv("ENV") != "test":
+        start_dispatcher(app, db, outbox_dispatcher)
+        # Cada worker descarta de su caché los tokens que cambiaron en otro worker
+        start_token_invalidations(app)
+
+def init_worker():
+    """Se ejecuta en cada worker de gunicorn tras el fork: descarta las conexiones heredadas
+    del maestro sin cerrarlas (dispose(close=False)) e inicia en el worker el despachador
+    del outbox de usuarios y el seguimiento de eventos que invalida su caché de tokens."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # Los hilos no sobreviven al fork
+    start_background_tasks()
+
 if __name__ == '__main__':
+    start_background_tasks()
     port = int(os.getenv("CONFIG_PORT", 5000)) 
     app.run(host="0.0.0.0", port=port)
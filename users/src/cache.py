@@ -0,0 +1,109 @@
+"""
+Caché de tokens validados de /users/me y su invalidación en todos los workers.
+
+Cada worker de gunicorn tiene su propia token_cache. Los cambios que la dejan obsoleta
+(user.updated, user.token_issued y users.reset) se confirman en outbox_events en la misma
+transacción que el cambio, así que cada worker sigue esa tabla con UserEventFollower:
+un hilo lee cada TOKEN_CACHE_SYNC_INTERVAL segundos solo los eventos nuevos y descarta
+los tokens cacheados de los usuarios afectados. El worker que atendió la escritura
+invalida su caché de inmediato; los demás, como mucho TOKEN_CACHE_SYNC_INTERVAL después.
+
+Como en el catálogo de routes, los ids del outbox se asignan al insertar y no al
+confirmar: `position` solo avanza sobre los eventos con más de TOKEN_CACHE_SETTLE segundos
+y los recientes se releen en cada ciclo; `applied` evita invalidarlos dos veces.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from common.cache import TokenCache
+from db import db
+from models.models import OutboxEvent
+
+TOKEN_CACHE_SYNC_INTERVAL = float(os.getenv("TOKEN_CACHE_SYNC_INTERVAL", 1))
+TOKEN_CACHE_SETTLE = float(os.getenv("TOKEN_CACHE_SETTLE", 60))
+# Eventos del outbox que dejan obsoletas las entradas cacheadas de un usuario
+USER_EVENTS = ("user.updated", "user.token_issued")
+
+# Caché del proceso para el endpoint /users/me
+token_cache = TokenCache(
+    max_size=int(os.getenv("TOKEN_CACHE_SIZE", 1024)),
+    ttl=int(os.getenv("TOKEN_CACHE_TTL", 60))
+)
+
+
+class UserEventFollower:
+    """Aplica a una caché de tokens los eventos de usuarios escritos por cualquier worker."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.position = None   # id del outbox hasta el cual todo está aplicado
+        self.applied = set()   # ids posteriores a position ya aplicados
+        self.invalidated = 0
+
+    def sync(self):
+        """Lee los eventos posteriores a `position`; retorna cuántas entradas descartó."""
+        horizon = datetime.utcnow() - timedelta(seconds=TOKEN_CACHE_SETTLE)
+        if self.position is None:
+            # Al arrancar basta con ubicarse: lo ya confirmado se lee de la base al cachear
+            self.position = db.session.execute(
+                select(func.coalesce(func.max(OutboxEvent.id), 0)).where(OutboxEvent.created_at <= horizon)
+            ).scalar()
+            self.applied = set(db.session.execute(
+                select(OutboxEvent.id).where(OutboxEvent.id > self.position)).scalars())
+            return 0
+
+        events = db.session.execute(
+            select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload, OutboxEvent.created_at)
+            .where(OutboxEvent.id > self.position).order_by(OutboxEvent.id)
+        ).all()
+
+        position, settled, invalidated = self.position, True, 0
+        for event in events:
+            settled = settled and event.created_at <= horizon
+            if settled:
+                position = event.id
+            if event.id in self.applied:
+                continue
+            if event.event_type == "users.reset":
+                return self._reset()
+            if event.event_type in USER_EVENTS:
+                invalidated += self.cache.invalidate_user(event.payload["userId"])
+            self.applied.add(event.id)
+
+        self.position = position
+        self.applied = {event_id for event_id in self.applied if event_id > position}
+        self.invalidated += invalidated
+        return invalidated
+
+    def _reset(self):
+        invalidated = len(self.cache)
+        self.cache.clear()
+        self.position = None
+        self.invalidated += invalidated
+        return invalidated
+
+    def metric_lines(self):
+        return ["# HELP token_cache_remote_invalidations_total Tokens descartados por eventos de otros workers",
+                "# TYPE token_cache_remote_invalidations_total counter",
+                f"token_cache_remote_invalidations_total {self.invalidated}"]
+
+
+token_invalidations = UserEventFollower(token_cache)
+
+
+def start_token_invalidations(app, follower=token_invalidations, interval=TOKEN_CACHE_SYNC_INTERVAL):
+    """Inicia el hilo que sigue el outbox en este worker; retorna el Event para detenerlo."""
+    def loop():
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    follower.sync()
+            except Exception as error:
+                print(f"[!] Error al invalidar la caché de tokens: {error}", flush=True)
+            stop.wait(interval)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=loop, name="token-invalidations", daemon=True)
+    thread.start()
+    return stop
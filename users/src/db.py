@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from models.model import Model
+from common.replicas import RoutingSession
 
 
-db = SQLAlchemy(model_class=Model)
+db = SQLAlchemy(model_class=Model, session_options={"class_": RoutingSession})
 
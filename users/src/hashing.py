@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from flask import g
+from werkzeug.security import generate_password_hash, check_password_hash
+from common.env import web_workers
+
+# Cada worker de gunicorn tiene su propio pool: por defecto los núcleos se reparten entre
+# los WEB_WORKERS del contenedor (al menos un proceso por worker)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", max(1, (os.cpu_count() or 1) // web_workers())))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", max(HASH_WORKERS, 1) * 4))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT", 5))
+
+
+class HashingBusy(Exception):
+    """Se lanza cuando el pool de hashing está saturado o no respondió a tiempo."""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+# Limita el número de hashes en curso o en cola (back-pressure)
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+
+
+def _get_executor():
+    """Crea el pool de procesos de forma perezosa (después de un posible fork del servidor)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _executor
+
+
+def _run(func, *args):
+    """Ejecuta func en el pool y registra su duración en g.hash_timings."""
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy()
+
+    start = time.perf_counter()
+    try:
+        # HASH_WORKERS=0 ejecuta el hash en el mismo hilo (útil en pruebas)
+        if HASH_WORKERS == 0:
+            try:
+                return func(*args)
+            finally:
+                _slots.release()
+
+        try:
+            future = _get_executor().submit(func, *args)
+        except Exception:
+            _slots.release()
+            raise
+        # El cupo se libera cuando el proceso termina, no cuando el request deja de esperar
+        future.add_done_callback(lambda _: _slots.release())
+        try:
+            return future.result(timeout=HASH_TIMEOUT)
+        except TimeoutError:
+            future.cancel()
+            raise HashingBusy()
+    finally:
+        g.setdefault("hash_timings", []).append((time.perf_counter() - start) * 1000)
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password)
+
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+
+def hash_passwords(passwords, window=None):
+    """Hashea varias contraseñas en paralelo en el pool y las retorna en el mismo orden.
+
+    Mantiene como mucho `window` hashes en curso (por defecto HASH_WORKERS, la parte de
+    los núcleos que le toca a este worker) y espera su cupo hasta HASH_TIMEOUT, así un lote
+    grande no ocupa los cupos que necesitan las solicitudes individuales ni los núcleos de
+    los demás workers.
+    """
+    start = time.perf_counter()
+    try:
+        if HASH_WORKERS == 0:
+            return [generate_password_hash(password) for password in passwords]
+
+        window = window or HASH_WORKERS
+        executor = _get_executor()
+        hashes = [None] * len(passwords)
+        in_flight = deque()
+        try:
+            for index, password in enumerate(passwords):
+                if len(in_flight) >= window:
+                    done_index, future = in_flight.popleft()
+                    hashes[done_index] = future.result(timeout=HASH_TIMEOUT)
+                if not _slots.acquire(timeout=HASH_TIMEOUT):
+                    raise HashingBusy()
+                try:
+                    future = executor.submit(generate_password_hash, password)
+                except Exception:
+                    _slots.release()
+                    raise
+                future.add_done_callback(lambda _: _slots.release())
+                in_flight.append((index, future))
+            for done_index, future in in_flight:
+                hashes[done_index] = future.result(timeout=HASH_TIMEOUT)
+        except TimeoutError:
+            raise HashingBusy()
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+        return hashes
+    finally:
+        g.setdefault("hash_timings", []).append((time.perf_counter() - start) * 1000)
+
+
+def add_server_timing(response):
+    """Expone la latencia de hashing en el encabezado Server-Timing."""
+    timings = g.get("hash_timings")
+    if timings:
+        metrics = ", ".join(f"hash;dur={duration:.2f}" for duration in timings)
+        previous = response.headers.get("Server-Timing")
+        response.headers["Server-Timing"] = f"{previous}, {metrics}" if previous else metrics
+    return response
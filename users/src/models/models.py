@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String
 from db import db
 from datetime import datetime
 import uuid
@@ -16,7 +16,7 @@ class User(Model):
     full_name = Column(String(100), nullable=True)
     password = Column(String(255), nullable=False)
     salt = Column(String(255), nullable=False)
-    token = Column(String(255), nullable=True)
+    token = Column(String(255), nullable=True, index=True)
     status = Column(String(20), nullable=False, 
                        default='POR_VERIFICAR', 
                        check_constraint="status IN ('POR_VERIFICAR', 'NO_VERIFICADO', 'VERIFICADO')")
@@ -39,3 +39,52 @@ class User(Model):
 
     def __repr__(self):
         return f"<User {self.username}>"
+
+
+class RevokedToken(Model):
+    """Tokens firmados que dejaron de ser válidos antes de su expiración."""
+    __tablename__ = 'revoked_tokens'
+
+    jti = Column(String(32), unique=True, nullable=False)
+    expire_at = Column(DateTime, nullable=False, index=True)
+
+    def __init__(self, jti, expire_at):
+        Model.__init__(self)
+        self.jti = jti
+        self.expire_at = expire_at
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti}>"
+
+
+class OutboxEvent(Model):
+    """Eventos de dominio pendientes de publicar (ver outbox.py)."""
+    __tablename__ = 'outbox_events'
+
+    # Secuencia en lugar de UUID: los eventos se entregan en orden de inserción
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = Column(String(50), nullable=False)
+    aggregate_id = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
+    dead_lettered_at = Column(DateTime, nullable=True)
+    last_error = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        Index('idx_outbox_events_pending', 'id',
+              postgresql_where=delivered_at.is_(None) & dead_lettered_at.is_(None)),
+        # Los ids no se reutilizan tras POST /users/reset (cache.py sigue el outbox por id)
+        {"sqlite_autoincrement": True},
+    )
+
+    def __init__(self, event_type, aggregate_id, payload):
+        Model.__init__(self)
+        self.event_type = event_type
+        self.aggregate_id = aggregate_id
+        self.payload = payload
+        self.attempts = 0
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.id} {self.event_type}>"
@@ -1,12 +1,38 @@
 from flask import Blueprint, request, jsonify
-from models.models import User
+from models.models import User, RevokedToken, OutboxEvent
 from db import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from cache import token_cache
+from hashing import HashingBusy, hash_password, hash_passwords, verify_password, add_server_timing
+from common.tokens import is_signed_token, issue_token, read_claims, expire_at_from_claims
+from common.outbox import add_event
+from common.replicas import primary_reads
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
 import bcrypt
+import uuid
 import secrets
 import datetime
+import os
+
+# Emitir tokens firmados que posts y routes pueden validar sin consultar a users
+SIGNED_TOKENS = os.getenv("SIGNED_TOKENS", "false").lower() == "true"
+USERS_MAX_IDS = int(os.getenv("USERS_MAX_IDS", 100))
+USERS_BATCH_MAX = int(os.getenv("USERS_BATCH_MAX", 1000))
+USERS_BATCH_INSERT = int(os.getenv("USERS_BATCH_INSERT", 200))
 
 users_bp = Blueprint('users', __name__)
+users_bp.after_request(add_server_timing)
+
+def revoke_token(token):
+    """Publica en la lista de revocación un token firmado que deja de ser válido."""
+    claims = read_claims(token) if is_signed_token(token) else None
+    if claims:
+        db.session.add(RevokedToken(jti=claims["jti"], expire_at=expire_at_from_claims(claims)))
+
+# El pool de hashing está saturado: se responde rápido en lugar de encolar
+@users_bp.errorhandler(HashingBusy)
+def handle_hashing_busy(error):
+    return jsonify({"error": "Servicio ocupado, intente de nuevo"}), 503, {"Retry-After": "1"}
 
 # Endpoint para crear un usuario
 @users_bp.route('/users', methods=['POST'])
@@ -24,7 +50,7 @@ def create_user():
     
  # Generar salt y cifrar contraseña
     salt = bcrypt.gensalt().decode()
-    hashed_password = generate_password_hash(data['password'] + salt)
+    hashed_password = hash_password(data['password'] + salt)
        
     # Crear usuario con contraseña encriptada
     new_user = User(
@@ -55,6 +81,96 @@ def create_user():
         "createdAt": new_user.created_at.isoformat() + "Z"
     }), 201
 
+def insert_users(rows, results):
+    """Inserta un bloque de usuarios en una transacción; si otro proceso tomó un username o
+    email en el intermedio, reintenta fila por fila para reportar solo esas."""
+    try:
+        db.session.execute(insert(User), [row for _, row in rows])
+        db.session.commit()
+        created = rows
+    except IntegrityError:
+        db.session.rollback()
+        created = []
+        for index, row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(User), [row])
+                created.append((index, row))
+            except IntegrityError:
+                results[index] = {"index": index, "status": 412, "error": "Username or email already exists"}
+        db.session.commit()
+
+    for index, row in created:
+        results[index] = {"index": index, "status": 201, "id": str(row["id"]),
+                          "createdAt": row["created_at"].isoformat() + "Z"}
+
+# Endpoint para crear usuarios en lote con resultados por registro
+@users_bp.route('/users/batch', methods=['POST'])
+def create_users_batch():
+    data = request.get_json(silent=True)
+    records = data.get("users") if isinstance(data, dict) else data
+    if not isinstance(records, list) or not 0 < len(records) <= USERS_BATCH_MAX:
+        return jsonify({"error": f"users debe ser una lista de 1 a {USERS_BATCH_MAX} usuarios"}), 400
+
+    results = [None] * len(records)
+    candidates = []
+    seen_usernames = set()
+    seen_emails = set()
+    for index, record in enumerate(records):
+        if not isinstance(record, dict) or not all(isinstance(record.get(field), str) and record[field]
+                                                   for field in ["username", "password", "email"]):
+            results[index] = {"index": index, "status": 400, "error": "username, password, and email are required"}
+        elif record["username"] in seen_usernames or record["email"] in seen_emails:
+            results[index] = {"index": index, "status": 412, "error": "Username or email repeated in the batch"}
+        else:
+            seen_usernames.add(record["username"])
+            seen_emails.add(record["email"])
+            candidates.append((index, record))
+
+    # Una sola consulta por los índices únicos de username y email
+    taken_usernames = set()
+    taken_emails = set()
+    if candidates:
+        for username, email in db.session.execute(
+            select(User.username, User.email).where(or_(User.username.in_(seen_usernames),
+                                                        User.email.in_(seen_emails)))
+        ):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+    pending = []
+    for index, record in candidates:
+        if record["username"] in taken_usernames or record["email"] in taken_emails:
+            results[index] = {"index": index, "status": 412, "error": "Username or email already exists"}
+        else:
+            pending.append((index, record))
+
+    # Los hashes de todo el lote se calculan en paralelo en el pool de procesos
+    salts = [bcrypt.gensalt().decode() for _ in pending]
+    hashes = hash_passwords([record["password"] + salt for (_, record), salt in zip(pending, salts)])
+
+    now = datetime.datetime.utcnow()
+    rows = [(index, {
+        "id": uuid.uuid4(),
+        "username": record["username"],
+        "password": hashed_password,
+        "email": record["email"],
+        "dni": record.get("dni"),
+        "full_name": record.get("fullName"),
+        "phone_number": record.get("phoneNumber"),
+        "salt": salt,
+        "status": "VERIFICADO",
+        "created_at": now,
+        "updated_at": now
+    }) for (index, record), salt, hashed_password in zip(pending, salts, hashes)]
+
+    # Inserciones por bloques: una transacción cada USERS_BATCH_INSERT usuarios
+    for start in range(0, len(rows), USERS_BATCH_INSERT):
+        insert_users(rows[start:start + USERS_BATCH_INSERT], results)
+
+    created = sum(1 for result in results if result["status"] == 201)
+    return jsonify({"created": created, "failed": len(results) - created, "results": results}), 200
+
 # Endpoint para actualizar un usuario
 @users_bp.route('/users/<uuid:id>', methods=['PATCH'])
 def update_user(id):
@@ -76,11 +192,23 @@ def update_user(id):
         user.phone_number = data["phoneNumber"]
     if "dni" in data:
         user.dni = data["dni"]
-    if "status" in data:
+    if "status" in data and data["status"] != user.status:
         user.status = data["status"]
+        # El estado viaja dentro del token firmado, por lo que debe revocarse
+        revoke_token(user.token)
 
+    # El evento se confirma en la misma transacción que el cambio (outbox)
+    add_event(db.session, OutboxEvent, "user.updated", user.id, {
+        "userId": str(user.id),
+        "fields": [key for key in ["fullName", "phoneNumber", "dni", "status"] if key in data],
+        "status": user.status
+    })
     db.session.commit()
 
+    # Los datos cacheados de /users/me ya no son válidos: este worker los descarta ya y
+    # los demás al leer el evento user.updated (ver cache.py)
+    token_cache.invalidate(user.token)
+
     return jsonify({"msg": "el usuario ha sido actualizado"}), 200
 
 
@@ -100,17 +228,29 @@ def generate_token():
     user = User.query.filter_by(username=username).first()
 
     # Validar credenciales
-    if not user or not check_password_hash(user.password, password + user.salt):
+    if not user or not verify_password(user.password, password + user.salt):
         return jsonify({"error": "Credenciales incorrectas"}), 404
 
     # Generar token y fecha de expiración (1 hora de validez)
-    token = secrets.token_hex(32)
     expire_at = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
-
-    # Guardar el token en la base de datos
+    if SIGNED_TOKENS:
+        token, _ = issue_token(user.id, user.status, expire_at)
+    else:
+        token = secrets.token_hex(32)
+
+    # Guardar el token en la base de datos e invalidar el token anterior
+    previous_token = user.token
+    revoke_token(previous_token)
     user.token = token
     user.expire_at = expire_at
+    # Los suscriptores descartan lo que tengan cacheado para los tokens anteriores del usuario
+    add_event(db.session, OutboxEvent, "user.token_issued", user.id, {
+        "userId": str(user.id),
+        "expireAt": expire_at.isoformat()
+    })
     db.session.commit()
+    # Los demás workers descartan el token anterior al leer user.token_issued
+    token_cache.invalidate(previous_token)
 
     return jsonify({
         "id": str(user.id),
@@ -118,6 +258,18 @@ def generate_token():
         "expireAt": expire_at.isoformat()
     }), 200
 
+def user_to_json(user):
+    """Serializa el usuario con los campos expuestos en /users/me."""
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "email": user.email,
+        "fullName": user.full_name,
+        "dni": user.dni,
+        "phoneNumber": user.phone_number,
+        "status": user.status
+    }
+
 # Middleware para autenticar el usuario mediante el token
 def authenticate_user():
     auth_header = request.headers.get("Authorization")
@@ -126,29 +278,78 @@ def authenticate_user():
         return None, 403  # Código 403 si no hay token en el encabezado
 
     token = auth_header.split(" ")[1]  # Obtener el token después de "Bearer"
-    user = User.query.filter_by(token=token).first()
+
+    # Primero se consulta la caché de tokens ya validados
+    user_data = token_cache.get(token)
+    if user_data:
+        return user_data, None
+
+    # Búsqueda por el índice de la columna token; en el primario, porque el token pudo
+    # emitirse hace un instante y la réplica aún no tenerlo
+    with primary_reads():
+        user = User.query.filter_by(token=token).first()
 
     # Verificar si el token existe y no ha expirado
-    if not user or not user.token or user.expire_at < datetime.datetime.utcnow():
+    now = datetime.datetime.utcnow()
+    if not user or not user.token or user.expire_at < now:
         return None, 401  # Código 401 si el token no es válido o ha expirado
 
-    return user, None
+    # La entrada en caché nunca sobrevive a la expiración del token
+    user_data = user_to_json(user)
+    token_cache.set(token, user_data, max_age=(user.expire_at - now).total_seconds())
+
+    return user_data, None
 
 # Endpoint para obtener la información del usuario autenticado
 @users_bp.route('/users/me', methods=['GET'])
 def get_user_info():
-    user, error_code = authenticate_user()
+    user_data, error_code = authenticate_user()
+    if error_code:
+        return jsonify({"error": "Token inválido o no autorizado"}), error_code
+
+    return jsonify(user_data), 200
+
+# Endpoint para consultar usuarios en lote: GET /users?ids=a,b (un solo SELECT ... IN)
+@users_bp.route('/users', methods=['GET'])
+def get_users_by_ids():
+    user_data, error_code = authenticate_user()
     if error_code:
         return jsonify({"error": "Token inválido o no autorizado"}), error_code
 
+    raw_ids = [value.strip() for raw in request.args.getlist("ids") for value in raw.split(",") if value.strip()]
+    try:
+        user_ids = list(dict.fromkeys(uuid.UUID(value) for value in raw_ids))
+    except ValueError:
+        return jsonify({"error": "Los ids deben tener formato uuid"}), 400
+    if not user_ids or len(user_ids) > USERS_MAX_IDS:
+        return jsonify({"error": f"ids debe tener entre 1 y {USERS_MAX_IDS} valores"}), 400
+
+    # Proyección compacta: solo los datos públicos del usuario
+    rows = db.session.query(User.id, User.username, User.full_name, User.status) \
+        .filter(User.id.in_(user_ids)).all()
+    returned = {row.id for row in rows}
+    missing = [user_id for user_id in user_ids if user_id not in returned]
+    if missing:
+        # Usuarios recién creados que la réplica aún no tiene
+        with primary_reads():
+            rows += db.session.query(User.id, User.username, User.full_name, User.status) \
+                .filter(User.id.in_(missing)).all()
+    found = {row.id: {"id": str(row.id), "username": row.username, "fullName": row.full_name,
+                      "status": row.status} for row in rows}
+
+    # Los ids que no existen quedan en null
+    return jsonify({str(user_id): found.get(user_id) for user_id in user_ids}), 200
+
+# Endpoint con los tokens firmados revocados que aún no expiran
+@users_bp.route('/users/tokens/revoked', methods=['GET'])
+def get_revoked_tokens():
+    now = datetime.datetime.utcnow()
+    # Del primario: una revocación debe verse en cuanto se confirma
+    with primary_reads():
+        revoked = db.session.query(RevokedToken.jti).filter(RevokedToken.expire_at >= now).all()
     return jsonify({
-        "id": str(user.id),
-        "username": user.username,
-        "email": user.email,
-        "fullName": user.full_name,
-        "dni": user.dni,
-        "phoneNumber": user.phone_number,
-        "status": user.status
+        "revoked": [jti for (jti,) in revoked],
+        "generatedAt": now.isoformat()
     }), 200
 
 # Endpoint para verificar que el servicio está activo
@@ -161,7 +362,12 @@ def ping():
 def reset_db():
     try:
         db.session.query(User).delete()
+        db.session.query(RevokedToken).delete()
+        db.session.query(OutboxEvent).delete()
+        # Los demás workers vacían su caché de tokens al leer este evento
+        add_event(db.session, OutboxEvent, "users.reset", "users", {})
         db.session.commit()
+        token_cache.clear()
         return jsonify({"message": "Database reset successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -115,4 +115,183 @@ def test_reset_db(client):
     assert response.status_code == 200
     assert response.json["message"] == "Database reset successfully"
     with app.app_context():
-        assert User.query.count() == 0  # Verifica que la base de datos se haya limpiado
\ No newline at end of file
+        assert User.query.count() == 0  # Verifica que la base de datos se haya limpiado
+
+# Test para verificar que un token reemplazado deja de ser válido aunque esté en caché
+def test_get_user_info_old_token_invalidated(client):
+    client.post("/users", json={
+        "username": "testuser",
+        "password": "testpassword",
+        "email": "test@example.com"
+    })
+    old_token = client.post("/users/auth", json={"username": "testuser", "password": "testpassword"}).json["token"]
+
+    # Primera consulta: el token queda en caché
+    response = client.get("/users/me", headers={"Authorization": f"Bearer {old_token}"})
+    assert response.status_code == 200
+
+    # Al emitir un nuevo token el anterior se invalida
+    new_token = client.post("/users/auth", json={"username": "testuser", "password": "testpassword"}).json["token"]
+    response = client.get("/users/me", headers={"Authorization": f"Bearer {old_token}"})
+    assert response.status_code == 401
+    response = client.get("/users/me", headers={"Authorization": f"Bearer {new_token}"})
+    assert response.status_code == 200
+
+# Test para verificar que el cambio de estado se refleja en /users/me
+def test_get_user_info_after_status_update(client):
+    user_id = client.post("/users", json={
+        "username": "testuser",
+        "password": "testpassword",
+        "email": "test@example.com"
+    }).json["id"]
+    token = client.post("/users/auth", json={"username": "testuser", "password": "testpassword"}).json["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/users/me", headers=headers).json["status"] == "VERIFICADO"
+    client.patch(f"/users/{user_id}", json={"status": "NO_VERIFICADO"})
+    assert client.get("/users/me", headers=headers).json["status"] == "NO_VERIFICADO"
+
+# Test para verificar el 503 cuando el pool de hashing está saturado
+def test_generate_token_hashing_busy(client, monkeypatch):
+    import threading
+    import hashing
+    monkeypatch.setattr(hashing, "_slots", threading.BoundedSemaphore(1))
+    hashing._slots.acquire()
+
+    response = client.post("/users", json={
+        "username": "testuser",
+        "password": "testpassword",
+        "email": "test@example.com"
+    })
+    assert response.status_code == 503
+    assert "error" in response.json
+
+# Test para verificar que un token firmado reemplazado se publica como revocado
+def test_signed_token_revoked(client, monkeypatch):
+    import routes.users
+    from common.tokens import read_claims
+    monkeypatch.setattr(routes.users, "SIGNED_TOKENS", True)
+
+    client.post("/users", json={
+        "username": "testuser",
+        "password": "testpassword",
+        "email": "test@example.com"
+    })
+    old_token = client.post("/users/auth", json={"username": "testuser", "password": "testpassword"}).json["token"]
+    assert read_claims(old_token)["status"] == "VERIFICADO"
+
+    client.post("/users/auth", json={"username": "testuser", "password": "testpassword"})
+    response = client.get("/users/tokens/revoked")
+    assert response.status_code == 200
+    assert response.json["revoked"] == [read_claims(old_token)["jti"]]
+
+# Test para verificar la consulta de usuarios en lote por id
+def test_get_users_by_ids(client):
+    user_id = client.post("/users", json={
+        "username": "testuser",
+        "password": "testpassword",
+        "email": "test@example.com"
+    }).json["id"]
+    token = client.post("/users/auth", json={"username": "testuser", "password": "testpassword"}).json["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    missing_id = "0b5c3a8e-5f7e-4c36-9a52-3c1f1b8c2d11"
+
+    response = client.get(f"/users?ids={user_id},{missing_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json[user_id]["username"] == "testuser"
+    assert "email" not in response.json[user_id]
+    assert response.json[missing_id] is None
+
+    assert client.get("/users?ids=abc", headers=headers).status_code == 400
+    assert client.get(f"/users?ids={user_id}").status_code == 403
+
+# Test para verificar que los cambios del usuario se publican desde el outbox
+def test_user_events_outbox(client):
+    from models.models import OutboxEvent
+    from common.outbox import LocalBroker, OutboxDispatcher
+
+    user_id = client.post("/users", json={
+        "username": "testuser",
+        "password": "testpassword",
+        "email": "test@example.com"
+    }).json["id"]
+    client.post("/users/auth", json={"username": "testuser", "password": "testpassword"})
+    client.patch(f"/users/{user_id}", json={"status": "NO_VERIFICADO"})
+
+    received = []
+    broker = LocalBroker()
+    broker.subscribe(received.append, event_types=["user.updated", "user.token_issued"])
+    dispatcher = OutboxDispatcher(OutboxEvent, source="users", webhooks=[], broker=broker)
+    with app.app_context():
+        assert dispatcher.dispatch(db.session) == 2
+        assert dispatcher.dispatch(db.session) == 0
+
+    assert [event["type"] for event in received] == ["user.token_issued", "user.updated"]
+    assert received[1]["payload"] == {"userId": user_id, "fields": ["status"], "status": "NO_VERIFICADO"}
+
+# Test para verificar que un cambio atendido por un worker invalida la caché de los demás
+def test_token_cache_invalidated_in_other_workers(client):
+    from cache import UserEventFollower
+    from common.cache import TokenCache
+
+    user_id = client.post("/users", json={
+        "username": "testuser",
+        "password": "testpassword",
+        "email": "test@example.com"
+    }).json["id"]
+    token = client.post("/users/auth", json={"username": "testuser", "password": "testpassword"}).json["token"]
+
+    # Otro worker: su propia caché y su propio seguimiento del outbox
+    other_cache = TokenCache(ttl=3600)
+    other_worker = UserEventFollower(other_cache)
+    with app.app_context():
+        other_worker.sync()
+    other_cache.set(token, {"id": user_id, "status": "VERIFICADO"})
+    other_cache.set("other-user", {"id": "otro", "status": "VERIFICADO"})
+
+    # El cambio de estado lo atiende este worker
+    client.patch(f"/users/{user_id}", json={"status": "NO_VERIFICADO"})
+    with app.app_context():
+        assert other_worker.sync() == 1
+        assert other_worker.sync() == 0
+    assert other_cache.get(token) is None
+    assert other_cache.get("other-user") is not None
+
+    # Un token nuevo deja obsoleto el anterior en el otro worker
+    other_cache.set(token, {"id": user_id, "status": "NO_VERIFICADO"})
+    client.post("/users/auth", json={"username": "testuser", "password": "testpassword"})
+    with app.app_context():
+        assert other_worker.sync() == 1
+    assert other_cache.get(token) is None
+
+    # El reset vacía la caché de todos los workers
+    client.post("/users/reset")
+    with app.app_context():
+        other_worker.sync()
+    assert len(other_cache) == 0
+
+# Test para verificar la creación de usuarios en lote con resultados por registro
+def test_create_users_batch(client):
+    client.post("/users", json={
+        "username": "existing",
+        "password": "testpassword",
+        "email": "existing@example.com"
+    })
+
+    response = client.post("/users/batch", json={"users": [
+        {"username": "batch1", "password": "pass1", "email": "batch1@example.com", "fullName": "Batch Uno"},
+        {"username": "existing", "password": "pass2", "email": "other@example.com"},
+        {"username": "batch1", "password": "pass3", "email": "batch3@example.com"},
+        {"username": "batch4", "email": "batch4@example.com"},
+        {"username": "batch5", "password": "pass5", "email": "batch5@example.com"}
+    ]})
+    assert response.status_code == 200
+    assert response.json["created"] == 2
+    assert response.json["failed"] == 3
+    assert [result["status"] for result in response.json["results"]] == [201, 412, 412, 400, 201]
+
+    # Las contraseñas del lote quedan hasheadas con su salt
+    response = client.post("/users/auth", json={"username": "batch5", "password": "pass5"})
+    assert response.status_code == 200
+
+    assert client.post("/users/batch", json={"users": []}).status_code == 400